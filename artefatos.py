@@ -0,0 +1,307 @@
+"""Artefatos de cada execução (log, relatórios, capturas, diário) numa pasta própria.
+
+Cada execução ganha `<diretorio>/<AAAAMMDD_HHMMSS>_<sistema>/` com um
+manifesto.json dos arquivos gerados. Ao iniciar uma execução, as pastas
+CONCLUIDO além da retenção são apagadas (execuções interrompidas ou com erro
+ficam, pois o diário delas ainda serve ao --resume) e os logs/CSVs das
+execuções anteriores são comprimidos com gzip ou zstd por uma thread em
+segundo plano.
+Opções na seção [ARTEFATOS] do config.ini; padrões em Config.ARTEFATOS_*.
+"""
+
+import atexit
+import datetime
+import gzip
+import io
+import json
+import os
+import queue
+import shutil
+import threading
+from typing import Dict, List, Tuple
+
+try:
+    import zstandard
+except ImportError:  # opcional; sem ele a compressão usa gzip
+    zstandard = None
+
+from config import Config
+from settings_manager import SettingsManager
+
+
+MANIFESTO = 'manifesto.json'
+EXTENSOES_COMPRESSAO = {'gzip': '.gz', 'zstd': '.zst'}
+TIPOS_COMPRIMIDOS = {'log'}
+EXTENSOES_COMPRIMIDAS = {'.csv'}
+
+
+def abrir_artefato(caminho: str, modo: str = 'rt', encoding: str = 'utf-8'):
+    """Abre um artefato para leitura, comprimido (.gz/.zst) ou não."""
+    texto = 't' in modo
+    if caminho.endswith('.gz'):
+        return gzip.open(caminho, 'rt' if texto else 'rb', encoding=encoding if texto else None)
+    if caminho.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("Pacote 'zstandard' não instalado para ler " + caminho)
+        leitor = zstandard.ZstdDecompressor().stream_reader(open(caminho, 'rb'), closefd=True)
+        return io.TextIOWrapper(leitor, encoding=encoding) if texto else leitor
+    return open(caminho, 'r' if texto else 'rb', encoding=encoding if texto else None)
+
+
+class GerenciadorArtefatos:
+    """Pasta e manifesto da execução atual, compressão e retenção das anteriores."""
+    
+    SECAO = 'ARTEFATOS'
+    
+    def __init__(self, settings: SettingsManager = None):
+        self._settings = settings
+        self.execucao = None
+        self.pasta = '.'
+        self._lock = threading.RLock()
+        self._fila = queue.Queue()
+        self._thread = None
+        atexit.register(self.aguardar)
+    
+    @property
+    def settings(self) -> SettingsManager:
+        if self._settings is None:
+            self._settings = SettingsManager()
+        return self._settings
+    
+    def _opcao(self, chave: str, padrao) -> str:
+        return self.settings.get(self.SECAO, chave, str(padrao)).strip()
+    
+    @property
+    def raiz(self) -> str:
+        return self._opcao('diretorio', Config.ARTEFATOS_DIRETORIO)
+    
+    @property
+    def compressao(self) -> str:
+        metodo = self._opcao('compressao', Config.ARTEFATOS_COMPRESSAO).lower()
+        if metodo == 'zstd' and zstandard is None:
+            return 'gzip'
+        return metodo if metodo in EXTENSOES_COMPRESSAO else 'nenhuma'
+    
+    @property
+    def manter_execucoes(self) -> int:
+        return int(self._opcao('manter_execucoes', Config.ARTEFATOS_MANTER_EXECUCOES) or 0)
+    
+    @property
+    def manter_dias(self) -> int:
+        return int(self._opcao('manter_dias', Config.ARTEFATOS_MANTER_DIAS) or 0)
+    
+    # Manifesto
+    
+    @staticmethod
+    def ler_manifesto(pasta: str) -> Dict:
+        with open(os.path.join(pasta, MANIFESTO), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @staticmethod
+    def _salvar_manifesto(pasta: str, manifesto: Dict):
+        caminho = os.path.join(pasta, MANIFESTO)
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, indent=2, ensure_ascii=False)
+        os.replace(caminho + '.tmp', caminho)
+    
+    def iniciar_execucao(self, sistema: str, preservar: str = None) -> str:
+        """Cria a pasta da execução, aplica a retenção e comprime as anteriores.
+
+        `preservar`: arquivo (ex.: diário retomado) cuja pasta nunca é apagada.
+        """
+        with self._lock:
+            base = f"{datetime.datetime.now():%Y%m%d_%H%M%S}_{sistema.lower()}"
+            execucao, n = base, 1
+            while os.path.exists(os.path.join(self.raiz, execucao)):
+                n += 1
+                execucao = f"{base}_{n}"
+            pasta = os.path.join(self.raiz, execucao)
+            os.makedirs(pasta)
+            self._salvar_manifesto(pasta, {
+                'execucao': execucao,
+                'sistema': sistema,
+                'inicio': datetime.datetime.now().isoformat(),
+                'fim': None,
+                'status': 'EM_EXECUCAO',
+                'arquivos': [],
+            })
+            self.execucao, self.pasta = execucao, pasta
+        
+        self.aplicar_retencao(preservar)
+        self.comprimir_pendentes()
+        return pasta
+    
+    def arquivo(self, nome: str, tipo: str) -> str:
+        """Caminho de um novo artefato na pasta da execução (registrado no manifesto).
+
+        Sem execução iniciada, devolve o nome no diretório atual, como antes.
+        Nome já usado na execução ganha sufixo numérico (`relatorio_2.json`).
+        """
+        with self._lock:
+            caminho = os.path.join(self.pasta, nome)
+            if self.execucao is not None:
+                manifesto = self.ler_manifesto(self.pasta)
+                usados = {entrada['nome'] for entrada in manifesto['arquivos']}
+                base, extensao = os.path.splitext(nome)
+                n = 1
+                while nome in usados or os.path.exists(caminho):
+                    n += 1
+                    nome = f"{base}_{n}{extensao}"
+                    caminho = os.path.join(self.pasta, nome)
+                manifesto['arquivos'].append({
+                    'nome': nome,
+                    'tipo': tipo,
+                    'criado': datetime.datetime.now().isoformat(),
+                })
+                self._salvar_manifesto(self.pasta, manifesto)
+            return caminho
+    
+    def finalizar_execucao(self, status: str = 'CONCLUIDO'):
+        """Fecha o manifesto da execução atual com status e tamanhos."""
+        with self._lock:
+            if self.execucao is None:
+                return
+            manifesto = self.ler_manifesto(self.pasta)
+            manifesto['fim'] = datetime.datetime.now().isoformat()
+            manifesto['status'] = status
+            for entrada in manifesto['arquivos']:
+                caminho = os.path.join(self.pasta, entrada['nome'])
+                entrada['tamanho'] = os.path.getsize(caminho) if os.path.exists(caminho) else None
+            self._salvar_manifesto(self.pasta, manifesto)
+            self.execucao, self.pasta = None, '.'
+    
+    # Retenção
+    
+    def listar_execucoes(self) -> List[Tuple[str, Dict]]:
+        """(pasta, manifesto) das execuções na raiz, da mais antiga à mais nova."""
+        if not os.path.isdir(self.raiz):
+            return []
+        execucoes = []
+        for entrada in sorted(os.scandir(self.raiz), key=lambda e: e.name):
+            if not entrada.is_dir():
+                continue
+            try:
+                execucoes.append((entrada.path, self.ler_manifesto(entrada.path)))
+            except (OSError, ValueError):
+                continue
+        return execucoes
+    
+    def aplicar_retencao(self, preservar: str = None) -> List[str]:
+        """Apaga as execuções além de `manter_execucoes` ou mais velhas que `manter_dias`.
+
+        Só execuções CONCLUIDO entram na conta; a pasta de `preservar` nunca sai.
+        """
+        protegida = os.path.normcase(os.path.dirname(os.path.abspath(preservar))) if preservar else None
+        with self._lock:
+            anteriores = [(p, m) for p, m in self.listar_execucoes()
+                          if m.get('execucao') != self.execucao and m.get('status') == 'CONCLUIDO'
+                          and os.path.normcase(os.path.abspath(p)) != protegida]
+            excedentes = len(anteriores) + 1 - self.manter_execucoes if self.manter_execucoes > 0 else 0
+            limite = datetime.datetime.now() - datetime.timedelta(days=self.manter_dias) \
+                if self.manter_dias > 0 else None
+            
+            removidas = []
+            for i, (pasta, manifesto) in enumerate(anteriores):
+                antiga = limite is not None and datetime.datetime.fromisoformat(manifesto['inicio']) < limite
+                if i < excedentes or antiga:
+                    shutil.rmtree(pasta, ignore_errors=True)
+                    removidas.append(pasta)
+            return removidas
+    
+    # Compressão
+    
+    @staticmethod
+    def _deve_comprimir(entrada: Dict) -> bool:
+        if entrada.get('comprimido'):
+            return False
+        return entrada.get('tipo') in TIPOS_COMPRIMIDOS or \
+            os.path.splitext(entrada['nome'])[1].lower() in EXTENSOES_COMPRIMIDAS
+    
+    def comprimir_pendentes(self) -> int:
+        """Enfileira logs/CSVs ainda não comprimidos das execuções anteriores."""
+        if self.compressao == 'nenhuma':
+            return 0
+        pendentes = 0
+        for pasta, manifesto in self.listar_execucoes():
+            if manifesto.get('execucao') == self.execucao:
+                continue
+            for entrada in manifesto.get('arquivos', []):
+                if self._deve_comprimir(entrada) and os.path.exists(os.path.join(pasta, entrada['nome'])):
+                    self._fila.put((pasta, entrada['nome']))
+                    pendentes += 1
+        if pendentes and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._processar_fila, daemon=True)
+            self._thread.start()
+        return pendentes
+    
+    def _processar_fila(self):
+        while True:
+            item = self._fila.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                self._comprimir(*item)
+            except Exception as e:
+                self._registrar_falha(*item, e)
+    
+    def _registrar_falha(self, pasta: str, nome: str, erro: Exception):
+        """Avisa no log e marca a entrada no manifesto; a compressão é tentada de novo na próxima execução."""
+        from logger import log  # o logger depende deste módulo
+        log.warning(f"Nao foi possivel comprimir {os.path.join(pasta, nome)}: {erro}")
+        try:
+            with self._lock:
+                manifesto = self.ler_manifesto(pasta)
+                for entrada in manifesto['arquivos']:
+                    if entrada['nome'] == nome:
+                        entrada['erro_compressao'] = str(erro)
+                self._salvar_manifesto(pasta, manifesto)
+        except Exception as e:
+            log.warning(f"Nao foi possivel atualizar o manifesto de {pasta}: {e}")
+    
+    def _abrir_saida(self, caminho: str, metodo: str):
+        if metodo == 'zstd':
+            return zstandard.ZstdCompressor().stream_writer(open(caminho, 'wb'), closefd=True)
+        return gzip.open(caminho, 'wb')
+    
+    def _comprimir(self, pasta: str, nome: str):
+        metodo = self.compressao
+        origem = os.path.join(pasta, nome)
+        destino = origem + EXTENSOES_COMPRESSAO[metodo]
+        temporario = destino + '.tmp'
+        try:
+            with open(origem, 'rb') as entrada, self._abrir_saida(temporario, metodo) as saida:
+                shutil.copyfileobj(entrada, saida, 1 << 20)
+            os.replace(temporario, destino)
+            tamanho_original = os.path.getsize(origem)
+            os.remove(origem)
+        except Exception:
+            # ex.: planilha aberta no Excel; o original fica e a compressão é refeita depois
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            if os.path.exists(destino) and os.path.exists(origem):
+                os.remove(destino)
+            raise
+        
+        with self._lock:
+            manifesto = self.ler_manifesto(pasta)
+            for entrada in manifesto['arquivos']:
+                if entrada['nome'] == nome:
+                    entrada['nome'] = os.path.basename(destino)
+                    entrada['comprimido'] = metodo
+                    entrada['tamanho_original'] = tamanho_original
+                    entrada['tamanho'] = os.path.getsize(destino)
+                    entrada.pop('erro_compressao', None)
+            self._salvar_manifesto(pasta, manifesto)
+    
+    def aguardar(self, prazo: float = None) -> bool:
+        """Espera a compressão em andamento; False se o prazo acabar antes."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        pronto = threading.Event()
+        self._fila.put(pronto)
+        return pronto.wait(Config.ARTEFATOS_PRAZO_SAIDA if prazo is None else prazo)
+
+
+# Instância global
+artefatos = GerenciadorArtefatos()
@@ -2,129 +2,136 @@
 
 import time
 import random
-import subprocess
 import os
-import datetime
-import pyautogui
 from typing import List, Dict
 from config import Config
 from models import Produto, ItemVenda, VendaPDV, EstatisticasExecucao
-from database import RepositorioFirebird, RepositorioMockPDV
-from logger import log
+from database import RepositorioMockPDV
+from logger import log, SEPARADOR
 from ui_dashboard import DashboardExecucao
-from utils import formatar_moeda_br, formatar_numero_br
+from utils import descrever_item
+from dinheiro import formatar_centavos
+from plano_teclas import CompiladorPlano, ExecutorPlano
+from esperas import EsperaAdaptativa
+from drivers import DriverEntrada, obter_driver
+from diario_execucao import DiarioExecucao, EstadoDiario
+from plano_execucao import GeradorPlano, PlanoExecucao
+from inicializacao_pdv import InicializadorPDV, ProvedorJanelas
+from cache_catalogo import CacheCatalogo
+from modo_conexao import NegociadorConexao
+from relatorios_incrementais import RelatorioIncremental
 
 
 class GerenciadorPDV:
     """Gerencia a abertura e login automático do PDV."""
     
     @staticmethod
-    def abrir_pdv(caminho_exe: str, caminho_bd: str, usuario: str, senha: str) -> bool:
+    def abrir_pdv(caminho_exe: str, caminho_bd: str, usuario: str, senha: str,
+                  driver: DriverEntrada = None, provedor: ProvedorJanelas = None,
+                  tempos_fases: Dict[str, float] = None) -> bool:
+        """Abre e faz login sondando cada fase; tempos vão para `tempos_fases`."""
+        inicializador = InicializadorPDV(caminho_exe, usuario, senha,
+                                         driver=driver, provedor=provedor)
         try:
-            if not os.path.exists(caminho_exe):
-                log.error(f"Executável não encontrado: {caminho_exe}")
-                return False
-            
-            log.info(f"Abrindo PDV: {caminho_exe}")
-            subprocess.Popen(caminho_exe, shell=True)
-            
-            log.info("Aguardando PDV abrir (10 segundos)...")
-            time.sleep(10)
-            
-            janela_encontrada = False
-            for tentativa in range(5):
-                try:
-                    possiveis_titulos = ["Login", "Acesso", "Entrar", "PDV", "Sistema", "SGAPDV", "FormLogin"]
-                    
-                    for titulo in possiveis_titulos:
-                        try:
-                            janelas = pyautogui.getWindowsWithTitle(titulo)
-                            if janelas:
-                                log.info(f"Janela encontrada: {titulo}")
-                                janela = janelas[0]
-                                janela.activate()
-                                janela_encontrada = True
-                                break
-                        except:
-                            continue
-                    
-                    if janela_encontrada:
-                        break
-                        
-                except Exception as e:
-                    log.debug(f"Tentativa {tentativa + 1} de encontrar janela: {e}")
-                
-                time.sleep(2)
-            
-            if not janela_encontrada:
-                log.warning("Janela específica não encontrada, continuando com foco na tela atual...")
-                try:
-                    pyautogui.keyDown('alt')
-                    pyautogui.keyDown('tab')
-                    pyautogui.keyUp('tab')
-                    pyautogui.keyUp('alt')
-                    time.sleep(0.5)
-                except:
-                    pass
-            
-            log.info("Realizando login automático...")
-            time.sleep(3)
-            
-            pyautogui.keyDown('ctrl')
-            pyautogui.keyDown('a')
-            pyautogui.keyUp('a')
-            pyautogui.keyUp('ctrl')
-            time.sleep(0.2)
-            
-            pyautogui.write(usuario)
-            log.info(f"Usuário digitado: {usuario}")
-            time.sleep(0.5)
-            
-            pyautogui.press('tab')
-            time.sleep(0.3)
-            
-            pyautogui.write(senha)
-            log.info("Senha digitada")
-            time.sleep(0.5)
-            
-            pyautogui.press('enter')
-            log.info("Login confirmado (Enter)")
-            
-            log.info("Aguardando sistema carregar (5 segundos)...")
-            time.sleep(5)
-            
-            log.info("PDV aberto e logado com sucesso!")
-            return True
-            
+            return inicializador.executar()
         except Exception as e:
             log.error(f"Erro ao abrir PDV: {e}")
             return False
+        finally:
+            if tempos_fases is not None:
+                tempos_fases.update(inicializador.tempos)
 
 
 class ProcessadorVendasPDV:
-    """Processador de vendas para o PDV - Usa apenas pyautogui."""
+    """Processador de vendas para o PDV - Usa apenas teclado (sem pywinauto)."""
     
-    def __init__(self, db, total_vendas: int, dashboard: DashboardExecucao = None):
+    def __init__(self, db, total_vendas: int, dashboard: DashboardExecucao = None,
+                 driver: DriverEntrada = None, diario: DiarioExecucao = None,
+                 retomada: EstadoDiario = None, semente: int = None,
+                 plano: PlanoExecucao = None, salvar_plano: str = None,
+                 relatorio: RelatorioIncremental = None, manter_documentos: bool = True):
         self.db = db
+        self.plano = plano
+        self.salvar_plano = salvar_plano
+        if plano is not None:
+            total_vendas = len(plano)
         self.total_vendas = total_vendas
         self.dashboard = dashboard
+        self.diario = diario
+        self.retomada = retomada
+        self.semente = semente
+        self.rng = random.Random(semente) if semente is not None else random
+        self.relatorio = relatorio
+        self.manter_documentos = manter_documentos
         self.vendas = []
         self.stats = EstatisticasExecucao(total_processos=total_vendas)
+        self.driver = driver or obter_driver()
+        self.executor = ExecutorPlano(EsperaAdaptativa(relogio=self.driver.relogio), envio=self.driver)
+    
+    def _acumular(self, venda: VendaPDV):
+        self.stats.total_itens += len(venda.itens)
+        self.stats.itens_sucesso += venda.itens_sucesso
+        self.stats.itens_falha += venda.itens_falha
+        self.stats.somar_valor(venda.valor_total_centavos)
+        
+        if venda.status == 'OK':
+            self.stats.processos_sucesso += 1
+        else:
+            self.stats.processos_falha += 1
+    
+    def _concluir(self, venda: VendaPDV):
+        if self.manter_documentos:
+            self.vendas.append(venda)
+        self._acumular(venda)
+        if self.relatorio:
+            self.relatorio.adicionar(venda)
+    
+    def _retomar(self) -> int:
+        """Recarrega as vendas já concluídas do diário; retorna a próxima venda."""
+        self.stats.inicio_execucao = self.retomada.inicio
+        for venda in self.retomada.documentos:
+            self._concluir(venda)
+        
+        primeira = self.retomada.proximo_documento
+        log.warning(f"Retomando na venda {primeira}/{self.total_vendas} "
+                    f"({len(self.retomada.documentos)} vendas recuperadas do diário)")
+        if self.diario:
+            self.diario.registrar_retomada(primeira)
+        return primeira
     
     def executar(self):
         inicio = time.time()
         
         try:
-            if not self.db.conectar():
-                raise RuntimeError("Falha na conexao")
-            
-            produtos = self.db.buscar_produtos()
-            if not produtos:
-                raise ValueError("Sem produtos")
+            if self.retomada:
+                selecionados = self.retomada.produtos
+                primeira = self._retomar()
+            elif self.plano is not None:
+                selecionados = self.plano.produtos
+                primeira = 1
+                log.info(f"Executando plano carregado: {self.plano.total_itens} itens em {len(self.plano)} documentos")
+                if self.diario:
+                    self.diario.registrar_plano(self.total_vendas, selecionados)
+            else:
+                if not self.db.conectar():
+                    raise RuntimeError("Falha na conexao")
+                
+                amostra, total = self.db.amostrar_produtos(Config.MAX_PRODUTOS_SELECAO_PDV, self.semente)
+                self.db.fechar()
+                selecionados = self._selecionar_produtos(amostra, total)
+                if not selecionados:
+                    raise ValueError("Sem produtos")
+                
+                primeira = 1
+                if self.diario:
+                    self.diario.registrar_plano(self.total_vendas, selecionados)
             
-            selecionados = self._selecionar_produtos(produtos)
+            if self.plano is None:
+                self.plano = self._gerar_plano(selecionados)
+                if self.salvar_plano:
+                    log.info(f"Plano salvo em: {self.plano.salvar(self.salvar_plano)}")
             
-            for num in range(1, self.total_vendas + 1):
+            for num in range(primeira, self.total_vendas + 1):
                 if self.dashboard:
                     pct = (num - 1) / self.total_vendas * 100
                     self.dashboard.atualizar('progresso', percentual=pct, 
@@ -132,42 +139,46 @@ class ProcessadorVendasPDV:
                     self.dashboard.atualizar('status', texto=f"Processando venda {num}...")
                 
                 venda = self._processar_venda(num, selecionados)
-                self.vendas.append(venda)
-                
-                self.stats.total_itens += len(venda.itens)
-                self.stats.itens_sucesso += venda.itens_sucesso
-                self.stats.itens_falha += venda.itens_falha
-                self.stats.valor_total += venda.valor_total
-                
-                if venda.status == 'OK':
-                    self.stats.processos_sucesso += 1
-                else:
-                    self.stats.processos_falha += 1
+                self._concluir(venda)
+                if self.diario:
+                    self.diario.registrar_documento(venda)
                 
                 if self.dashboard:
                     tempo_decorrido = int(time.time() - inicio)
                     mins, secs = divmod(tempo_decorrido, 60)
                     self.dashboard.atualizar('stats', 
                                            itens=self.stats.total_itens,
-                                           valor=self.stats.valor_total,
+                                           valor=self.stats.valor_total_centavos,
                                            tempo=f"{mins:02d}:{secs:02d}")
                 
                 if num < self.total_vendas:
                     log.info(f"Aguardando {Config.DELAY_PDV_ENTRE_CUPONS}s antes da próxima venda...")
-                    time.sleep(Config.DELAY_PDV_ENTRE_CUPONS)
+                    self.driver.pausa(Config.DELAY_PDV_ENTRE_CUPONS)
             
             self.stats.finalizar()
+            if self.diario:
+                self.diario.registrar_fim()
             return self.vendas, self.stats
             
         finally:
             self.db.fechar()
     
-    def _selecionar_produtos(self, produtos: List[Produto]) -> List[Produto]:
-        n = min(random.randint(Config.MIN_PRODUTOS_SELECAO_PDV, 
-                              min(Config.MAX_PRODUTOS_SELECAO_PDV, len(produtos))), 
-                len(produtos))
-        selecionados = random.sample(produtos, n)
-        random.shuffle(selecionados)
+    def _gerar_plano(self, produtos: List[Produto]) -> PlanoExecucao:
+        """Sorteia de uma vez itens, produtos e quantidades de todas as vendas."""
+        plano = GeradorPlano(produtos, self.semente).gerar(
+            self.total_vendas, Config.MIN_ITENS_POR_VENDA_PDV, Config.MAX_ITENS_POR_VENDA_PDV)
+        log.info(f"Plano gerado: {plano.total_itens} itens em {len(plano)} vendas (entropia {plano.entropia})")
+        return plano
+    
+    def _selecionar_produtos(self, amostra: List[Produto], total: int) -> List[Produto]:
+        """Escolhe quantos produtos usar a partir da amostra sorteada no repositório."""
+        if not amostra:
+            return []
+        n = min(self.rng.randint(min(Config.MIN_PRODUTOS_SELECAO_PDV, total), 
+                              min(Config.MAX_PRODUTOS_SELECAO_PDV, total)), 
+                total)
+        self.rng.shuffle(amostra)
+        selecionados = amostra[:n]
         log.info(f"{len(selecionados)} produtos selecionados para vendas")
         return selecionados
     
@@ -180,28 +191,27 @@ class ProcessadorVendasPDV:
         
         try:
             log.info("  Abrindo cupom (F10)...")
-            pyautogui.press('f10')
-            time.sleep(Config.DELAY_TRANSICAO_TELA)
+            self.driver.press('f10')
+            self.driver.pausa(Config.DELAY_TRANSICAO_TELA)
             
-            qtd_itens = random.randint(Config.MIN_ITENS_POR_VENDA_PDV, Config.MAX_ITENS_POR_VENDA_PDV)
+            itens_plano = self.plano.itens_documento(numero - 1)
+            qtd_itens = len(itens_plano)
             itens = []
             
-            for i in range(qtd_itens):
+            for i, (prod, qtd, valor_unit) in enumerate(itens_plano):
                 try:
-                    prod = random.choice(produtos)
-                    qtd = prod.gerar_quantidade()
-                    valor_unit = prod.calcular_valor_unitario()
-                    
                     item = ItemVenda(produto=prod, quantidade=qtd, valor_unitario=valor_unit)
                     
-                    qtd_txt = formatar_numero_br(qtd, casas=3, usar_milhar=False) if prod.unidade.upper() == 'KG' else str(int(qtd))
-                    log.info(f"  Item {i+1}/{qtd_itens}: {prod.codigo} | {qtd_txt} {prod.unidade} | R$ {formatar_moeda_br(valor_unit)}")
+                    log.info(descrever_item, i + 1, qtd_itens, prod, qtd, valor_unit)
                     
                     if self._adicionar_produto_ao_cupom(item):
                         itens.append(item)
                     else:
                         log.warning(f"  Item {i+1} adicionado com ressalvas")
                         itens.append(item)
+                    
+                    if self.diario:
+                        self.diario.registrar_item(numero, item)
                         
                 except Exception as e:
                     log.error(f"  Erro ao processar item {i+1}: {e}")
@@ -213,7 +223,7 @@ class ProcessadorVendasPDV:
                 log.warning(f"Atenção ao fechar venda {numero}, mas continuando...")
             
             venda.finalizar('OK')
-            log.info(f"Venda {numero} finalizada: {len(itens)} itens, R$ {formatar_moeda_br(venda.valor_total)}")
+            log.info(f"Venda {numero} finalizada: {len(itens)} itens, R$ {formatar_centavos(venda.valor_total_centavos)}")
             
         except Exception as e:
             log.error(f"Erro na venda {numero}: {e}")
@@ -225,22 +235,7 @@ class ProcessadorVendasPDV:
         produto = item.produto
         
         try:
-            if produto.unidade.upper() == 'KG':
-                qtd_str = f"{item.quantidade:.3f}".replace('.', ',')
-            else:
-                qtd_str = str(int(item.quantidade))
-            
-            pyautogui.write(qtd_str)
-            time.sleep(Config.DELAY_DIGITACAO)
-            
-            pyautogui.write('*')
-            time.sleep(0.1)
-            
-            pyautogui.write(produto.codigo)
-            time.sleep(Config.DELAY_DIGITACAO)
-            
-            pyautogui.press('enter')
-            time.sleep(1.0)
+            self.executor.executar(CompiladorPlano.item_venda(item))
             
             item.finalizar("OK")
             return True
@@ -252,12 +247,12 @@ class ProcessadorVendasPDV:
     
     def _fechar_cupom(self) -> bool:
         try:
-            pyautogui.press('f6')
-            time.sleep(1.5)
+            self.driver.press('f6')
+            self.driver.pausa(1.5)
             
             for _ in range(3):
-                pyautogui.press('enter')
-                time.sleep(0.5)
+                self.driver.press('enter')
+                self.driver.pausa(0.5)
             
             log.info("Cupom fechado com sucesso")
             return True
@@ -270,15 +265,17 @@ class ProcessadorVendasPDV:
 class AutomacaoPDV:
     """Classe para automações do sistema PDV."""
     
-    def __init__(self, dashboard: DashboardExecucao = None):
+    def __init__(self, dashboard: DashboardExecucao = None, driver: DriverEntrada = None):
         self.dashboard = dashboard
+        self.driver = driver or obter_driver()
     
     def executar_fluxo_vendas_simples(self, config: Dict):
-        log.info("=" * 60)
+        log.info(SEPARADOR)
         log.info("EXECUTANDO FLUXO: VENDAS SIMPLES - PDV")
-        log.info("=" * 60)
+        log.info(SEPARADOR)
         
         caminho_exe = config.get('caminho_exe_pdv', '')
+        tempos_abertura = {}
         if caminho_exe and os.path.exists(caminho_exe) and not config.get('usar_mock_pdv', False):
             log.info("Modo automático: Abrindo PDV...")
             if self.dashboard:
@@ -288,7 +285,9 @@ class AutomacaoPDV:
                 caminho_exe=caminho_exe,
                 caminho_bd=config.get('caminho_bd_pdv', ''),
                 usuario=config.get('usuario_pdv', 'ADMIN'),
-                senha=config.get('senha_pdv', '')
+                senha=config.get('senha_pdv', ''),
+                driver=self.driver,
+                tempos_fases=tempos_abertura
             )
             
             if not sucesso_abertura:
@@ -303,7 +302,7 @@ class AutomacaoPDV:
                 log.info(f"Iniciando em {i}...")
                 if self.dashboard:
                     self.dashboard.atualizar('log', texto=f"Aguarde... {i} segundos")
-                time.sleep(1)
+                self.driver.pausa(1)
         
         try:
             log.info("Iniciando automação do PDV agora!")
@@ -313,34 +312,48 @@ class AutomacaoPDV:
             if config.get('usar_mock_pdv', False):
                 db = RepositorioMockPDV()
             else:
-                db = RepositorioFirebird(
+                db = NegociadorConexao().criar_repositorio(
                     caminho=config.get('caminho_bd_pdv', ''),
                     usuario=Config.DB_USER,
                     senha=Config.DB_PASSWORD,
                     consulta_sql=Config.SISTEMAS_DISPONIVEIS['PDV']['consultas']['Vendas Simples'],
-                    host='localhost',
-                    porta=3050
+                    cache_catalogo=CacheCatalogo() if Config.CACHE_CATALOGO else None
                 )
             
+            retomada = config.get('retomada')
+            if retomada:
+                diario = DiarioExecucao.reabrir(retomada)
+            else:
+                diario = DiarioExecucao.novo('PDV', 'Vendas Simples', config)
+            log.info(f"Diário da execução: {diario.caminho}")
+            relatorio = RelatorioIncremental('PDV')
+            
             processador = ProcessadorVendasPDV(
                 db=db,
                 total_vendas=config.get('quantidade_vendas_pdv', 1),
-                dashboard=self.dashboard
+                plano=PlanoExecucao.carregar(config['arquivo_plano']) if config.get('arquivo_plano') else None,
+                salvar_plano=config.get('salvar_plano'),
+                dashboard=self.dashboard,
+                driver=self.driver,
+                diario=diario,
+                retomada=retomada,
+                semente=config.get('semente_amostragem'),
+                relatorio=relatorio,
+                manter_documentos=False
             )
             
-            vendas, stats = processador.executar()
-            
-            if self.dashboard:
-                self.dashboard.atualizar('status', texto="Gerando relatórios...")
-            
-            arquivos_gerados = []
-            arquivos_gerados.append(self._gerar_relatorio_vendas_texto(vendas, stats))
-            arquivos_gerados.append(log.exportar_csv_vendas(vendas))
+            try:
+                vendas, stats = processador.executar()
+            finally:
+                diario.fechar()
+                processador.stats.tempos_fases.update(tempos_abertura)
+                arquivos_gerados = relatorio.fechar(processador.stats)
             
             return {
                 'sucesso': True,
                 'vendas': vendas,
                 'estatisticas': stats,
+                'modelo': relatorio.modelo,
                 'arquivos': arquivos_gerados
             }
             
@@ -350,34 +363,3 @@ class AutomacaoPDV:
                 'sucesso': False,
                 'erro': str(e)
             }
-    
-    def _gerar_relatorio_vendas_texto(self, vendas: List[VendaPDV], stats: EstatisticasExecucao, filename: str = None) -> str:
-        if not filename:
-            filename = f"relatorio_vendas_pdv_{datetime.datetime.now():%Y%m%d_%H%M%S}.txt"
-        
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("RELATÓRIO DE VENDAS - PDV\n")
-            f.write("=" * 80 + "\n")
-            f.write(f"Gerado em: {datetime.datetime.now():%d/%m/%Y %H:%M:%S}\n\n")
-            
-            f.write("ESTATÍSTICAS GERAIS\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"  Total de vendas:     {stats.total_processos}\n")
-            f.write(f"  Vendas com sucesso:  {stats.processos_sucesso}\n")
-            f.write(f"  Vendas com falha:    {stats.processos_falha}\n")
-            f.write(f"  Total de itens:      {stats.total_itens}\n")
-            f.write(f"  Valor total:         R$ {formatar_moeda_br(stats.valor_total)}\n")
-            f.write(f"  Tempo total:         {formatar_numero_br(stats.tempo_total, casas=1, usar_milhar=False)}s\n\n")
-            
-            for venda in vendas:
-                status = "OK" if venda.status == "OK" else "FALHA"
-                f.write(f"\n[{status}] VENDA {venda.numero}\n")
-                f.write("-" * 80 + "\n")
-                f.write(f"  Itens: {len(venda.itens)} (OK: {venda.itens_sucesso}, Falha: {venda.itens_falha})\n")
-                f.write(f"  Valor: R$ {formatar_moeda_br(venda.valor_total)}\n")
-                f.write(f"  Tempo: {formatar_numero_br(venda.tempo_total, casas=1, usar_milhar=False)}s\n")
-        
-        log.info(f"TXT Vendas: {filename}")
-        return filename
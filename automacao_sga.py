@@ -2,53 +2,78 @@
 
 import time
 import random
-import pyautogui
-from pywinauto import Application
-from pywinauto.findwindows import WindowNotFoundError, ElementNotFoundError
 from typing import List, Dict
 from config import Config
 from models import Produto, ItemNota, ResumoNota, EstatisticasExecucao
-from database import RepositorioFirebird, RepositorioMockSGA
-from logger import log
+from database import RepositorioMockSGA
+from logger import log, SEPARADOR
 from ui_dashboard import DashboardExecucao
-from reports import GeradorRelatorios
-from utils import formatar_moeda_br, formatar_numero_br
+from utils import descrever_item
+from dinheiro import formatar_centavos
+from esperas import EsperaAdaptativa
+from drivers import DriverEntrada, obter_driver
+from plano_teclas import CompiladorPlano, ExecutorPlano
+from carga_direta import AutomacaoEntradaBanco, CarregadorDireto
+from diario_execucao import DiarioExecucao, EstadoDiario
+from plano_execucao import GeradorPlano, PlanoExecucao
+from cache_janelas import cache_conexoes, criterios
+from cache_catalogo import CacheCatalogo
+from modo_conexao import NegociadorConexao
+from relatorios_incrementais import RelatorioIncremental
 
 
 class AutomacaoEntradaProdutos:
-    def __init__(self, app, janela, dashboard: DashboardExecucao = None):
+    def __init__(self, app, janela, dashboard: DashboardExecucao = None,
+                 espera: EsperaAdaptativa = None, driver: DriverEntrada = None):
         self.app = app
         self.janela = janela
         self.dashboard = dashboard
         self.tentativas_max = 3
+        self.driver = driver or obter_driver()
+        self.espera = espera or EsperaAdaptativa(
+            self.driver.tela(app, janela),
+            relogio=self.driver.relogio,
+            intervalo=Config.ESPERA_INTERVALO,
+            timeout_padrao=Config.ESPERA_TIMEOUT_PADRAO
+        )
+        self.executor = ExecutorPlano(self.espera, envio=self.driver)
     
     def _log_acao(self, msg: str):
         log.info(msg)
         if self.dashboard:
             self.dashboard.atualizar('log', texto=msg)
     
+    def pausa(self, segundos: float):
+        self.driver.pausa(segundos)
+    
+    def _pressionar(self, tecla: str, timeout: float):
+        """Pressiona a tecla e aguarda a tela reagir (no máximo `timeout`)."""
+        foco = self.espera.capturar_foco()
+        dialogo = self.espera.tela.dialogo_aberto()
+        self.driver.press(tecla)
+        return self.espera.transicao(foco, dialogo, timeout)
+    
+    def _digitar(self, texto: str, timeout: float = None):
+        """Digita o texto e aguarda o campo exibi-lo."""
+        self.driver.write(texto)
+        return self.espera.texto_aceito(texto, Config.DELAY_DIGITACAO if timeout is None else timeout)
+    
     def preencher_cabecalho(self) -> bool:
         self._log_acao("Preenchendo cabecalho...")
         
         try:
-            pyautogui.press('space')
-            time.sleep(0.3)
+            self._pressionar('space', 0.3)
             
             for _ in range(5):
-                pyautogui.press('enter')
-                time.sleep(Config.DELAY_ENTRE_CAMPOS)
+                self._pressionar('enter', Config.DELAY_ENTRE_CAMPOS)
             
-            pyautogui.write('UNICA')
-            time.sleep(Config.DELAY_DIGITACAO)
+            self._digitar('UNICA')
             
             for _ in range(3):
-                pyautogui.press('enter')
-                time.sleep(Config.DELAY_ENTRE_CAMPOS)
+                self._pressionar('enter', Config.DELAY_ENTRE_CAMPOS)
             
-            pyautogui.write(Config.FORNECEDOR_PADRAO)
-            time.sleep(Config.DELAY_DIGITACAO)
-            pyautogui.press('enter')
-            time.sleep(0.5)
+            self._digitar(Config.FORNECEDOR_PADRAO)
+            self._pressionar('enter', 0.5)
             
             return self._salvar_cabecalho()
             
@@ -58,46 +83,20 @@ class AutomacaoEntradaProdutos:
     
     def _salvar_cabecalho(self) -> bool:
         try:
-            self.janela.Btn_Salvar.click()
-            self._log_acao("Cabecalho salvo")
-            return True
+            if self.driver.clicar_botao(self.janela, "Salvar", procurar_descendentes=False):
+                self._log_acao("Cabecalho salvo")
+                return True
         except:
-            pyautogui.press('f10')
-            time.sleep(1)
-            self._log_acao("Cabecalho salvo (F10)")
-            return True
+            pass
+        self._pressionar('f10', 1)
+        self._log_acao("Cabecalho salvo (F10)")
+        return True
     
     def preencher_item(self, item: ItemNota) -> bool:
         produto = item.produto
         
         try:
-            pyautogui.write(produto.codigo)
-            time.sleep(Config.DELAY_DIGITACAO)
-            pyautogui.press('enter')
-            time.sleep(0.5)
-            
-            qtd_str = produto.formatar_quantidade(item.quantidade)
-            pyautogui.write(qtd_str)
-            time.sleep(Config.DELAY_DIGITACAO)
-            
-            for _ in range(3):
-                pyautogui.press('enter')
-                time.sleep(Config.DELAY_ENTRE_CAMPOS)
-            
-            valor_str = f"{item.valor_unitario:.2f}".replace('.', ',')
-            pyautogui.write(valor_str)
-            time.sleep(Config.DELAY_DIGITACAO)
-            
-            for _ in range(2):
-                pyautogui.press('enter')
-                time.sleep(1.5)
-            
-            for _ in range(2):
-                pyautogui.press('enter')
-                time.sleep(1)
-            
-            time.sleep(1)
-            pyautogui.press('enter')
+            self.executor.executar(CompiladorPlano.item_nota(item))
             
             item.finalizar("OK")
             return True
@@ -111,20 +110,12 @@ class AutomacaoEntradaProdutos:
         self._log_acao("Concluindo nota...")
         
         try:
-            try:
-                self.janela.Btn_Concluir.click()
-            except:
-                botoes = self.janela.descendants(control_type="Button")
-                for btn in botoes:
-                    if "concluir" in btn.window_text().lower():
-                        btn.click()
-                        break
-                else:
-                    pyautogui.press('f9')
+            if not self.driver.clicar_botao(self.janela, "Concluir"):
+                self.driver.press('f9')
             
-            time.sleep(Config.DELAY_CONFIRMACAO)
-            pyautogui.press('s')
-            time.sleep(Config.DELAY_TRANSICAO_TELA)
+            self.espera.dialogo_aparecer(Config.DELAY_CONFIRMACAO)
+            self.driver.press('s')
+            self.espera.dialogo_sumir(Config.DELAY_TRANSICAO_TELA)
             
             self._log_acao("Nota concluida")
             return True
@@ -135,72 +126,154 @@ class AutomacaoEntradaProdutos:
 
 
 class ProcessadorNotasFiscais:
-    def __init__(self, db, automacao, total_notas: int, dashboard: DashboardExecucao = None):
+    def __init__(self, db, automacao, total_notas: int, dashboard: DashboardExecucao = None,
+                 diario: DiarioExecucao = None, retomada: EstadoDiario = None,
+                 semente: int = None, plano: PlanoExecucao = None, salvar_plano: str = None,
+                 relatorio: RelatorioIncremental = None, manter_documentos: bool = True,
+                 carregador: CarregadorDireto = None):
         self.db = db
         self.automacao = automacao
+        self.plano = plano
+        self.salvar_plano = salvar_plano
+        if plano is not None:
+            total_notas = len(plano)
         self.total_notas = total_notas
         self.dashboard = dashboard
+        self.diario = diario
+        self.retomada = retomada
+        self.semente = semente
+        self.rng = random.Random(semente) if semente is not None else random
+        self.relatorio = relatorio
+        self.manter_documentos = manter_documentos
+        self.carregador = carregador
         self.resumos = []
         self.stats = EstatisticasExecucao(total_processos=total_notas)
     
+    def _acumular(self, resumo: ResumoNota):
+        self.stats.total_itens += len(resumo.itens)
+        self.stats.itens_sucesso += resumo.itens_sucesso
+        self.stats.itens_falha += resumo.itens_falha
+        self.stats.somar_valor(resumo.valor_total_centavos)
+        self.stats.produtos_un += resumo.total_un
+        self.stats.produtos_kg += resumo.total_kg
+        
+        if resumo.status == 'OK':
+            self.stats.processos_sucesso += 1
+        else:
+            self.stats.processos_falha += 1
+    
+    def _concluir(self, resumo: ResumoNota):
+        if self.manter_documentos:
+            self.resumos.append(resumo)
+        self._acumular(resumo)
+        if self.relatorio:
+            self.relatorio.adicionar(resumo)
+    
+    def _registrar(self, resumos: List[ResumoNota]):
+        """Conclui e registra no diário notas prontas (na carga direta, já gravadas)."""
+        for resumo in resumos:
+            self._concluir(resumo)
+            if self.diario:
+                self.diario.registrar_documento(resumo)
+    
+    def _entregar(self, resumo: ResumoNota):
+        if self.carregador:
+            self._registrar(self.carregador.adicionar(resumo))
+        else:
+            self._registrar([resumo])
+    
+    def _retomar(self) -> int:
+        """Recarrega as notas já concluídas do diário; retorna a próxima nota."""
+        self.stats.inicio_execucao = self.retomada.inicio
+        for resumo in self.retomada.documentos:
+            self._concluir(resumo)
+        
+        primeira = self.retomada.proximo_documento
+        log.warning(f"Retomando na nota {primeira}/{self.total_notas} "
+                    f"({len(self.retomada.documentos)} notas recuperadas do diário)")
+        if self.diario:
+            self.diario.registrar_retomada(primeira)
+        return primeira
+    
     def executar(self):
         inicio = time.time()
         
         try:
-            if not self.db.conectar():
-                raise RuntimeError("Falha na conexao")
-            
-            produtos = self.db.buscar_produtos()
-            if not produtos:
-                raise ValueError("Sem produtos")
+            if self.retomada:
+                selecionados = self.retomada.produtos
+                primeira = self._retomar()
+            elif self.plano is not None:
+                selecionados = self.plano.produtos
+                primeira = 1
+                log.info(f"Executando plano carregado: {self.plano.total_itens} itens em {len(self.plano)} documentos")
+                if self.diario:
+                    self.diario.registrar_plano(self.total_notas, selecionados)
+            else:
+                if not self.db.conectar():
+                    raise RuntimeError("Falha na conexao")
+                
+                amostra, total = self.db.amostrar_produtos(Config.MAX_PRODUTOS_SELECAO_SGA, self.semente)
+                self.db.fechar()
+                selecionados = self._selecionar_produtos(amostra, total)
+                if not selecionados:
+                    raise ValueError("Sem produtos")
+                
+                primeira = 1
+                if self.diario:
+                    self.diario.registrar_plano(self.total_notas, selecionados)
             
-            selecionados = self._selecionar_produtos(produtos)
+            if self.plano is None:
+                self.plano = self._gerar_plano(selecionados)
+                if self.salvar_plano:
+                    log.info(f"Plano salvo em: {self.plano.salvar(self.salvar_plano)}")
             
-            for num in range(1, self.total_notas + 1):
+            for num in range(primeira, self.total_notas + 1):
                 if self.dashboard:
                     pct = (num - 1) / self.total_notas * 100
                     self.dashboard.atualizar('progresso', percentual=pct, 
                                            texto=f"Nota {num} de {self.total_notas}")
                     self.dashboard.atualizar('status', texto=f"Processando nota {num}...")
                 
-                resumo = self._processar_nota(num, selecionados)
-                self.resumos.append(resumo)
-                
-                self.stats.total_itens += len(resumo.itens)
-                self.stats.itens_sucesso += resumo.itens_sucesso
-                self.stats.itens_falha += resumo.itens_falha
-                self.stats.valor_total += resumo.valor_total
-                self.stats.produtos_un += resumo.total_un
-                self.stats.produtos_kg += resumo.total_kg
-                
-                if resumo.status == 'OK':
-                    self.stats.processos_sucesso += 1
-                else:
-                    self.stats.processos_falha += 1
+                self._entregar(self._processar_nota(num, selecionados))
                 
                 if self.dashboard:
                     tempo_decorrido = int(time.time() - inicio)
                     mins, secs = divmod(tempo_decorrido, 60)
                     self.dashboard.atualizar('stats', 
                                            itens=self.stats.total_itens,
-                                           valor=self.stats.valor_total,
+                                           valor=self.stats.valor_total_centavos,
                                            tempo=f"{mins:02d}:{secs:02d}")
                 
                 if num < self.total_notas:
-                    time.sleep(2)
+                    self.automacao.pausa(2)
+            
+            if self.carregador:
+                self._registrar(self.carregador.descarregar())
             
             self.stats.finalizar()
+            if self.diario:
+                self.diario.registrar_fim()
             return self.resumos, self.stats
             
         finally:
             self.db.fechar()
     
-    def _selecionar_produtos(self, produtos: List[Produto]) -> List[Produto]:
-        n = min(random.randint(Config.MIN_PRODUTOS_SELECAO_SGA, 
-                              min(Config.MAX_PRODUTOS_SELECAO_SGA, len(produtos))), 
-                len(produtos))
-        selecionados = random.sample(produtos, n)
-        random.shuffle(selecionados)
+    def _gerar_plano(self, produtos: List[Produto]) -> PlanoExecucao:
+        """Sorteia de uma vez itens, produtos e quantidades de todas as notas."""
+        plano = GeradorPlano(produtos, self.semente).gerar(
+            self.total_notas, Config.MIN_ITENS_POR_NOTA_SGA, Config.MAX_ITENS_POR_NOTA_SGA)
+        log.info(f"Plano gerado: {plano.total_itens} itens em {len(plano)} notas (entropia {plano.entropia})")
+        return plano
+    
+    def _selecionar_produtos(self, amostra: List[Produto], total: int) -> List[Produto]:
+        """Escolhe quantos produtos usar a partir da amostra sorteada no repositório."""
+        if not amostra:
+            return []
+        n = min(self.rng.randint(min(Config.MIN_PRODUTOS_SELECAO_SGA, total), 
+                              min(Config.MAX_PRODUTOS_SELECAO_SGA, total)), 
+                total)
+        self.rng.shuffle(amostra)
+        selecionados = amostra[:n]
         log.info(f"{len(selecionados)} produtos selecionados para uso")
         return selecionados
     
@@ -215,26 +288,25 @@ class ProcessadorNotasFiscais:
             resumo.finalizar('ERRO', 'Falha no cabecalho')
             return resumo
         
-        time.sleep(Config.DELAY_TRANSICAO_TELA)
+        self.automacao.pausa(Config.DELAY_TRANSICAO_TELA)
         
-        qtd_itens = random.randint(Config.MIN_ITENS_POR_NOTA_SGA, Config.MAX_ITENS_POR_NOTA_SGA)
+        itens_plano = self.plano.itens_documento(numero - 1)
+        qtd_itens = len(itens_plano)
         itens = []
         
-        for i in range(qtd_itens):
-            prod = random.choice(produtos)
-            qtd = prod.gerar_quantidade()
-            valor_unit = prod.calcular_valor_unitario()
-            
+        for i, (prod, qtd, valor_unit) in enumerate(itens_plano):
             item = ItemNota(produto=prod, quantidade=qtd, valor_unitario=valor_unit)
             
-            qtd_txt = formatar_numero_br(qtd, casas=3, usar_milhar=False) if prod.unidade.upper() == 'KG' else str(int(qtd))
-            log.info(f"  Item {i+1}/{qtd_itens}: {prod.codigo} | {qtd_txt} {prod.unidade} | R$ {formatar_moeda_br(valor_unit)}")
+            log.info(descrever_item, i + 1, qtd_itens, prod, qtd, valor_unit)
             
             if self.automacao.preencher_item(item):
                 itens.append(item)
             else:
                 log.error(f"  Falha no item {i+1}")
                 itens.append(item)
+            
+            if self.diario:
+                self.diario.registrar_item(numero, item)
         
         resumo.itens = itens
         
@@ -242,7 +314,7 @@ class ProcessadorNotasFiscais:
             log.warning(f"Possivel falha ao concluir nota {numero}")
         
         resumo.finalizar('OK')
-        log.info(f"Nota {numero} finalizada: {len(itens)} itens, R$ {formatar_moeda_br(resumo.valor_total)}")
+        log.info(f"Nota {numero} finalizada: {len(itens)} itens, R$ {formatar_centavos(resumo.valor_total_centavos)}")
         
         return resumo
 
@@ -250,50 +322,63 @@ class ProcessadorNotasFiscais:
 class AutomacaoSGA:
     """Classe para automações do sistema SGA."""
     
-    def __init__(self, dashboard: DashboardExecucao = None):
+    def __init__(self, dashboard: DashboardExecucao = None, driver: DriverEntrada = None):
         self.dashboard = dashboard
+        self.driver = driver or obter_driver()
     
     def executar_fluxo_entrada_produtos(self, config: Dict):
-        log.info("=" * 60)
+        log.info(SEPARADOR)
         log.info("EXECUTANDO FLUXO: ENTRADA DE PRODUTOS - SGA")
-        log.info("=" * 60)
+        log.info(SEPARADOR)
         
         try:
-            app, janela = self._conectar_aplicacao(Config.JANELA_SGA)
-            automacao = AutomacaoEntradaProdutos(app, janela, self.dashboard)
+            carga_direta = config.get('modo_entrada_sga', 'GUI') == 'BANCO'
+            if carga_direta:
+                log.info("Modo carga direta: notas gravadas no banco, sem digitação")
+                automacao = AutomacaoEntradaBanco()
+            else:
+                app, janela = self._conectar_aplicacao(Config.JANELA_SGA)
+                automacao = AutomacaoEntradaProdutos(app, janela, self.dashboard, driver=self.driver)
             
-            if config.get('usar_mock_sga', False):
-                db = RepositorioMockSGA()
+            db = self._criar_repositorio(config, usar_cache=True)
+            carregador = self._abrir_carga_direta(config) if carga_direta else None
+            
+            retomada = config.get('retomada')
+            if retomada:
+                diario = DiarioExecucao.reabrir(retomada)
             else:
-                db = RepositorioFirebird(
-                    caminho=config.get('caminho_bd_sga', ''),
-                    usuario=Config.DB_USER,
-                    senha=Config.DB_PASSWORD,
-                    consulta_sql=Config.SISTEMAS_DISPONIVEIS['SGA']['consultas']['Entrada de Produtos'],
-                    host='localhost',
-                    porta=3050
-                )
+                diario = DiarioExecucao.novo('SGA', 'Entrada de Produtos', config)
+            log.info(f"Diário da execução: {diario.caminho}")
+            relatorio = RelatorioIncremental('SGA')
             
             processador = ProcessadorNotasFiscais(
                 db=db,
                 automacao=automacao,
                 total_notas=config.get('quantidade_notas_sga', 1),
-                dashboard=self.dashboard
+                plano=PlanoExecucao.carregar(config['arquivo_plano']) if config.get('arquivo_plano') else None,
+                salvar_plano=config.get('salvar_plano'),
+                dashboard=self.dashboard,
+                diario=diario,
+                retomada=retomada,
+                semente=config.get('semente_amostragem'),
+                relatorio=relatorio,
+                manter_documentos=False,
+                carregador=carregador
             )
             
-            resumos, stats = processador.executar()
-            
-            if self.dashboard:
-                self.dashboard.atualizar('status', texto="Gerando relatórios...")
-            
-            arquivos_gerados = []
-            arquivos_gerados.append(GeradorRelatorios.gerar_relatorio_texto(resumos, stats))
-            arquivos_gerados.append(log.exportar_csv(resumos))
+            try:
+                resumos, stats = processador.executar()
+            finally:
+                diario.fechar()
+                arquivos_gerados = relatorio.fechar(processador.stats)
+                if carregador:
+                    carregador.conexao.close()
             
             return {
                 'sucesso': True,
                 'resumos': resumos,
                 'estatisticas': stats,
+                'modelo': relatorio.modelo,
                 'arquivos': arquivos_gerados
             }
             
@@ -304,30 +389,66 @@ class AutomacaoSGA:
                 'erro': str(e)
             }
     
+    def _criar_repositorio(self, config: Dict, usar_cache: bool = False):
+        if config.get('usar_mock_sga', False):
+            return RepositorioMockSGA()
+        return NegociadorConexao().criar_repositorio(
+            caminho=config.get('caminho_bd_sga', ''),
+            usuario=Config.DB_USER,
+            senha=Config.DB_PASSWORD,
+            consulta_sql=Config.SISTEMAS_DISPONIVEIS['SGA']['consultas']['Entrada de Produtos'],
+            cache_catalogo=CacheCatalogo() if usar_cache and Config.CACHE_CATALOGO else None
+        )
+    
+    def _abrir_carga_direta(self, config: Dict) -> CarregadorDireto:
+        """Conexão de gravação da carga direta, com o esquema já conferido."""
+        if config.get('usar_mock_sga', False):
+            carregador = CarregadorDireto.sqlite(Config.CARGA_SQLITE_TESTE)
+        else:
+            carregador = CarregadorDireto.firebird(
+                config.get('caminho_bd_sga', ''), Config.DB_USER, Config.DB_PASSWORD)
+        try:
+            carregador.validar()
+        except Exception:
+            carregador.conexao.close()
+            raise
+        return carregador
+    
     def _conectar_aplicacao(self, titulo_janela: str):
         log.info(f"Conectando a aplicacao: {titulo_janela}")
-        time.sleep(3)
         
-        tentativas = [
-            lambda: Application(backend="uia").connect(title=titulo_janela),
-            lambda: Application(backend="uia").connect(title_re=f".*{titulo_janela}.*"),
-            lambda: Application(backend="win32").connect(title=titulo_janela),
-            lambda: Application(backend="win32").connect(title_re=f".*{titulo_janela}.*"),
-        ]
+        viva = cache_conexoes.conexao_viva(titulo_janela)
+        if viva:
+            app, janela, estrategia = viva
+            if self.driver.janela_existe(janela):
+                try:
+                    janela.set_focus()
+                except:
+                    pass
+                log.info(f"Reutilizando conexao ativa ({estrategia[0]}/{estrategia[1]})")
+                return app, janela
+            cache_conexoes.descartar(titulo_janela)
+        
+        salva = cache_conexoes.estrategia_salva(titulo_janela)
+        if not salva:
+            # Sem estratégia conhecida: dá tempo para a tela ficar visível
+            self.driver.pausa(3)
         
         app = None
         janela = None
-        metodo_encontrado = None
+        estrategia_encontrada = None
         
-        for i, tentativa in enumerate(tentativas):
+        for estrategia in cache_conexoes.ordem_tentativas(titulo_janela):
+            backend, criterio = estrategia
+            busca = criterios(titulo_janela, criterio)
             try:
-                app = tentativa()
+                if estrategia == salva:
+                    app = self.driver.conectar_aplicacao(backend, timeout=Config.CONEXAO_TIMEOUT_RAPIDO, **busca)
+                else:
+                    app = self.driver.conectar_aplicacao(backend, **busca)
                 
                 try:
-                    if i == 0 or i == 2:
-                        janela = app.window(title=titulo_janela)
-                    else:
-                        janela = app.window(title_re=f".*{titulo_janela}.*")
+                    janela = app.window(**busca)
                 except:
                     janelas = app.windows()
                     if janelas:
@@ -338,11 +459,11 @@ class AutomacaoSGA:
                         janela.set_focus()
                     except:
                         pass
-                    metodo_encontrado = i
+                    estrategia_encontrada = estrategia
                     break
                     
-            except (WindowNotFoundError, ElementNotFoundError, Exception) as e:
-                log.debug(f"Tentativa {i} falhou: {e}")
+            except Exception as e:
+                log.debug(f"Estrategia {backend}/{criterio} falhou: {e}")
                 continue
         
         if not app or not janela:
@@ -351,6 +472,8 @@ class AutomacaoSGA:
                 f"Certifique-se de que a tela está aberta e visível."
             )
         
-        log.info(f"Conectado com sucesso (método {metodo_encontrado + 1})")
-        time.sleep(1)
+        cache_conexoes.registrar(titulo_janela, estrategia_encontrada, app, janela)
+        log.info(f"Conectado com sucesso ({estrategia_encontrada[0]}/{estrategia_encontrada[1]})")
+        if not salva:
+            self.driver.pausa(1)
         return app, janela
@@ -0,0 +1,252 @@
+"""Medições de desempenho que rodam sem desktop (ex.: CI em Linux).
+
+Uso: python benchmarks.py [nome ...]
+"""
+
+import os
+import sys
+import time
+import logging
+import tracemalloc
+from config import Config
+from drivers import DriverHeadless, definir_driver
+from esperas import EsperaAdaptativa, Tela
+from models import Produto, ItemNota, ItemVenda
+from plano_teclas import CompiladorPlano, ExecutorPlano
+
+
+def _itens_exemplo(classe, n: int):
+    produtos = [Produto(f"{100000 + i:06d}", 10.0 + i, 'UN' if i % 3 else 'KG') for i in range(1, 31)]
+    itens = []
+    for i in range(n):
+        prod = produtos[i % len(produtos)]
+        qtd = 1.5 if prod.unidade == 'KG' else 3.0
+        itens.append(classe(produto=prod, quantidade=qtd, valor_unitario=prod.calcular_valor_unitario()))
+    return itens
+
+
+def benchmark_planos(n_itens: int = 20000) -> dict:
+    """Compila e reexecuta planos de teclas contra o driver headless."""
+    resultado = {}
+    for nome, classe, compilar in (
+        ('sga', ItemNota, CompiladorPlano.item_nota),
+        ('pdv', ItemVenda, CompiladorPlano.item_venda),
+    ):
+        itens = _itens_exemplo(classe, n_itens)
+        driver = DriverHeadless(gravar=False)
+        relogio = driver.relogio
+        executor = ExecutorPlano(EsperaAdaptativa(Tela(), relogio), envio=driver)
+        
+        inicio = time.perf_counter()
+        for item in itens:
+            executor.executar(compilar(item))
+        decorrido = time.perf_counter() - inicio
+        
+        resultado[nome] = {
+            'itens': n_itens,
+            'itens_por_segundo': n_itens / decorrido if decorrido else float('inf'),
+            'chamadas_por_item': executor.chamadas / n_itens,
+            'teclas_por_item': executor.teclas_enviadas / n_itens,
+            'espera_simulada_por_item': relogio.agora() / n_itens,
+        }
+    return resultado
+
+
+def _silenciar_console():
+    from logger import log
+    for handler in log.logger.handlers:
+        handler.setLevel(logging.ERROR)
+
+
+def benchmark_orquestracao(n_notas: int = 300, n_vendas: int = 300, latencia: float = 0.0) -> dict:
+    """Executa os processadores completos (SGA e PDV) sobre o driver headless.
+
+    Mede o custo de orquestração (modelos, planos, esperas, log) por item;
+    `latencia` simula o tempo de cada evento de entrada no relógio simulado.
+    """
+    from automacao_sga import AutomacaoEntradaProdutos, ProcessadorNotasFiscais
+    from automacao_pdv import ProcessadorVendasPDV
+    from database import RepositorioMockSGA, RepositorioMockPDV
+    _silenciar_console()
+    
+    resultado = {}
+    cenarios = (
+        ('sga', n_notas, lambda driver: ProcessadorNotasFiscais(
+            RepositorioMockSGA(),
+            AutomacaoEntradaProdutos(None, None, driver=driver),
+            n_notas)),
+        ('pdv', n_vendas, lambda driver: ProcessadorVendasPDV(
+            RepositorioMockPDV(), n_vendas, driver=driver)),
+    )
+    for nome, total, criar in cenarios:
+        driver = DriverHeadless(latencia=latencia, titulos=[Config.JANELA_SGA, Config.JANELA_PDV])
+        definir_driver(driver)
+        processador = criar(driver)
+        
+        inicio = time.perf_counter()
+        _, stats = processador.executar()
+        decorrido = time.perf_counter() - inicio
+        
+        resultado[nome] = {
+            'documentos': total,
+            'itens': stats.total_itens,
+            'itens_por_segundo': stats.total_itens / decorrido if decorrido else float('inf'),
+            'eventos_entrada': driver.total_eventos,
+            'tempo_simulado_s': driver.relogio.agora(),
+        }
+    return resultado
+
+
+def benchmark_carga_direta(n_notas: int = 5000, itens_por_nota: int = 10) -> dict:
+    """Grava notas geradas num SQLite em memória pelo CarregadorDireto."""
+    from carga_direta import CarregadorDireto
+    from models import ResumoNota
+    _silenciar_console()
+    
+    itens = _itens_exemplo(ItemNota, n_notas * itens_por_nota)
+    notas = [ResumoNota(numero=n + 1, itens=itens[n * itens_por_nota:(n + 1) * itens_por_nota])
+             for n in range(n_notas)]
+    carregador = CarregadorDireto.sqlite(":memory:")
+    
+    inicio = time.perf_counter()
+    carregador.gravar(notas)
+    decorrido = time.perf_counter() - inicio
+    
+    return {'sqlite': {
+        'notas': n_notas,
+        'itens': carregador.itens_gravados,
+        'notas_por_segundo': n_notas / decorrido if decorrido else float('inf'),
+        'itens_por_segundo': carregador.itens_gravados / decorrido if decorrido else float('inf'),
+    }}
+
+
+def _memoria(criar) -> tuple:
+    tracemalloc.start()
+    try:
+        objeto = criar()
+        atual, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return objeto, atual
+
+
+def benchmark_memoria(n_itens: int = 200000) -> dict:
+    """Memória por item: dataclasses atuais x variantes com __slots__."""
+    from modelos_compactos import ProdutoCompacto, ItemNotaCompacto
+    
+    produtos = [Produto(f"{100000 + i:06d}", 10.0 + i, 'UN' if i % 3 else 'KG') for i in range(1, 31)]
+    compactos = [ProdutoCompacto.de(p) for p in produtos]
+    
+    def criar(classe, catalogo):
+        def itens():
+            lista = [classe(catalogo[i % 30], 3.0, 9.99) for i in range(n_itens)]
+            for item in lista:
+                item.finalizar("OK")
+            return lista
+        return itens
+    
+    resultado = {}
+    for nome, criar_itens in (('dataclass', criar(ItemNota, produtos)),
+                              ('slots', criar(ItemNotaCompacto, compactos))):
+        _, memoria = _memoria(criar_itens)
+        resultado[nome] = {
+            'itens': n_itens,
+            'bytes_por_item': memoria / n_itens,
+            'mb_total': memoria / 1e6,
+        }
+    return resultado
+
+
+def benchmark_plano_execucao(n_documentos: int = 100000, max_itens: int = 19) -> dict:
+    """Sorteio vetorizado do plano de execução (NumPy) para ~1 milhão de itens."""
+    from plano_execucao import GeradorPlano
+    
+    produtos = [Produto(f"{100000 + i:06d}", 10.0 + i, 'UN' if i % 3 else 'KG') for i in range(1, 31)]
+    gerador = GeradorPlano(produtos, semente=2024)
+    
+    inicio = time.perf_counter()
+    plano = gerador.gerar(n_documentos, 1, max_itens)
+    decorrido = time.perf_counter() - inicio
+    
+    return {'numpy': {
+        'documentos': n_documentos,
+        'itens': plano.total_itens,
+        'segundos': decorrido,
+        'itens_por_segundo': plano.total_itens / decorrido if decorrido else float('inf'),
+    }}
+
+
+def benchmark_totais(n_documentos: int = 100000, max_itens: int = 19) -> dict:
+    """Totais de ~1 milhão de itens: soma em float vs. centavos inteiros (NumPy)."""
+    from plano_execucao import GeradorPlano
+    
+    produtos = [Produto(f"{100000 + i:06d}", 10.0 + i * 0.37, 'UN' if i % 3 else 'KG') for i in range(1, 31)]
+    plano = GeradorPlano(produtos, semente=2024).gerar(n_documentos, 1, max_itens)
+    quantidades = plano.quantidade.tolist()
+    valores = plano.valor_unitario.tolist()
+    
+    inicio = time.perf_counter()
+    total_float = sum(q * v for q, v in zip(quantidades, valores))
+    tempo_float = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    total_centavos = plano.valor_total_centavos
+    tempo_centavos = time.perf_counter() - inicio
+    
+    return {
+        'float': {'itens': plano.total_itens, 'segundos': tempo_float, 'total': round(total_float, 2)},
+        'centavos': {'itens': plano.total_itens, 'segundos': tempo_centavos, 'total': total_centavos / 100},
+    }
+
+
+def benchmark_logger(n_mensagens: int = 50000) -> dict:
+    """Mensagens/s do log num arquivo: uma por vez (como antes) vs. em bloco."""
+    import tempfile
+    from logger import log
+    
+    _silenciar_console()
+    resultado = {}
+    lote_original = log.lote_max
+    for nome, lote in (('uma_por_vez', 1), ('em_bloco', lote_original)):
+        with tempfile.TemporaryDirectory() as pasta:
+            handler = logging.FileHandler(os.path.join(pasta, 'bench.log'), encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s | %(levelname)-8s | %(funcName)-20s | %(message)s'))
+            log.descarregar()
+            log.lote_max = lote
+            log.logger.addHandler(handler)
+            try:
+                inicio = time.perf_counter()
+                for i in range(n_mensagens):
+                    log.debug(f"Item {i} processado")
+                log.descarregar(prazo=120)
+                decorrido = time.perf_counter() - inicio
+            finally:
+                log.logger.removeHandler(handler)
+                handler.close()
+                log.lote_max = lote_original
+        resultado[nome] = {
+            'mensagens': n_mensagens,
+            'segundos': decorrido,
+            'mensagens_por_segundo': n_mensagens / decorrido if decorrido else float('inf'),
+        }
+    return resultado
+
+
+BENCHMARKS = {
+    'planos': benchmark_planos,
+    'orquestracao': benchmark_orquestracao,
+    'carga_direta': benchmark_carga_direta,
+    'memoria': benchmark_memoria,
+    'plano_execucao': benchmark_plano_execucao,
+    'totais': benchmark_totais,
+    'logger': benchmark_logger,
+}
+
+
+if __name__ == "__main__":
+    nomes = sys.argv[1:] or list(BENCHMARKS)
+    for nome in nomes:
+        print(f"== {nome}")
+        for chave, valores in BENCHMARKS[nome]().items():
+            print(f"  {chave}: " + ", ".join(
+                f"{k}={v:,.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in valores.items()))
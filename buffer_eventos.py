@@ -0,0 +1,87 @@
+"""Eventos do log com memória limitada: buffer circular + arquivo de transbordo.
+
+Os `capacidade` eventos mais recentes ficam em memória; quando o buffer
+enche, os mais antigos vão em bloco para um arquivo só de acréscimo (uma
+linha JSON compacta por evento). A iteração percorre o arquivo e depois o
+buffer, então a análise pós-execução continua vendo todos os eventos.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterator, List
+
+
+class BufferEventos:
+    """Lista de eventos só de acréscimo, com os antigos transbordando para disco."""
+    
+    def __init__(self, capacidade: int = 10000, lote_transbordo: int = 1000, arquivo: str = None):
+        self.capacidade = max(1, capacidade)
+        self.lote_transbordo = max(1, min(lote_transbordo, self.capacidade))
+        self.arquivo = arquivo
+        self.transbordados = 0
+        self._recentes = deque()
+        self._saida = None
+        self._temporario = arquivo is None
+        self._lock = threading.Lock()
+    
+    def _abrir_saida(self):
+        if self._saida is None:
+            if self.arquivo is None:
+                descritor, self.arquivo = tempfile.mkstemp(prefix='eventos_', suffix='.jsonl')
+                os.close(descritor)
+            self._saida = open(self.arquivo, 'a', encoding='utf-8')
+        return self._saida
+    
+    def _transbordar(self, quantidade: int):
+        saida = self._abrir_saida()
+        linhas = [json.dumps(self._recentes.popleft(), ensure_ascii=False, separators=(',', ':'), default=str)
+                  for _ in range(quantidade)]
+        saida.write('\n'.join(linhas) + '\n')
+        self.transbordados += quantidade
+    
+    def append(self, evento: Dict):
+        with self._lock:
+            self._recentes.append(evento)
+            if len(self._recentes) > self.capacidade:
+                self._transbordar(self.lote_transbordo)
+    
+    def __len__(self) -> int:
+        return self.transbordados + len(self._recentes)
+    
+    def recentes(self, n: int = None) -> List[Dict]:
+        """Últimos `n` eventos (todos os que estão em memória se `n` for None)."""
+        with self._lock:
+            eventos = list(self._recentes)
+        return eventos if n is None else eventos[-n:]
+    
+    def __iter__(self) -> Iterator[Dict]:
+        with self._lock:
+            if self._saida is not None:
+                self._saida.flush()
+            transbordados = self.transbordados
+            recentes = list(self._recentes)
+        
+        if transbordados:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                for linha in islice(f, transbordados):
+                    yield json.loads(linha)
+        yield from recentes
+    
+    def fechar(self):
+        """Fecha o arquivo de transbordo; o temporário é apagado."""
+        with self._lock:
+            if self._saida is not None:
+                self._saida.close()
+                self._saida = None
+            if self._temporario and self.arquivo and os.path.exists(self.arquivo):
+                try:
+                    os.remove(self.arquivo)
+                except OSError:
+                    pass
+                self.arquivo = None
+            self._recentes.clear()
+            self.transbordados = 0
@@ -0,0 +1,103 @@
+"""Cópia local do catálogo de produtos, gravada ao lado do config.ini.
+
+A chave é (caminho do banco, tamanho, mtime, texto da consulta): enquanto o
+arquivo do banco não mudar, o catálogo é lido daqui sem abrir conexão. O
+formato é uma linha JSON com a chave seguida de uma linha TSV por produto.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+from models import Produto
+from logger import log
+
+
+class GravacaoCatalogo:
+    """Snapshot gravado aos poucos; só substitui o anterior em `concluir`."""
+    
+    def __init__(self, arquivo: str, chave: Dict):
+        self.arquivo = arquivo
+        self.temporario = arquivo + ".tmp"
+        self._f = open(self.temporario, 'w', encoding='utf-8', newline="\n")
+        self._f.write(json.dumps(chave, ensure_ascii=False) + "\n")
+    
+    def escrever(self, produtos: Iterable[Produto]):
+        self._f.writelines(f"{p.codigo}\t{p.valor_avista!r}\t{p.unidade}\n" for p in produtos)
+    
+    def concluir(self) -> str:
+        self._f.close()
+        os.replace(self.temporario, self.arquivo)
+        return self.arquivo
+    
+    def descartar(self):
+        self._f.close()
+        try:
+            os.remove(self.temporario)
+        except OSError:
+            pass
+
+
+class CacheCatalogo:
+    """Lê e grava snapshots do catálogo filtrado por banco + consulta."""
+    
+    VERSAO = 1
+    
+    def __init__(self, diretorio: str = None):
+        self.diretorio = diretorio or os.path.dirname(os.path.abspath('config.ini'))
+    
+    @staticmethod
+    def _normalizar(caminho_bd: str) -> str:
+        return os.path.normcase(os.path.abspath(caminho_bd))
+    
+    def arquivo(self, caminho_bd: str, consulta_sql: str) -> str:
+        nome = hashlib.sha1(f"{self._normalizar(caminho_bd)}\n{consulta_sql}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.diretorio, f"catalogo_{nome}.cache")
+    
+    def chave(self, caminho_bd: str, consulta_sql: str) -> Optional[Dict]:
+        """Identidade atual do banco; None se o arquivo não está acessível."""
+        try:
+            info = os.stat(caminho_bd)
+        except OSError:
+            return None
+        return {
+            'versao': self.VERSAO,
+            'caminho': self._normalizar(caminho_bd),
+            'tamanho': info.st_size,
+            'mtime_ns': info.st_mtime_ns,
+            'consulta': consulta_sql,
+        }
+    
+    def carregar(self, caminho_bd: str, consulta_sql: str, aceitar_antigo: bool = False) -> Optional[List[Produto]]:
+        """Produtos do snapshot se a chave confere (ou se `aceitar_antigo`)."""
+        arquivo = self.arquivo(caminho_bd, consulta_sql)
+        if not os.path.exists(arquivo):
+            return None
+        
+        try:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                salva = json.loads(f.readline())
+                if not aceitar_antigo and salva != self.chave(caminho_bd, consulta_sql):
+                    return None
+                produtos = []
+                for linha in f:
+                    codigo, valor, unidade = linha.rstrip("\n").split("\t")
+                    produtos.append(Produto(codigo, float(valor), unidade))
+        except (OSError, ValueError) as e:
+            log.warning(f"Cache de catalogo ignorado ({os.path.basename(arquivo)}): {e}")
+            return None
+        
+        return produtos
+    
+    def iniciar_gravacao(self, caminho_bd: str, consulta_sql: str) -> Optional[GravacaoCatalogo]:
+        chave = self.chave(caminho_bd, consulta_sql)
+        if chave is None:
+            return None
+        return GravacaoCatalogo(self.arquivo(caminho_bd, consulta_sql), chave)
+    
+    def salvar(self, caminho_bd: str, consulta_sql: str, produtos: List[Produto]) -> Optional[str]:
+        gravacao = self.iniciar_gravacao(caminho_bd, consulta_sql)
+        if gravacao is None:
+            return None
+        gravacao.escrever(produtos)
+        return gravacao.concluir()
@@ -0,0 +1,75 @@
+"""Cache de conexão às janelas: lembra a estratégia que funcionou e o handle vivo.
+
+A estratégia vencedora (backend + critério de título) é salva no config.ini,
+seção [CONEXOES], e tentada primeiro com timeout curto nas próximas execuções.
+Dentro do processo, o par (app, janela) é reaproveitado enquanto existir.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from settings_manager import SettingsManager
+
+
+# (backend, critério) na ordem histórica de _conectar_aplicacao
+ESTRATEGIAS: List[Tuple[str, str]] = [
+    ("uia", "title"),
+    ("uia", "title_re"),
+    ("win32", "title"),
+    ("win32", "title_re"),
+]
+
+
+def criterios(titulo: str, criterio: str) -> Dict[str, str]:
+    if criterio == "title":
+        return {"title": titulo}
+    return {"title_re": f".*{titulo}.*"}
+
+
+class CacheConexoes:
+    """Estratégias por título (persistidas) e conexões vivas (por processo)."""
+    
+    SECAO = 'CONEXOES'
+    
+    def __init__(self, settings: SettingsManager = None):
+        self._settings = settings
+        self._vivas: Dict[str, tuple] = {}
+    
+    @property
+    def settings(self) -> SettingsManager:
+        if self._settings is None:
+            self._settings = SettingsManager()
+        return self._settings
+    
+    @staticmethod
+    def _chave(titulo: str) -> str:
+        return titulo.strip().lower().replace('=', '_').replace(':', '_')
+    
+    def estrategia_salva(self, titulo: str) -> Optional[Tuple[str, str]]:
+        valor = self.settings.get(self.SECAO, self._chave(titulo), '')
+        if not valor:
+            return None
+        backend, _, criterio = valor.partition('/')
+        estrategia = (backend, criterio)
+        return estrategia if estrategia in ESTRATEGIAS else None
+    
+    def ordem_tentativas(self, titulo: str) -> List[Tuple[str, str]]:
+        salva = self.estrategia_salva(titulo)
+        if not salva:
+            return list(ESTRATEGIAS)
+        return [salva] + [e for e in ESTRATEGIAS if e != salva]
+    
+    def registrar(self, titulo: str, estrategia: Tuple[str, str], app, janela):
+        self._vivas[titulo] = (app, janela, estrategia)
+        if self.estrategia_salva(titulo) != estrategia:
+            self.settings.set(self.SECAO, self._chave(titulo), f"{estrategia[0]}/{estrategia[1]}")
+            self.settings.save()
+    
+    def conexao_viva(self, titulo: str):
+        """Retorna (app, janela, estrategia) em cache, ou None."""
+        return self._vivas.get(titulo)
+    
+    def descartar(self, titulo: str):
+        self._vivas.pop(titulo, None)
+
+
+# Compartilhado entre fluxos e tentativas do mesmo processo
+cache_conexoes = CacheConexoes()
@@ -0,0 +1,260 @@
+"""Carga direta no banco: grava ResumoNota/ItemNota em lote, sem digitação.
+
+O mapeamento tabela/coluna fica em `Config.MAPEAMENTO_CARGA_DIRETA` e é
+conferido no catálogo do banco antes da execução: se faltar tabela, coluna ou
+gerador, a carga não roda. Os números das notas vêm do gerador da tabela
+(GEN_ID), como no próprio SGA. O mesmo SQL de INSERT (parâmetros '?') roda no
+Firebird (fdb) e no SQLite usado como banco substituto em testes, onde o
+gerador é emulado por uma tabela de uma linha.
+"""
+
+try:
+    import fdb
+except ImportError:  # sem fdb, só o banco substituto (SQLite) está disponível
+    fdb = None
+import sqlite3
+from typing import Dict, List, Sequence
+from config import Config
+from models import ResumoNota, ItemNota
+from logger import log
+
+
+# Campos disponíveis para o mapeamento de cada tabela
+CAMPOS_NOTA = {
+    'numero': lambda nota, numero, fornecedor: numero,
+    'data': lambda nota, numero, fornecedor: nota.timestamp_inicio,
+    'fornecedor': lambda nota, numero, fornecedor: fornecedor,
+    'total_itens': lambda nota, numero, fornecedor: len(nota.itens),
+    'quantidade_total': lambda nota, numero, fornecedor: nota.quantidade_milesimos / 1000,
+    'valor_total': lambda nota, numero, fornecedor: nota.valor_total_centavos / 100,
+}
+
+CAMPOS_ITEM = {
+    'numero_nota': lambda item, numero, seq: numero,
+    'sequencia': lambda item, numero, seq: seq,
+    'codigo_produto': lambda item, numero, seq: item.produto.codigo,
+    'unidade': lambda item, numero, seq: item.produto.unidade,
+    'quantidade': lambda item, numero, seq: item.quantidade,
+    'valor_unitario': lambda item, numero, seq: item.valor_unitario_centavos / 100,
+    'valor_total': lambda item, numero, seq: item.valor_total_centavos / 100,
+}
+
+TIPOS_SQLITE = {
+    'numero': 'INTEGER', 'numero_nota': 'INTEGER', 'sequencia': 'INTEGER',
+    'total_itens': 'INTEGER', 'data': 'TIMESTAMP',
+    'quantidade_total': 'NUMERIC', 'quantidade': 'NUMERIC',
+    'valor_total': 'NUMERIC', 'valor_unitario': 'NUMERIC',
+}
+
+
+class MapeamentoTabelas:
+    """Traduz notas/itens em linhas das tabelas de destino."""
+    
+    def __init__(self, mapeamento: Dict = None):
+        mapeamento = mapeamento or Config.MAPEAMENTO_CARGA_DIRETA
+        self.tabela_nota = mapeamento['nota']['tabela']
+        self.gerador = mapeamento['nota']['gerador']
+        self.colunas_nota = dict(mapeamento['nota']['colunas'])
+        self.tabela_item = mapeamento['item']['tabela']
+        self.colunas_item = dict(mapeamento['item']['colunas'])
+        
+        for campo in self.colunas_nota.values():
+            if campo not in CAMPOS_NOTA:
+                raise ValueError(f"Campo de nota desconhecido: {campo}")
+        for campo in self.colunas_item.values():
+            if campo not in CAMPOS_ITEM:
+                raise ValueError(f"Campo de item desconhecido: {campo}")
+        
+        self._extrair_nota = [CAMPOS_NOTA[c] for c in self.colunas_nota.values()]
+        self._extrair_item = [CAMPOS_ITEM[c] for c in self.colunas_item.values()]
+    
+    @staticmethod
+    def _insert(tabela: str, colunas: Sequence[str]) -> str:
+        marcadores = ", ".join("?" for _ in colunas)
+        return f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({marcadores})"
+    
+    @property
+    def sql_nota(self) -> str:
+        return self._insert(self.tabela_nota, list(self.colunas_nota))
+    
+    @property
+    def sql_item(self) -> str:
+        return self._insert(self.tabela_item, list(self.colunas_item))
+    
+    def linha_nota(self, nota: ResumoNota, numero: int, fornecedor: str) -> tuple:
+        return tuple(f(nota, numero, fornecedor) for f in self._extrair_nota)
+    
+    def linha_item(self, item: ItemNota, numero: int, seq: int) -> tuple:
+        return tuple(f(item, numero, seq) for f in self._extrair_item)
+    
+    def criar_esquema_sqlite(self, conexao):
+        """Cria as tabelas mapeadas e o gerador num SQLite (banco substituto para testes)."""
+        for tabela, colunas in ((self.tabela_nota, self.colunas_nota),
+                                (self.tabela_item, self.colunas_item)):
+            definicoes = ", ".join(f"{col} {TIPOS_SQLITE.get(campo, 'TEXT')}"
+                                   for col, campo in colunas.items())
+            conexao.execute(f"CREATE TABLE IF NOT EXISTS {tabela} ({definicoes})")
+        conexao.execute(f"CREATE TABLE IF NOT EXISTS {self.gerador} (VALOR INTEGER NOT NULL)")
+        if conexao.execute(f"SELECT COUNT(*) FROM {self.gerador}").fetchone()[0] == 0:
+            conexao.execute(f"INSERT INTO {self.gerador} (VALOR) VALUES (0)")
+        conexao.commit()
+    
+    def faltantes(self, conexao) -> List[str]:
+        """Tabelas, colunas e gerador do mapeamento que não existem no banco."""
+        sqlite = isinstance(conexao, sqlite3.Connection)
+        cursor = conexao.cursor()
+        faltam = []
+        try:
+            for tabela, colunas in ((self.tabela_nota, self.colunas_nota),
+                                    (self.tabela_item, self.colunas_item)):
+                if sqlite:
+                    cursor.execute(f"PRAGMA table_info({tabela})")
+                    existentes = {linha[1].upper() for linha in cursor.fetchall()}
+                else:
+                    cursor.execute("SELECT COUNT(*) FROM RDB$RELATIONS WHERE RDB$RELATION_NAME = ?",
+                                   (tabela.upper(),))
+                    if cursor.fetchone()[0] == 0:
+                        faltam.append(f"tabela {tabela}")
+                        continue
+                    cursor.execute("SELECT TRIM(RDB$FIELD_NAME) FROM RDB$RELATION_FIELDS "
+                                   "WHERE RDB$RELATION_NAME = ?", (tabela.upper(),))
+                    existentes = {linha[0].upper() for linha in cursor.fetchall()}
+                if not existentes:
+                    faltam.append(f"tabela {tabela}")
+                    continue
+                faltam.extend(f"coluna {tabela}.{coluna}" for coluna in colunas
+                              if coluna.upper() not in existentes)
+            
+            if sqlite:
+                cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+                               (self.gerador,))
+            else:
+                cursor.execute("SELECT COUNT(*) FROM RDB$GENERATORS WHERE RDB$GENERATOR_NAME = ?",
+                               (self.gerador.upper(),))
+            if cursor.fetchone()[0] == 0:
+                faltam.append(f"gerador {self.gerador}")
+        finally:
+            cursor.close()
+        return faltam
+
+
+class CarregadorDireto:
+    """Grava notas com executemany, uma transação a cada N notas.
+
+    Na execução, `adicionar` acumula as notas e grava cada lote assim que ele
+    enche; `descarregar` grava o restante. Os dois devolvem as notas já
+    gravadas (comitadas), que só então vão para o diário e os relatórios.
+    """
+    
+    def __init__(self, conexao, mapeamento: MapeamentoTabelas = None,
+                 notas_por_transacao: int = None, fornecedor: str = None):
+        self.conexao = conexao
+        self.mapeamento = mapeamento or MapeamentoTabelas()
+        self.notas_por_transacao = notas_por_transacao or Config.CARGA_NOTAS_POR_TRANSACAO
+        self.fornecedor = fornecedor or Config.FORNECEDOR_PADRAO
+        self.notas_gravadas = 0
+        self.itens_gravados = 0
+        self._pendentes: List[ResumoNota] = []
+        self._sqlite = isinstance(conexao, sqlite3.Connection)
+    
+    @classmethod
+    def firebird(cls, caminho: str, usuario: str, senha: str, **kwargs) -> 'CarregadorDireto':
+        """Conexão própria via servidor: o SGA pode estar usando o mesmo banco."""
+        if fdb is None:
+            raise RuntimeError("Driver Firebird (fdb) nao instalado")
+        conexao = fdb.connect(dsn=f"{Config.FIREBIRD_HOST}/{Config.FIREBIRD_PORTA}:{caminho}",
+                              user=usuario, password=senha)
+        return cls(conexao, **kwargs)
+    
+    @classmethod
+    def sqlite(cls, caminho: str, **kwargs) -> 'CarregadorDireto':
+        conexao = sqlite3.connect(caminho)
+        carregador = cls(conexao, **kwargs)
+        carregador.mapeamento.criar_esquema_sqlite(conexao)
+        return carregador
+    
+    def validar(self):
+        """Recusa a carga se o banco não tiver as tabelas/colunas/gerador mapeados."""
+        faltam = self.mapeamento.faltantes(self.conexao)
+        if faltam:
+            raise RuntimeError("Esquema do banco não confere com MAPEAMENTO_CARGA_DIRETA; faltam: "
+                               + ", ".join(faltam))
+    
+    def _reservar_numeros(self, cursor, quantidade: int) -> int:
+        """Reserva `quantidade` números no gerador; retorna o primeiro."""
+        gerador = self.mapeamento.gerador
+        if self._sqlite:
+            cursor.execute(f"UPDATE {gerador} SET VALOR = VALOR + ?", (quantidade,))
+            cursor.execute(f"SELECT VALOR FROM {gerador}")
+        else:
+            cursor.execute(f"SELECT GEN_ID({gerador}, {int(quantidade)}) FROM RDB$DATABASE")
+        return int(cursor.fetchone()[0]) - quantidade + 1
+    
+    def _gravar_lote(self, lote: List[ResumoNota]):
+        cursor = self.conexao.cursor()
+        try:
+            numero = self._reservar_numeros(cursor, len(lote))
+            linhas_nota = []
+            linhas_item = []
+            for nota in lote:
+                linhas_nota.append(self.mapeamento.linha_nota(nota, numero, self.fornecedor))
+                linhas_item.extend(self.mapeamento.linha_item(item, numero, seq)
+                                   for seq, item in enumerate(nota.itens, 1))
+                numero += 1
+            
+            cursor.executemany(self.mapeamento.sql_nota, linhas_nota)
+            if linhas_item:
+                cursor.executemany(self.mapeamento.sql_item, linhas_item)
+            self.conexao.commit()
+        except Exception:
+            self.conexao.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        self.notas_gravadas += len(linhas_nota)
+        self.itens_gravados += len(linhas_item)
+        log.debug("Lote gravado: %d notas, %d itens", len(linhas_nota), len(linhas_item))
+    
+    def gravar(self, notas: List[ResumoNota]) -> int:
+        """Grava as notas; retorna o número de notas gravadas."""
+        for inicio in range(0, len(notas), self.notas_por_transacao):
+            self._gravar_lote(notas[inicio:inicio + self.notas_por_transacao])
+        if notas:
+            log.info(f"Carga direta: {self.notas_gravadas} notas e {self.itens_gravados} itens gravados")
+        return len(notas)
+    
+    def adicionar(self, nota: ResumoNota) -> List[ResumoNota]:
+        """Acumula a nota; com o lote cheio, grava e devolve as notas gravadas."""
+        self._pendentes.append(nota)
+        if len(self._pendentes) < self.notas_por_transacao:
+            return []
+        return self.descarregar()
+    
+    def descarregar(self) -> List[ResumoNota]:
+        """Grava as notas acumuladas numa transação e as devolve."""
+        lote, self._pendentes = self._pendentes, []
+        if lote:
+            self._gravar_lote(lote)
+        return lote
+
+
+class AutomacaoEntradaBanco:
+    """Substitui a digitação na Entrada de Produtos (modo carga direta).
+
+    Tem a mesma interface de AutomacaoEntradaProdutos: o processador gera as
+    notas normalmente e as entrega ao CarregadorDireto, que grava em lotes.
+    """
+    
+    def preencher_cabecalho(self) -> bool:
+        return True
+    
+    def preencher_item(self, item: ItemNota) -> bool:
+        item.finalizar("OK")
+        return True
+    
+    def concluir_nota(self) -> bool:
+        return True
+    
+    def pausa(self, segundos: float):
+        pass
@@ -39,6 +39,56 @@ class Config:
     DELAY_TRANSICAO_TELA = 2.0
     DELAY_PDV_ENTRE_CUPONS = 3.0
     
+    # Esperas adaptativas (os DELAY_* acima passam a ser o tempo máximo)
+    ESPERA_INTERVALO = 0.05
+    ESPERA_TIMEOUT_PADRAO = 5.0
+    
+    # Conexão com janelas: timeout da estratégia já conhecida (cache_janelas)
+    CONEXAO_TIMEOUT_RAPIDO = 0.5
+    
+    # Abertura do PDV por fases (inicializacao_pdv): timeout de cada sondagem
+    PDV_TIMEOUTS_FASES = {
+        'janela_login': 30.0,
+        'login_aceito': 15.0,
+        'principal': 10.0,
+    }
+    PDV_INTERVALO_SONDAGEM = 0.25
+    PDV_ESTABILIZACAO_LOGIN = 0.5
+    TITULOS_LOGIN_PDV = ["Login", "Acesso", "Entrar", "PDV", "Sistema", "SGAPDV", "FormLogin"]
+    
+    # Cópia local do catálogo de produtos (cache_catalogo), ao lado do config.ini
+    CACHE_CATALOGO = True
+    CATALOGO_TAMANHO_LOTE = 2000
+    
+    # Pool de conexões (pool_conexoes), por DSN + usuário
+    POOL_MAX_CONEXOES = 4
+    POOL_OCIOSO_MAX = 300.0
+    POOL_SQL_VERIFICACAO = "SELECT 1 FROM RDB$DATABASE"
+    
+    # Modo de conexão (modo_conexao): ordem de tentativa e servidor local
+    ORDEM_MODOS_CONEXAO = ['embarcado', 'servidor']
+    FIREBIRD_HOST = 'localhost'
+    FIREBIRD_PORTA = 3050
+    
+    # Eventos do log (buffer_eventos): quantos ficam em memória e tamanho do
+    # bloco enviado ao arquivo de transbordo. O nível mínimo vale só para os
+    # eventos; o arquivo de log continua recebendo debug
+    EVENTOS_CAPACIDADE_MEMORIA = 10000
+    EVENTOS_LOTE_TRANSBORDO = 1000
+    EVENTOS_NIVEL_MINIMO = 'info'
+    
+    # Thread do log: mensagens escritas por bloco e prazo para esvaziar a fila
+    LOG_LOTE_MAX = 500
+    LOG_PRAZO_DESCARGA = 5.0
+    
+    # Artefatos por execução (artefatos): padrões da seção [ARTEFATOS] do config.ini.
+    # compressao: gzip, zstd (pacote zstandard) ou nenhuma; 0 desliga a retenção
+    ARTEFATOS_DIRETORIO = 'execucoes'
+    ARTEFATOS_COMPRESSAO = 'gzip'
+    ARTEFATOS_MANTER_EXECUCOES = 200
+    ARTEFATOS_MANTER_DIAS = 90
+    ARTEFATOS_PRAZO_SAIDA = 30.0
+    
     # Janelas dos sistemas
     JANELA_SGA = "Entrada de produtos"
     JANELA_PDV = "FormPrincipal"
@@ -48,6 +98,40 @@ class Config:
     FORNECEDOR_PADRAO = "FORNECEDOR PADRAO"
     UNIDADES_VALIDAS = {'UN', 'KG'}
     FORMATOS_LOG = ['TXT', 'JSON', 'CSV']
+    # Relatórios gravados durante a execução (relatorios_incrementais): TXT, CSV e/ou JSON
+    FORMATOS_RELATORIO = ['TXT', 'CSV', 'JSON']
+    
+    # Carga direta no banco (Entrada de Produtos sem digitação)
+    MODOS_ENTRADA_SGA = ['GUI', 'BANCO']
+    CARGA_NOTAS_POR_TRANSACAO = 50
+    CARGA_SQLITE_TESTE = 'carga_direta_teste.db'
+    # Tabelas/colunas/gerador do esquema do SGA; valores = campos de carga_direta.py.
+    # A carga só roda se tudo existir no banco (RDB$RELATIONS/RDB$RELATION_FIELDS/RDB$GENERATORS).
+    MAPEAMENTO_CARGA_DIRETA = {
+        "nota": {
+            "tabela": "ENTRADAS",
+            "gerador": "GEN_ENTRADAS",
+            "colunas": {
+                "NUMERO": "numero",
+                "DATAENTRADA": "data",
+                "FORNECEDOR": "fornecedor",
+                "QTDITENS": "total_itens",
+                "VALORTOTAL": "valor_total",
+            }
+        },
+        "item": {
+            "tabela": "ENTRADAS_ITENS",
+            "colunas": {
+                "NUMERO": "numero_nota",
+                "SEQUENCIA": "sequencia",
+                "CODIGOPRODUTO": "codigo_produto",
+                "UNIDADE": "unidade",
+                "QUANTIDADE": "quantidade",
+                "VALORUNITARIO": "valor_unitario",
+                "VALORTOTAL": "valor_total",
+            }
+        }
+    }
     
     # Configurações do menu
     SISTEMAS_DISPONIVEIS = {
@@ -1,19 +1,30 @@
 """Acesso a dados: Firebird (real) e repositórios mock (teste)."""
 
-import fdb
+try:
+    import fdb
+except ImportError:  # permite usar os repositórios mock fora do Windows
+    fdb = None
 import random
 import os
-from typing import List
+import re
+import itertools
+from typing import Iterable, Iterator, List, Optional, Tuple
 from models import Produto
 from config import Config
-from logger import log
+from logger import log, SEPARADOR
+from cache_catalogo import CacheCatalogo
+from pool_conexoes import ConexaoPool, pool_para, fechar_pool
+
+
+# Rodadas de sorteio por faixa de chave (chaves repetidas caem no mesmo produto)
+RODADAS_AMOSTRA = 3
 
 
 class RepositorioFirebird:
     """Repositório para conexão com banco Firebird."""
     
     def __init__(self, caminho: str, usuario: str, senha: str, consulta_sql: str, 
-                 host: str = None, porta: int = 3050):
+                 host: str = None, porta: int = 3050, cache_catalogo: CacheCatalogo = None):
         self.caminho = caminho
         self.usuario = usuario
         self.senha = senha
@@ -22,79 +33,298 @@ class RepositorioFirebird:
         self.porta = porta
         self.conexao = None
         self.cursor = None
+        self._pool = None
+        self._emprestimo = None
+        self.ao_falhar = None
+        self.escolher_modo = None
+        self.cache_catalogo = cache_catalogo
+        self._catalogo = None
+    
+    def _usar_catalogo(self, aceitar_antigo: bool = False) -> bool:
+        """Carrega o snapshot local do catálogo; True se dispensa a conexão."""
+        if not self.cache_catalogo:
+            return False
+        self._catalogo = self.cache_catalogo.carregar(self.caminho, self.consulta_sql, aceitar_antigo)
+        if self._catalogo is None:
+            return False
+        origem = "cache anterior (banco indisponivel)" if aceitar_antigo else "cache"
+        log.info(f"{len(self._catalogo)} produtos carregados do {origem}: {os.path.basename(self.caminho)}")
+        return True
+    
+    def _dsn(self) -> str:
+        return f"{self.host}/{self.porta}:{self.caminho}" if self.host else self.caminho
     
     def conectar(self) -> bool:
+        if self._usar_catalogo():
+            return True
+        
+        if fdb is None:
+            log.error("Driver Firebird (fdb) nao instalado")
+            return self._usar_catalogo(aceitar_antigo=True)
+        
+        if self.escolher_modo:
+            # negociação só quando é preciso conectar (sem cache nem plano)
+            modo, self.escolher_modo = self.escolher_modo(), None
+            self.host, self.porta = modo['host'], modo['porta']
+        
         try:
+            dsn = self._dsn()
             if self.host:
-                dsn = f"{self.host}/{self.porta}:{self.caminho}"
-                self.conexao = fdb.connect(
+                conectar = lambda: fdb.connect(
                     dsn=dsn,
                     user=self.usuario,
                     password=self.senha
                 )
                 modo = f"via rede ({self.host}:{self.porta})"
             else:
-                self.conexao = fdb.connect(
+                conectar = lambda: fdb.connect(
                     database=self.caminho,
                     user=self.usuario,
                     password=self.senha
                 )
                 modo = "direto (embedded)"
             
-            self.cursor = self.conexao.cursor()
+            if self.host:
+                self._pool = pool_para(dsn, self.usuario, conectar)
+                self._emprestimo = self._pool.obter()
+            else:
+                # embarcado trava o arquivo do banco: nunca vai ao pool, fecha em fechar()
+                self._pool = None
+                self._emprestimo = ConexaoPool(conectar())
+            self.conexao = self._emprestimo.conexao
+            self.cursor = self._emprestimo.cursor
             log.info(f"Conectado ao banco ({modo}): {os.path.basename(self.caminho)}")
             return True
             
         except fdb.Error as e:
             erro_str = str(e)
             if "already in use" in erro_str.lower() or "sendo usado" in erro_str.lower() or "335544344" in erro_str:
-                log.error("=" * 60)
+                log.error(SEPARADOR)
                 log.error("ERRO: O banco está sendo usado exclusivamente por outro programa!")
                 log.error("O sistema tentará abrir o PDV automaticamente se configurado.")
-                log.error("=" * 60)
+                log.error(SEPARADOR)
             else:
                 log.error(f"Erro ao conectar ao Firebird: {e}")
-            return False
+            if self.ao_falhar:
+                self.ao_falhar()
+            return self._usar_catalogo(aceitar_antigo=True)
+    
+    @staticmethod
+    def _converter_lote(linhas: list) -> List[Produto]:
+        """Converte um lote de linhas de uma vez; só cai para linha a linha se houver erro."""
+        validas = Config.UNIDADES_VALIDAS
+        try:
+            convertidas = [(str(c).strip(), float(v), str(u).strip().upper()) for c, v, u in linhas]
+        except (ValueError, TypeError):
+            convertidas = []
+            for row in linhas:
+                try:
+                    convertidas.append((str(row[0]).strip(), float(row[1]), str(row[2]).strip().upper()))
+                except (ValueError, TypeError) as e:
+                    log.warning(f"Registro ignorado: {row} - {e}")
+        return [Produto(c, v, u) for c, v, u in convertidas if u in validas]
+    
+    def iterar_produtos(self, tamanho_lote: int = None) -> Iterator[Produto]:
+        """Produtos em fluxo (fetchmany); o catálogo inteiro nunca fica em memória."""
+        if self._catalogo is not None:
+            yield from self._catalogo
+            return
+        
+        if not self.conexao:
+            raise RuntimeError("Conexao nao estabelecida")
+        
+        tamanho_lote = tamanho_lote or Config.CATALOGO_TAMANHO_LOTE
+        gravacao = None
+        if self.cache_catalogo:
+            try:
+                gravacao = self.cache_catalogo.iniciar_gravacao(self.caminho, self.consulta_sql)
+            except OSError as e:
+                log.warning(f"Nao foi possivel gravar o cache do catalogo: {e}")
+        
+        total = 0
+        try:
+            self._emprestimo.executar(self.consulta_sql)
+            while True:
+                linhas = self.cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                produtos = self._converter_lote(linhas)
+                if gravacao:
+                    gravacao.escrever(produtos)
+                total += len(produtos)
+                yield from produtos
+        except BaseException:
+            if gravacao:
+                gravacao.descartar()
+            raise
+        
+        if gravacao:
+            gravacao.concluir()
+        log.info(f"{total} produtos carregados")
     
     def buscar_produtos(self) -> List[Produto]:
+        return list(self.iterar_produtos())
+    
+    def executar(self, sql: str, parametros: tuple = ()):
+        """Executa um comando (preparado e em cache na conexão) e retorna o cursor."""
+        if not self._emprestimo:
+            raise RuntimeError("Conexao nao estabelecida")
+        return self._emprestimo.executar(sql, parametros)
+    
+    def amostrar_produtos(self, k: int, semente: int = None) -> Tuple[List[Produto], int]:
+        """Sorteia até k produtos no servidor por faixa de chave (CODIGOPRODUTO).
+
+        Pega a menor e a maior chave, sorteia chaves nessa faixa e busca, num
+        único comando, a primeira linha elegível >= cada chave. Os filtros da
+        consulta vão direto na tabela (ver `consulta_por_chave`), então cada
+        sorteio é uma busca no índice da chave mais as linhas descartadas
+        pelos filtros logo após ela; não há COUNT nem SKIP.
+
+        O sorteio não é uniforme: um produto logo após um intervalo grande
+        de códigos sem produtos elegíveis sai mais vezes que um dentro de uma
+        faixa densa. Se achar menos de k produtos distintos (códigos
+        concentrados ou catálogo pequeno), refaz o sorteio por posição
+        (COUNT + SKIP), que é uniforme; o mesmo vale para consultas fora do
+        formato simples SELECT/FROM/WHERE. Retorna (amostra, produtos elegíveis
+        conhecidos); com `semente`, o sorteio é reproduzível enquanto o
+        catálogo não mudar.
+        """
+        rng = random.Random(semente)
+        if self._catalogo is not None:
+            return amostrar_reservatorio(self._catalogo, k, rng)
+        
         if not self.conexao:
             raise RuntimeError("Conexao nao estabelecida")
         
-        self.cursor.execute(self.consulta_sql)
-        registros = self.cursor.fetchall()
+        partes = consulta_por_chave(self.consulta_sql)
+        if partes is None:
+            return self._amostrar_por_posicao(k, rng)
+        colunas, chave, tabela, filtros = partes
+        self._emprestimo.executar(f"SELECT FIRST 1 {chave} FROM {tabela} WHERE {filtros} ORDER BY {chave}")
+        menor = self.cursor.fetchone()
+        if not menor:
+            log.info("0 produtos sorteados no banco")
+            return [], 0
+        self._emprestimo.executar(f"SELECT FIRST 1 {chave} FROM {tabela} WHERE {filtros} ORDER BY {chave} DESC")
+        maior = self.cursor.fetchone()
+        menor, maior = str(menor[0]), str(maior[0])
         
-        produtos = []
-        for row in registros:
-            try:
-                produto = Produto(
-                    codigo=str(row[0]).strip(),
-                    valor_avista=float(row[1]),
-                    unidade=str(row[2]).strip().upper()
-                )
-                if produto.unidade in Config.UNIDADES_VALIDAS:
-                    produtos.append(produto)
-            except (ValueError, TypeError) as e:
-                log.warning(f"Registro ignorado: {row} - {e}")
+        por_chave = (f"SELECT * FROM (SELECT FIRST 1 {colunas} FROM {tabela} "
+                     f"WHERE {filtros} AND {chave} >= ? ORDER BY {chave})")
+        linhas = {}
+        for _ in range(RODADAS_AMOSTRA):
+            faltam = k - len(linhas)
+            if faltam <= 0:
+                break
+            chaves = tuple(chave_aleatoria(menor, maior, rng) for _ in range(faltam))
+            self._emprestimo.executar(" UNION ALL ".join([por_chave] * faltam), chaves)
+            for linha in self.cursor.fetchall():
+                linhas.setdefault(linha[0], linha)
+        
+        if len(linhas) < k:
+            log.info(f"{len(linhas)} produtos distintos por faixa de chave; sorteando por posicao")
+            return self._amostrar_por_posicao(k, rng)
         
-        log.info(f"{len(produtos)} produtos carregados")
-        return produtos
+        amostra = self._converter_lote(list(linhas.values()))
+        log.info(f"{len(amostra)} produtos sorteados no banco (codigos {menor}..{maior})")
+        return amostra, len(amostra)
+    
+    def _amostrar_por_posicao(self, k: int, rng: random.Random) -> Tuple[List[Produto], int]:
+        """Sorteio uniforme: COUNT e depois uma linha por posição (FIRST 1 SKIP)."""
+        self._emprestimo.executar(f"SELECT COUNT(*) FROM ({self.consulta_sql})")
+        total = int(self.cursor.fetchone()[0] or 0)
+        
+        linhas = []
+        sql = f"SELECT FIRST 1 SKIP (?) * FROM ({self.consulta_sql}) ORDER BY 1"
+        for posicao in sorted(rng.sample(range(total), min(k, total))):
+            self._emprestimo.executar(sql, (posicao,))
+            linhas.extend(self.cursor.fetchall())
+        
+        amostra = self._converter_lote(linhas)
+        log.info(f"{len(amostra)} produtos sorteados no banco (de {total})")
+        return amostra, total
     
     def fechar(self):
-        if self.cursor:
-            self.cursor.close()
-        if self.conexao:
-            self.conexao.close()
-            log.info("Conexao com banco fechada")
+        if self._emprestimo:
+            if self._pool:
+                self._pool.devolver(self._emprestimo)
+                log.info("Conexao com banco devolvida ao pool")
+            else:
+                self._emprestimo.fechar()
+                log.info("Conexao embarcada fechada")
+            self._emprestimo = None
+            self.conexao = None
+            self.cursor = None
+    
+    def descartar_conexoes(self):
+        """Fecha também as conexões livres do pool deste banco/modo."""
+        self.fechar()
+        fechar_pool(self._dsn(), self.usuario)
+
+
+def _chave_numero(chave: str, largura: int) -> int:
+    numero = 0
+    for ch in chave.ljust(largura)[:largura]:
+        numero = numero * 95 + min(max(ord(ch) - 32, 0), 94)
+    return numero
+
+
+def consulta_por_chave(sql: str) -> Optional[Tuple[str, str, str, str]]:
+    """Separa `SELECT colunas FROM tabela WHERE filtros ORDER BY ...` em
+    (colunas, chave, tabela, filtros); a chave é a primeira coluna. None se
+    a consulta tiver outro formato.
+
+    Com os filtros aplicados direto na tabela, o Firebird usa o índice da
+    chave em `chave >= ?` (numa tabela derivada o predicado não desce).
+    """
+    partes = re.match(r"\s*SELECT\s+(.+?)\s+FROM\s+(.+?)(?:\s+WHERE\s+(.+?))?(?:\s+ORDER\s+BY\s+[^()]+)?\s*$",
+                      sql, re.IGNORECASE | re.DOTALL)
+    if not partes:
+        return None
+    colunas, tabela, filtros = partes.groups()
+    chave = colunas.split(',')[0].strip()
+    return colunas, chave, tabela, f"({filtros})" if filtros else "1 = 1"
+
+
+def chave_aleatoria(menor: str, maior: str, rng: random.Random) -> str:
+    """Chave uniforme entre `menor` e `maior` (ASCII imprimível, ordem do banco)."""
+    if menor.isdigit() and maior.isdigit() and len(menor) == len(maior):
+        return str(rng.randint(int(menor), int(maior))).zfill(len(menor))
+    largura = max(len(menor), len(maior))
+    numero = rng.randint(_chave_numero(menor, largura), _chave_numero(maior, largura))
+    caracteres = []
+    for _ in range(largura):
+        numero, resto = divmod(numero, 95)
+        caracteres.append(chr(resto + 32))
+    return ''.join(reversed(caracteres)).rstrip()
+
+
+def amostrar_reservatorio(produtos: Iterable[Produto], k: int,
+                          rng: random.Random = None) -> Tuple[List[Produto], int]:
+    """Amostra uniforme de até k produtos num único passe (algoritmo R).
+
+    Retorna (amostra, total visto); a memória usada é O(k).
+    """
+    rng = rng or random
+    iterador = iter(produtos)
+    amostra = list(itertools.islice(iterador, k))
+    total = len(amostra)
+    for produto in iterador:
+        total += 1
+        j = rng.randrange(total)
+        if j < k:
+            amostra[j] = produto
+    return amostra, total
 
 
 class RepositorioMockSGA:
     """Repositório mock para SGA."""
     
     def __init__(self):
-        random.seed(42)
+        rng = random.Random(42)
         self.produtos_mock = [
             Produto(f"{100000 + i:06d}", 
-                   round(random.uniform(5.0, 100.0), 2), 
+                   round(rng.uniform(5.0, 100.0), 2), 
                    'UN' if i % 3 != 0 else 'KG')
             for i in range(1, 31)
         ]
@@ -106,6 +336,13 @@ class RepositorioMockSGA:
     def buscar_produtos(self) -> List[Produto]:
         return self.produtos_mock.copy()
     
+    def iterar_produtos(self, tamanho_lote: int = None) -> Iterator[Produto]:
+        return iter(self.produtos_mock)
+    
+    def amostrar_produtos(self, k: int, semente: int = None) -> Tuple[List[Produto], int]:
+        rng = random.Random(semente)
+        return rng.sample(self.produtos_mock, min(k, len(self.produtos_mock))), len(self.produtos_mock)
+    
     def fechar(self):
         pass
 
@@ -114,10 +351,10 @@ class RepositorioMockPDV:
     """Repositório mock para PDV."""
     
     def __init__(self):
-        random.seed(43)
+        rng = random.Random(43)
         self.produtos_mock = [
             Produto(f"{200000 + i:06d}", 
-                   round(random.uniform(1.0, 50.0), 2), 
+                   round(rng.uniform(1.0, 50.0), 2), 
                    'UN' if i % 2 != 0 else 'KG')
             for i in range(1, 26)
         ]
@@ -129,5 +366,12 @@ class RepositorioMockPDV:
     def buscar_produtos(self) -> List[Produto]:
         return self.produtos_mock.copy()
     
+    def iterar_produtos(self, tamanho_lote: int = None) -> Iterator[Produto]:
+        return iter(self.produtos_mock)
+    
+    def amostrar_produtos(self, k: int, semente: int = None) -> Tuple[List[Produto], int]:
+        rng = random.Random(semente)
+        return rng.sample(self.produtos_mock, min(k, len(self.produtos_mock))), len(self.produtos_mock)
+    
     def fechar(self):
         pass
@@ -0,0 +1,185 @@
+"""Diário de execução (JSON Lines com fsync) para retomar execuções interrompidas.
+
+Cada linha é um registro: 'plano' (início da execução), 'item' (item
+concluído), 'documento' (nota/venda concluída), 'retomada' e 'fim'. Se a execução cair,
+`python main.py --resume <diario>` reconstrói os documentos concluídos e
+continua a partir do primeiro documento não finalizado.
+"""
+
+import json
+import os
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from models import Produto, ItemNota, ResumoNota, ItemVenda, VendaPDV
+from artefatos import artefatos
+
+
+CLASSES_DOCUMENTO = {
+    'SGA': (ResumoNota, ItemNota),
+    'PDV': (VendaPDV, ItemVenda),
+}
+
+CHAVES_SENSIVEIS = {'senha_pdv'}
+
+
+def _data(texto: Optional[str]) -> Optional[datetime.datetime]:
+    return datetime.datetime.fromisoformat(texto) if texto else None
+
+
+@dataclass
+class EstadoDiario:
+    """Estado reconstruído a partir de um diário."""
+    caminho: str
+    sistema: str
+    fluxo: str
+    config: Dict
+    total_documentos: int
+    produtos: List[Produto]
+    inicio: datetime.datetime
+    documentos: list = field(default_factory=list)
+    concluido: bool = False
+    
+    @property
+    def proximo_documento(self) -> int:
+        return len(self.documentos) + 1
+
+
+class DiarioExecucao:
+    """Escreve o diário; cada registro é gravado e sincronizado no disco."""
+    
+    def __init__(self, caminho: str, sistema: str = None, fluxo: str = None,
+                 config: Dict = None, sincronizar: bool = True):
+        self.caminho = caminho
+        self.sistema = sistema
+        self.fluxo = fluxo
+        self.config = config or {}
+        self.sincronizar = sincronizar
+        self._arquivo = open(caminho, 'a', encoding='utf-8')
+    
+    @classmethod
+    def novo(cls, sistema: str, fluxo: str, config: Dict, diretorio: str = None) -> 'DiarioExecucao':
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        nome = f"diario_{sistema.lower()}_{timestamp}.jsonl"
+        caminho = os.path.join(diretorio, nome) if diretorio else artefatos.arquivo(nome, 'diario')
+        return cls(caminho, sistema, fluxo, config)
+    
+    @classmethod
+    def reabrir(cls, estado: 'EstadoDiario') -> 'DiarioExecucao':
+        """Continua gravando no mesmo arquivo de uma execução retomada."""
+        cls._descartar_linha_truncada(estado.caminho)
+        return cls(estado.caminho, estado.sistema, estado.fluxo, estado.config)
+    
+    @staticmethod
+    def _descartar_linha_truncada(caminho: str):
+        with open(caminho, 'rb+') as f:
+            conteudo = f.read()
+            if conteudo and not conteudo.endswith(b"\n"):
+                f.truncate(conteudo.rfind(b"\n") + 1)
+    
+    def _gravar(self, registro: Dict):
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        if self.sincronizar:
+            os.fsync(self._arquivo.fileno())
+    
+    def registrar_plano(self, total_documentos: int, produtos: List[Produto]):
+        self._gravar({
+            'tipo': 'plano',
+            'sistema': self.sistema,
+            'fluxo': self.fluxo,
+            'inicio': datetime.datetime.now().isoformat(),
+            'total_documentos': total_documentos,
+            'config': {k: v for k, v in self.config.items() if k not in CHAVES_SENSIVEIS},
+            'produtos': [[p.codigo, p.valor_avista, p.unidade] for p in produtos],
+        })
+    
+    def registrar_item(self, documento: int, item):
+        self._gravar({
+            'tipo': 'item',
+            'documento': documento,
+            'codigo': item.produto.codigo,
+            'valor_avista': item.produto.valor_avista,
+            'unidade': item.produto.unidade,
+            'quantidade': item.quantidade,
+            'valor_unitario': item.valor_unitario,
+            'status': item.status,
+            'inicio': item.timestamp_inicio.isoformat(),
+            'fim': item.timestamp_fim.isoformat() if item.timestamp_fim else None,
+        })
+    
+    def registrar_documento(self, documento):
+        self._gravar({
+            'tipo': 'documento',
+            'numero': documento.numero,
+            'status': documento.status,
+            'erro': documento.erro,
+            'inicio': documento.timestamp_inicio.isoformat(),
+            'fim': documento.timestamp_fim.isoformat() if documento.timestamp_fim else None,
+        })
+    
+    def registrar_retomada(self, documento: int):
+        """Marca a retomada: itens soltos do documento interrompido são descartados."""
+        self._gravar({'tipo': 'retomada', 'documento': documento,
+                      'instante': datetime.datetime.now().isoformat()})
+    
+    def registrar_fim(self):
+        self._gravar({'tipo': 'fim', 'instante': datetime.datetime.now().isoformat()})
+    
+    def fechar(self):
+        if not self._arquivo.closed:
+            self._arquivo.close()
+    
+    @staticmethod
+    def ler(caminho: str) -> EstadoDiario:
+        """Reconstrói o estado; ignora uma última linha truncada pela queda."""
+        estado = None
+        itens_pendentes: Dict[int, list] = {}
+        
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    continue
+                tipo = registro.get('tipo')
+                
+                if tipo == 'plano':
+                    estado = EstadoDiario(
+                        caminho=caminho,
+                        sistema=registro['sistema'],
+                        fluxo=registro['fluxo'],
+                        config=registro['config'],
+                        total_documentos=registro['total_documentos'],
+                        produtos=[Produto(c, v, u) for c, v, u in registro['produtos']],
+                        inicio=_data(registro['inicio']),
+                    )
+                    classe_doc, classe_item = CLASSES_DOCUMENTO[estado.sistema]
+                elif estado is None:
+                    raise ValueError(f"Diário sem registro de plano: {caminho}")
+                elif tipo == 'item':
+                    itens_pendentes.setdefault(registro['documento'], []).append(classe_item(
+                        produto=Produto(registro['codigo'], registro['valor_avista'], registro['unidade']),
+                        quantidade=registro['quantidade'],
+                        valor_unitario=registro['valor_unitario'],
+                        timestamp_inicio=_data(registro['inicio']),
+                        timestamp_fim=_data(registro['fim']),
+                        status=registro['status'],
+                    ))
+                elif tipo == 'documento':
+                    estado.documentos.append(classe_doc(
+                        numero=registro['numero'],
+                        itens=itens_pendentes.pop(registro['numero'], []),
+                        timestamp_inicio=_data(registro['inicio']),
+                        timestamp_fim=_data(registro['fim']),
+                        status=registro['status'],
+                        erro=registro['erro'],
+                    ))
+                elif tipo == 'retomada':
+                    itens_pendentes.clear()
+                elif tipo == 'fim':
+                    estado.concluido = True
+        
+        if estado is None:
+            raise ValueError(f"Diário vazio: {caminho}")
+        return estado
@@ -0,0 +1,64 @@
+"""Valores em centavos inteiros e quantidades em milésimos (3 casas, KG).
+
+Preço e quantidade de cada item são convertidos uma única vez para inteiros;
+o total do item é arredondado (meio para cima) ao centavo e os totais de
+documento e de execução são somas inteiras. Assim PDV, SGA, relatórios e
+carga direta chegam ao mesmo valor, centavo a centavo. As versões com
+sufixo `_array` fazem o mesmo sobre arrays NumPy int64.
+"""
+
+from typing import Iterable
+import numpy as np
+
+
+def centavos(valor: float) -> int:
+    return int(round(float(valor) * 100))
+
+
+def milesimos(quantidade: float) -> int:
+    return int(round(float(quantidade) * 1000))
+
+
+def total_item(valor_centavos: int, quantidade_milesimos: int) -> int:
+    """Total do item em centavos, arredondado meio para cima."""
+    return (valor_centavos * quantidade_milesimos + 500) // 1000
+
+
+def reais(valor_centavos: int) -> float:
+    return valor_centavos / 100
+
+
+def centavos_array(valores) -> np.ndarray:
+    return np.rint(np.asarray(valores, dtype=np.float64) * 100).astype(np.int64)
+
+
+def milesimos_array(quantidades) -> np.ndarray:
+    return np.rint(np.asarray(quantidades, dtype=np.float64) * 1000).astype(np.int64)
+
+
+def total_itens_array(valores_centavos: np.ndarray, quantidades_milesimos: np.ndarray) -> np.ndarray:
+    """Totais por item em centavos (int64), mesmo arredondamento de `total_item`."""
+    return (np.asarray(valores_centavos, dtype=np.int64) * np.asarray(quantidades_milesimos, dtype=np.int64) + 500) // 1000
+
+
+def somar_itens(valores, quantidades) -> int:
+    """Soma exata, em centavos, de itens dados em reais/quantidade (float)."""
+    return int(total_itens_array(centavos_array(valores), milesimos_array(quantidades)).sum())
+
+
+def somar_centavos(valores: Iterable[int]) -> int:
+    return int(np.sum(np.fromiter(valores, dtype=np.int64)))
+
+
+def formatar_centavos(valor_centavos: int, usar_milhar: bool = True) -> str:
+    """Formata centavos como moeda BR ('1.234,56') sem passar por float."""
+    sinal = '-' if valor_centavos < 0 else ''
+    inteiro, resto = divmod(abs(int(valor_centavos)), 100)
+    texto = f"{inteiro:,}".replace(",", ".") if usar_milhar else str(inteiro)
+    return f"{sinal}{texto},{resto:02d}"
+
+
+def formatar_milesimos(quantidade_milesimos: int) -> str:
+    sinal = '-' if quantidade_milesimos < 0 else ''
+    inteiro, resto = divmod(abs(int(quantidade_milesimos)), 1000)
+    return f"{sinal}{inteiro},{resto:03d}"
@@ -0,0 +1,325 @@
+"""Drivers de entrada/janelas: pyautogui+pywinauto (real) ou headless (gravação).
+
+As automações não chamam pyautogui/pywinauto diretamente; usam o driver
+retornado por `obter_driver()`. Em CI/benchmarks, `definir_driver(DriverHeadless())`
+troca tudo por um backend que só registra eventos.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional
+from esperas import Relogio, RelogioSimulado, Tela, TelaPywinauto
+from indice_janelas import IndiceControles
+
+
+class DriverEntrada(ABC):
+    """Interface comum: teclado, janelas, botões e captura de tela."""
+    
+    relogio: Relogio
+    
+    @abstractmethod
+    def press(self, tecla: str, vezes: int = 1):
+        pass
+    
+    @abstractmethod
+    def write(self, texto, interval: float = 0.0):
+        """Envia um texto ou uma lista de teclas numa única chamada."""
+    
+    @abstractmethod
+    def hotkey(self, *teclas: str):
+        pass
+    
+    @abstractmethod
+    def procurar_janelas(self, titulo: str) -> list:
+        """Janelas de topo cujo título contém `titulo` (ex.: para ativar)."""
+    
+    @abstractmethod
+    def listar_titulos(self) -> List[str]:
+        """Títulos de todas as janelas de topo, numa única enumeração."""
+    
+    @abstractmethod
+    def conectar_aplicacao(self, backend: str, **criterios):
+        """Conecta a uma aplicação (equivale a Application(backend).connect)."""
+    
+    @abstractmethod
+    def janela_existe(self, janela) -> bool:
+        """Se uma janela obtida antes ainda está aberta (handle reaproveitável)."""
+    
+    @abstractmethod
+    def clicar_botao(self, janela, nome: str, procurar_descendentes: bool = True) -> bool:
+        pass
+    
+    @abstractmethod
+    def handle_janela(self, janela) -> int:
+        """Identifica a instância da janela; muda quando ela é recriada."""
+    
+    @abstractmethod
+    def listar_controles(self, janela, tipo: str) -> list:
+        """Todos os descendentes de um tipo, numa única varredura."""
+    
+    def texto_controle(self, controle) -> str:
+        return controle.window_text()
+    
+    def controle_valido(self, controle) -> bool:
+        return True
+    
+    @abstractmethod
+    def screenshot(self, caminho: str):
+        pass
+    
+    def tela(self, app, janela) -> Tela:
+        """Leitor de estado da tela usado pelas esperas adaptativas."""
+        return Tela()
+    
+    def pausa(self, segundos: float):
+        self.relogio.dormir(segundos)
+
+
+class DriverPyAutoGUI(DriverEntrada):
+    """Backend real (Windows): pyautogui para teclado e pywinauto para janelas."""
+    
+    def __init__(self):
+        import pyautogui
+        from pywinauto import Application
+        self._pyautogui = pyautogui
+        self._Application = Application
+        self.relogio = Relogio()
+        self.controles = IndiceControles(self)
+    
+    def press(self, tecla: str, vezes: int = 1):
+        self._pyautogui.press(tecla, presses=vezes)
+    
+    def write(self, texto, interval: float = 0.0):
+        self._pyautogui.write(texto, interval=interval)
+    
+    def hotkey(self, *teclas: str):
+        self._pyautogui.hotkey(*teclas)
+    
+    def procurar_janelas(self, titulo: str) -> list:
+        return self._pyautogui.getWindowsWithTitle(titulo)
+    
+    def listar_titulos(self) -> List[str]:
+        return [t for t in self._pyautogui.getAllTitles() if t]
+    
+    def conectar_aplicacao(self, backend: str, **criterios):
+        return self._Application(backend=backend).connect(**criterios)
+    
+    def janela_existe(self, janela) -> bool:
+        try:
+            if hasattr(janela, 'exists'):
+                return janela.exists(timeout=0)
+            return janela.is_visible()
+        except Exception:
+            return False
+    
+    def clicar_botao(self, janela, nome: str, procurar_descendentes: bool = True) -> bool:
+        if not procurar_descendentes:
+            try:
+                getattr(janela, f"Btn_{nome}").click()
+                return True
+            except Exception:
+                return False
+        
+        btn = self.controles.resolver(janela, nome)
+        if btn is None:
+            return False
+        btn.click()
+        return True
+    
+    def handle_janela(self, janela) -> int:
+        if hasattr(janela, 'wrapper_object'):
+            janela = janela.wrapper_object()
+        return janela.handle
+    
+    def listar_controles(self, janela, tipo: str) -> list:
+        return janela.descendants(control_type=tipo)
+    
+    def controle_valido(self, controle) -> bool:
+        try:
+            return controle.is_visible()
+        except Exception:
+            return False
+    
+    def screenshot(self, caminho: str):
+        self._pyautogui.screenshot().save(caminho)
+        return caminho
+    
+    def tela(self, app, janela) -> Tela:
+        return TelaPywinauto(app, janela)
+
+
+@dataclass
+class EventoEntrada:
+    instante: float
+    tipo: str
+    dados: tuple = ()
+
+
+@dataclass
+class JanelaHeadless:
+    """Janela simulada com a mesma superfície usada pelas automações."""
+    titulo: str
+    handle: int = 0
+    ativacoes: int = 0
+    
+    def activate(self):
+        self.ativacoes += 1
+    
+    def set_focus(self):
+        self.ativacoes += 1
+    
+    def window_text(self) -> str:
+        return self.titulo
+
+
+@dataclass
+class ControleHeadless:
+    texto: str
+    cliques: int = 0
+    
+    def window_text(self) -> str:
+        return self.texto
+    
+    def click(self):
+        self.cliques += 1
+
+
+@dataclass
+class AplicacaoHeadless:
+    janelas: List[JanelaHeadless] = field(default_factory=list)
+    
+    def window(self, title: str = None, title_re: str = None, **_):
+        for janela in self.janelas:
+            if title and janela.titulo == title:
+                return janela
+            if title_re and re.match(title_re, janela.titulo):
+                return janela
+        raise LookupError(title or title_re)
+    
+    def windows(self):
+        return list(self.janelas)
+    
+    def top_window(self):
+        return self.janelas[0]
+
+
+class TelaHeadless(Tela):
+    """Cada evento de entrada conta como reação imediata da tela."""
+    
+    def __init__(self, driver: 'DriverHeadless'):
+        self.driver = driver
+    
+    def controle_focado(self):
+        return self.driver.total_eventos
+    
+    def texto_focado(self) -> Optional[str]:
+        return self.driver.ultimo_texto
+    
+    def dialogo_aberto(self) -> Optional[bool]:
+        return False
+
+
+class DriverHeadless(DriverEntrada):
+    """Backend sem desktop: registra eventos com instante e latência simulada.
+
+    Com `relogio` simulado (padrão) as pausas não dormem de verdade, então
+    milhares de itens rodam por segundo e o tempo simulado fica em `relogio`.
+    """
+    
+    def __init__(self, relogio: Relogio = None, latencia: float = 0.0,
+                 titulos: List[str] = None, gravar: bool = True,
+                 botoes: List[str] = None):
+        self.relogio = relogio or RelogioSimulado()
+        self.latencia = latencia
+        self.gravar = gravar
+        self.eventos: List[EventoEntrada] = []
+        self.total_eventos = 0
+        self.ultimo_texto = ""
+        self.janelas = [JanelaHeadless(t, handle=i + 1) for i, t in enumerate(titulos or [])]
+        # Sem `botoes`, todo clique é aceito (não há árvore de controles simulada)
+        self.botoes = None if botoes is None else [ControleHeadless(b) for b in botoes]
+        self.controles = IndiceControles(self)
+    
+    def _registrar(self, tipo: str, *dados):
+        if self.latencia:
+            self.relogio.dormir(self.latencia)
+        self.total_eventos += 1
+        if self.gravar:
+            self.eventos.append(EventoEntrada(self.relogio.agora(), tipo, dados))
+    
+    def press(self, tecla: str, vezes: int = 1):
+        self._registrar('press', tecla, vezes)
+    
+    def write(self, texto, interval: float = 0.0):
+        if not isinstance(texto, str):
+            texto = tuple(texto)
+        else:
+            self.ultimo_texto = texto
+        self._registrar('write', texto)
+    
+    def hotkey(self, *teclas: str):
+        self._registrar('hotkey', *teclas)
+    
+    def procurar_janelas(self, titulo: str) -> list:
+        self._registrar('procurar_janelas', titulo)
+        return [j for j in self.janelas if titulo in j.titulo]
+    
+    def listar_titulos(self) -> List[str]:
+        self._registrar('listar_titulos')
+        return [j.titulo for j in self.janelas]
+    
+    def conectar_aplicacao(self, backend: str, **criterios):
+        self._registrar('conectar', backend, tuple(sorted(criterios.items())))
+        app = AplicacaoHeadless(self.janelas)
+        app.window(**criterios)
+        return app
+    
+    def janela_existe(self, janela) -> bool:
+        return janela in self.janelas
+    
+    def clicar_botao(self, janela, nome: str, procurar_descendentes: bool = True) -> bool:
+        self._registrar('clicar', nome)
+        if self.botoes is None:
+            return True
+        btn = self.controles.resolver(janela, nome)
+        if btn is None:
+            return False
+        btn.click()
+        return True
+    
+    def handle_janela(self, janela) -> int:
+        return janela.handle if janela is not None else 0
+    
+    def listar_controles(self, janela, tipo: str) -> list:
+        self._registrar('listar_controles', tipo)
+        return list(self.botoes or [])
+    
+    def screenshot(self, caminho: str):
+        self._registrar('screenshot', caminho)
+        return caminho
+    
+    def tela(self, app, janela) -> Tela:
+        return TelaHeadless(self)
+    
+    def contagem(self) -> dict:
+        """Eventos gravados por tipo."""
+        resumo = {}
+        for evento in self.eventos:
+            resumo[evento.tipo] = resumo.get(evento.tipo, 0) + 1
+        return resumo
+
+
+_driver: Optional[DriverEntrada] = None
+
+
+def obter_driver() -> DriverEntrada:
+    global _driver
+    if _driver is None:
+        _driver = DriverPyAutoGUI()
+    return _driver
+
+
+def definir_driver(driver: DriverEntrada):
+    global _driver
+    _driver = driver
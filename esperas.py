@@ -0,0 +1,199 @@
+"""Esperas adaptativas: aguardam a condição real da tela em vez de pausas fixas."""
+
+import time
+from typing import Callable, Optional
+from config import Config
+from logger import log
+
+
+class Relogio:
+    """Relógio real (monotônico) usado pelas esperas."""
+    
+    def agora(self) -> float:
+        return time.monotonic()
+    
+    def dormir(self, segundos: float):
+        if segundos > 0:
+            time.sleep(segundos)
+
+
+class RelogioSimulado(Relogio):
+    """Relógio falso: dormir apenas avança o tempo (testes e simulações)."""
+    
+    def __init__(self, inicio: float = 0.0):
+        self.tempo = inicio
+    
+    def agora(self) -> float:
+        return self.tempo
+    
+    def dormir(self, segundos: float):
+        if segundos > 0:
+            self.tempo += segundos
+
+
+class Tela:
+    """Interface mínima de leitura do estado da tela.
+
+    Cada método retorna None quando a informação não pode ser obtida;
+    nesse caso a espera volta a usar o tempo máximo (comportamento antigo).
+    """
+    
+    def controle_focado(self):
+        return None
+    
+    def texto_focado(self) -> Optional[str]:
+        return None
+    
+    def dialogo_aberto(self) -> Optional[bool]:
+        return None
+
+
+class TelaPywinauto(Tela):
+    """Lê foco, texto e diálogos da janela conectada via pywinauto."""
+    
+    def __init__(self, app, janela):
+        self.app = app
+        self.janela = janela
+        self._handle_janela = None
+    
+    def _focado(self):
+        try:
+            return self.janela.get_focus()
+        except Exception:
+            pass
+        try:
+            from pywinauto.uia_defines import IUIA
+            from pywinauto.uia_element_info import UIAElementInfo
+            from pywinauto.controls.uiawrapper import UIAWrapper
+            return UIAWrapper(UIAElementInfo(IUIA().iuia.GetFocusedElement()))
+        except Exception:
+            return None
+    
+    def controle_focado(self):
+        focado = self._focado()
+        if focado is None:
+            return None
+        try:
+            info = focado.element_info
+            return (info.handle, tuple(info.runtime_id or ()), info.name)
+        except Exception:
+            return None
+    
+    def texto_focado(self) -> Optional[str]:
+        focado = self._focado()
+        if focado is None:
+            return None
+        try:
+            return focado.window_text()
+        except Exception:
+            return None
+    
+    def dialogo_aberto(self) -> Optional[bool]:
+        try:
+            if self._handle_janela is None:
+                self._handle_janela = self.janela.handle
+            return self.app.top_window().handle != self._handle_janela
+        except Exception:
+            return None
+
+
+class EsperaAdaptativa:
+    """Motor de espera: consulta a condição até ela valer ou o tempo esgotar."""
+    
+    def __init__(self, tela: Tela = None, relogio: Relogio = None,
+                 intervalo: float = None, timeout_padrao: float = None):
+        self.tela = tela or Tela()
+        self.relogio = relogio or Relogio()
+        self.intervalo = Config.ESPERA_INTERVALO if intervalo is None else intervalo
+        self.timeout_padrao = Config.ESPERA_TIMEOUT_PADRAO if timeout_padrao is None else timeout_padrao
+        self.total_esperado = 0.0
+        self.esperas_esgotadas = 0
+    
+    def ate(self, condicao: Callable[[], Optional[bool]], timeout: float = None,
+            descricao: str = "") -> bool:
+        """Espera `condicao()` ser verdadeira.
+
+        Sem `timeout`, usa Config.ESPERA_TIMEOUT_PADRAO. Se a condição retornar
+        None (estado ilegível), dorme o timeout inteiro, como as pausas fixas
+        faziam, e retorna True. Esgotado o tempo, registra `descricao` no log.
+        """
+        if timeout is None:
+            timeout = self.timeout_padrao
+        inicio = self.relogio.agora()
+        limite = inicio + timeout
+        
+        try:
+            while True:
+                resultado = condicao()
+                if resultado is None:
+                    self.relogio.dormir(limite - self.relogio.agora())
+                    return True
+                if resultado:
+                    return True
+                
+                restante = limite - self.relogio.agora()
+                if restante <= 0:
+                    self.esperas_esgotadas += 1
+                    log.debug("Espera esgotada: %s (%.2fs)", descricao or "condicao", timeout)
+                    return False
+                self.relogio.dormir(min(self.intervalo, restante))
+        finally:
+            self.total_esperado += self.relogio.agora() - inicio
+    
+    def pausa(self, segundos: float):
+        """Pausa fixa (quando não há condição observável)."""
+        inicio = self.relogio.agora()
+        self.relogio.dormir(segundos)
+        self.total_esperado += self.relogio.agora() - inicio
+    
+    def capturar_foco(self):
+        return self.tela.controle_focado()
+    
+    def foco_mudar(self, foco_anterior, timeout: float = None) -> bool:
+        """Espera o foco sair do controle `foco_anterior` (campo aceito)."""
+        if foco_anterior is None:
+            return self.ate(lambda: None, timeout, "foco")
+        
+        def mudou():
+            atual = self.tela.controle_focado()
+            if atual is None:
+                return None
+            return atual != foco_anterior
+        
+        return self.ate(mudou, timeout, "foco")
+    
+    def texto_aceito(self, esperado: str, timeout: float = None) -> bool:
+        """Espera o controle focado exibir o texto digitado."""
+        def aceito():
+            texto = self.tela.texto_focado()
+            if texto is None:
+                return None
+            return esperado in texto
+        
+        return self.ate(aceito, timeout, "texto")
+    
+    def dialogo_aparecer(self, timeout: float = None) -> bool:
+        return self.ate(self.tela.dialogo_aberto, timeout, "dialogo")
+    
+    def dialogo_sumir(self, timeout: float = None) -> bool:
+        def sumiu():
+            aberto = self.tela.dialogo_aberto()
+            return None if aberto is None else not aberto
+        
+        return self.ate(sumiu, timeout, "dialogo")
+    
+    def transicao(self, foco_anterior, dialogo_antes: Optional[bool], timeout: float = None) -> bool:
+        """Espera qualquer reação da tela: foco mudou ou diálogo abriu/fechou."""
+        if foco_anterior is None and dialogo_antes is None:
+            return self.ate(lambda: None, timeout, "transicao")
+        
+        def reagiu():
+            foco = self.tela.controle_focado()
+            dialogo = self.tela.dialogo_aberto()
+            if foco is None and dialogo is None:
+                return None
+            if foco is not None and foco_anterior is not None and foco != foco_anterior:
+                return True
+            return dialogo is not None and dialogo_antes is not None and dialogo != dialogo_antes
+        
+        return self.ate(reagiu, timeout, "transicao")
@@ -0,0 +1,82 @@
+"""Índices de janelas e controles: uma enumeração por sondagem, não uma por nome.
+
+`IndiceJanelas` lista as janelas de topo uma vez e casa todos os títulos
+candidatos nessa mesma lista. `IndiceControles` varre os descendentes de uma
+janela uma vez e guarda os controles por nome enquanto a janela existir; se a
+janela for recriada (handle novo), o índice é refeito.
+"""
+
+from typing import Dict, List, Optional
+
+
+class IndiceJanelas:
+    """Casa vários títulos candidatos com uma única listagem de janelas."""
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.titulos: List[str] = []
+        self.enumeracoes = 0
+    
+    def varrer(self, candidatos: List[str]) -> Dict[str, str]:
+        """Retorna {candidato: primeiro título que o contém} para os encontrados."""
+        self.titulos = self.driver.listar_titulos()
+        self.enumeracoes += 1
+        
+        encontrados = {}
+        for titulo in self.titulos:
+            for candidato in candidatos:
+                if candidato not in encontrados and candidato in titulo:
+                    encontrados[candidato] = titulo
+        return encontrados
+    
+    @staticmethod
+    def primeiro(encontrados: Dict[str, str], candidatos: List[str]) -> Optional[str]:
+        """Título do candidato de maior prioridade (ordem de `candidatos`)."""
+        for candidato in candidatos:
+            if candidato in encontrados:
+                return encontrados[candidato]
+        return None
+
+
+class IndiceControles:
+    """Controles de uma janela por texto, resolvidos numa só varredura."""
+    
+    def __init__(self, driver, tipo: str = "Button"):
+        self.driver = driver
+        self.tipo = tipo
+        self._handle = None
+        self._controles: Dict[str, object] = {}
+        self.varreduras = 0
+    
+    def indexar(self, janela):
+        self._handle = self.driver.handle_janela(janela)
+        self._controles = {}
+        for controle in self.driver.listar_controles(janela, self.tipo):
+            texto = (self.driver.texto_controle(controle) or "").strip().lower()
+            if texto and texto not in self._controles:
+                self._controles[texto] = controle
+        self.varreduras += 1
+    
+    def invalidar(self):
+        self._handle = None
+        self._controles = {}
+    
+    def _procurar(self, chave: str):
+        if chave in self._controles:
+            return self._controles[chave]
+        for texto, controle in self._controles.items():
+            if chave in texto:
+                return controle
+        return None
+    
+    def resolver(self, janela, nome: str):
+        """Controle cujo texto contém `nome`, ou None se a janela não o tem."""
+        if self.driver.handle_janela(janela) != self._handle:
+            self.indexar(janela)
+        
+        chave = nome.lower()
+        controle = self._procurar(chave)
+        if controle is not None and not self.driver.controle_valido(controle):
+            self.indexar(janela)
+            controle = self._procurar(chave)
+        return controle
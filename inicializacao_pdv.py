@@ -0,0 +1,210 @@
+"""Inicialização do PDV por sondagem: cada fase espera a condição real.
+
+Fases: processo iniciado -> janela de login listada -> login aceito ->
+janela principal visível. Cada fase de espera tem timeout próprio e o tempo
+gasto vai para `EstatisticasExecucao.tempos_fases`. Se o processo iniciado
+terminar com erro, a espera pela janela de login para na hora.
+"""
+
+import os
+import subprocess
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from config import Config
+from drivers import DriverEntrada, obter_driver
+from esperas import EsperaAdaptativa, Relogio
+from indice_janelas import IndiceJanelas
+from logger import log
+
+
+FASES = ('processo', 'janela_login', 'login_aceito', 'principal')
+
+
+class ProvedorJanelas(ABC):
+    """Processo do PDV e títulos das janelas de topo."""
+    
+    @abstractmethod
+    def validar(self, caminho_exe: str) -> bool:
+        """Se o PDV pode ser iniciado a partir de `caminho_exe`."""
+    
+    @abstractmethod
+    def iniciar(self, caminho_exe: str):
+        pass
+    
+    @abstractmethod
+    def falhou(self) -> bool:
+        """Se o processo iniciado já terminou com código de erro."""
+    
+    @abstractmethod
+    def listar_titulos(self) -> List[str]:
+        pass
+    
+    @abstractmethod
+    def ativar(self, titulo: str) -> bool:
+        pass
+
+
+class ProvedorJanelasDriver(ProvedorJanelas):
+    """Provedor real: subprocess + enumeração de janelas do driver."""
+    
+    def __init__(self, driver: DriverEntrada):
+        self.driver = driver
+        self.processo = None
+    
+    def validar(self, caminho_exe: str) -> bool:
+        return os.path.exists(caminho_exe)
+    
+    def iniciar(self, caminho_exe: str):
+        # via shell, como antes: aceita .bat e lançadores além do .exe
+        self.processo = subprocess.Popen(caminho_exe, shell=True)
+    
+    def falhou(self) -> bool:
+        # lançador que sai com 0 já passou o controle ao PDV
+        return self.processo is not None and self.processo.poll() not in (None, 0)
+    
+    def listar_titulos(self) -> List[str]:
+        return self.driver.listar_titulos()
+    
+    def ativar(self, titulo: str) -> bool:
+        janelas = self.driver.procurar_janelas(titulo)
+        if not janelas:
+            return False
+        janelas[0].activate()
+        return True
+
+
+class ProvedorJanelasSimulado(ProvedorJanelas):
+    """Substituto para testes: títulos visíveis seguem uma linha do tempo.
+
+    `linha_do_tempo` é uma lista de (segundos após iniciar, [títulos]).
+    """
+    
+    def __init__(self, relogio: Relogio, linha_do_tempo: List[Tuple[float, List[str]]],
+                 processo_vivo: bool = True):
+        self.relogio = relogio
+        self.linha_do_tempo = sorted(linha_do_tempo)
+        self.processo_vivo = processo_vivo
+        self.inicio = None
+        self.ativacoes: List[str] = []
+    
+    def validar(self, caminho_exe: str) -> bool:
+        return True
+    
+    def iniciar(self, caminho_exe: str):
+        self.inicio = self.relogio.agora()
+    
+    def falhou(self) -> bool:
+        return self.inicio is not None and not self.processo_vivo
+    
+    def listar_titulos(self) -> List[str]:
+        if self.inicio is None:
+            return []
+        decorrido = self.relogio.agora() - self.inicio
+        titulos = []
+        for instante, visiveis in self.linha_do_tempo:
+            if instante > decorrido:
+                break
+            titulos = visiveis
+        return list(titulos)
+    
+    def ativar(self, titulo: str) -> bool:
+        self.ativacoes.append(titulo)
+        return titulo in self.listar_titulos()
+
+
+class InicializadorPDV:
+    """Máquina de estados de abertura e login do PDV."""
+    
+    def __init__(self, caminho_exe: str, usuario: str, senha: str,
+                 driver: DriverEntrada = None, provedor: ProvedorJanelas = None,
+                 timeouts: Dict[str, float] = None):
+        self.caminho_exe = caminho_exe
+        self.usuario = usuario
+        self.senha = senha
+        self.driver = driver or obter_driver()
+        self.provedor = provedor or ProvedorJanelasDriver(self.driver)
+        self.timeouts = {**Config.PDV_TIMEOUTS_FASES, **(timeouts or {})}
+        self.espera = EsperaAdaptativa(relogio=self.driver.relogio,
+                                       intervalo=Config.PDV_INTERVALO_SONDAGEM)
+        self.tempos: Dict[str, float] = {}
+        self.titulo_login: Optional[str] = None
+        self.indice = IndiceJanelas(self.provedor)
+        self.candidatos = Config.TITULOS_LOGIN_PDV + [Config.JANELA_PDV]
+    
+    def _sondar(self, fase: str, condicao) -> bool:
+        inicio = self.driver.relogio.agora()
+        ok = self.espera.ate(condicao, self.timeouts[fase], fase)
+        self.tempos[fase] = round(self.driver.relogio.agora() - inicio, 3)
+        log.info(f"Fase '{fase}': {'ok' if ok else 'tempo esgotado'} em {self.tempos[fase]:.1f}s")
+        return ok
+    
+    def _procurar_login(self) -> bool:
+        encontrados = self.indice.varrer(Config.TITULOS_LOGIN_PDV)
+        self.titulo_login = IndiceJanelas.primeiro(encontrados, Config.TITULOS_LOGIN_PDV)
+        return self.titulo_login is not None
+    
+    def _principal_visivel(self) -> bool:
+        return Config.JANELA_PDV in self.indice.varrer([Config.JANELA_PDV])
+    
+    def _login_aceito(self) -> bool:
+        encontrados = self.indice.varrer(self.candidatos)
+        if Config.JANELA_PDV in encontrados:
+            return True
+        return self.titulo_login is not None and self.titulo_login not in self.indice.titulos
+    
+    def _digitar_credenciais(self):
+        self.driver.hotkey('ctrl', 'a')
+        self.driver.pausa(0.2)
+        
+        self.driver.write(self.usuario)
+        log.info(f"Usuário digitado: {self.usuario}")
+        self.driver.pausa(0.5)
+        
+        self.driver.press('tab')
+        self.driver.pausa(0.3)
+        
+        self.driver.write(self.senha)
+        log.info("Senha digitada")
+        self.driver.pausa(0.5)
+        
+        self.driver.press('enter')
+        log.info("Login confirmado (Enter)")
+    
+    def executar(self) -> bool:
+        if not self.provedor.validar(self.caminho_exe):
+            log.error(f"Executável não encontrado: {self.caminho_exe}")
+            return False
+        
+        log.info(f"Abrindo PDV: {self.caminho_exe}")
+        inicio = self.driver.relogio.agora()
+        self.provedor.iniciar(self.caminho_exe)
+        self.tempos['processo'] = round(self.driver.relogio.agora() - inicio, 3)
+        
+        encontrou = self._sondar('janela_login', lambda: self.provedor.falhou() or self._procurar_login())
+        if self.provedor.falhou():
+            log.error("Processo do PDV terminou com erro")
+            return False
+        
+        if encontrou:
+            log.info(f"Janela encontrada: {self.titulo_login}")
+            self.provedor.ativar(self.titulo_login)
+        else:
+            log.warning("Janela específica não encontrada, continuando com foco na tela atual...")
+            try:
+                self.driver.hotkey('alt', 'tab')
+                self.driver.pausa(0.5)
+            except:
+                pass
+        
+        log.info("Realizando login automático...")
+        self.driver.pausa(Config.PDV_ESTABILIZACAO_LOGIN)
+        self._digitar_credenciais()
+        
+        if not self._sondar('login_aceito', self._login_aceito):
+            log.warning("Não foi possível confirmar o login pela tela")
+        
+        if not self._sondar('principal', self._principal_visivel):
+            log.warning(f"Janela '{Config.JANELA_PDV}' não detectada, continuando...")
+        
+        log.info("PDV aberto e logado com sucesso!")
+        return True
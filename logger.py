@@ -1,17 +1,27 @@
-"""Logging do projeto e exportação de relatórios (TXT/CSV)."""
+"""Logging do projeto: fila, arquivo de log e buffer de eventos."""
 
+import atexit
 import logging
 import sys
+import time
 import queue
 import threading
 import datetime
-import csv
 import os
-import json
-from collections import defaultdict
-from typing import List
-from models import ResumoNota, VendaPDV, EstatisticasExecucao
-from utils import formatar_moeda_br, formatar_numero_br
+from config import Config
+from buffer_eventos import BufferEventos
+from saidas_log import criar_saida_jsonl, criar_saida_csv
+from artefatos import artefatos
+
+
+NIVEIS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+}
+
+SEPARADOR = "=" * 60
 
 
 class SistemaLogging:
@@ -39,219 +49,187 @@ class SistemaLogging:
         
         self.file_handler = None
         self.caminho_log = None
+        self.lote_max = Config.LOG_LOTE_MAX
+        self.nivel_eventos = NIVEIS[Config.EVENTOS_NIVEL_MINIMO]
+        self._fechado = False
         self.queue = queue.Queue()
+        self.metricas = []
+        self.eventos = BufferEventos(Config.EVENTOS_CAPACIDADE_MEMORIA, Config.EVENTOS_LOTE_TRANSBORDO)
         self.worker_thread = threading.Thread(target=self._processar_fila, daemon=True)
         self.worker_thread.start()
-        self.metricas = []
-        self.eventos = []
+        atexit.register(self.eventos.fechar)
+        atexit.register(self.fechar)
+    
+    def fechar_arquivo_log(self):
+        """Escreve o que está na fila e fecha o arquivo de log atual."""
+        self.descarregar()
+        if self.file_handler is not None:
+            self.logger.removeHandler(self.file_handler)
+            self.file_handler.close()
+            self.file_handler = None
     
     def criar_arquivo_log(self, formato: str = 'txt') -> str:
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.fechar_arquivo_log()
         
-        if formato.upper() == 'TXT':
-            filename = f"log_automacao_nf_{timestamp}.txt"
+        
+        if formato.upper() == 'JSON':
+            filename = artefatos.arquivo(f"log_automacao_nf_{timestamp}.jsonl", 'log')
+            self.file_handler = criar_saida_jsonl(filename)
+        elif formato.upper() == 'CSV':
+            filename = artefatos.arquivo(f"log_automacao_nf_{timestamp}.csv", 'log')
+            self.file_handler = criar_saida_csv(filename)
+        else:
+            filename = artefatos.arquivo(f"log_automacao_nf_{timestamp}.txt", 'log')
             self.file_handler = logging.FileHandler(filename, encoding='utf-8')
-            self.file_handler.setLevel(logging.DEBUG)
             file_format = logging.Formatter(
                 '%(asctime)s | %(levelname)-8s | %(funcName)-20s | %(message)s',
                 datefmt='%d/%m/%Y %H:%M:%S'
             )
             self.file_handler.setFormatter(file_format)
-            self.logger.addHandler(self.file_handler)
-        else:
-            filename = f"log_automacao_nf_{timestamp}.{formato.lower()}"
+        
+        self.file_handler.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.file_handler)
         
         self.caminho_log = filename
         self.info(f"Log iniciado: {filename} (Formato: {formato})")
         return filename
     
     def _processar_fila(self):
-        while True:
+        """A cada despertar esvazia a fila (até `lote_max`) e escreve tudo num bloco."""
+        parar = False
+        while not parar:
             try:
-                level, msg, extra = self.queue.get(timeout=1)
-                if level == 'info':
-                    self.logger.info(msg)
-                elif level == 'error':
-                    self.logger.error(msg)
-                elif level == 'warning':
-                    self.logger.warning(msg)
-                elif level == 'debug':
-                    self.logger.debug(msg)
-                
+                lote = [self.queue.get(timeout=1)]
+            except queue.Empty:
+                continue
+            while len(lote) < self.lote_max:
+                try:
+                    lote.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            pendentes = []
+            for item in lote:
+                if item[0] == '_marca':
+                    self._escrever(pendentes)
+                    pendentes = []
+                    item[1].set()
+                elif item[0] == '_parar':
+                    parar = True
+                else:
+                    pendentes.append(item)
+            self._escrever(pendentes)
+    
+    def _nivel_minimo(self) -> int:
+        """Menor nível aceito por alguma saída (handlers ou eventos)."""
+        return min([h.level for h in self.logger.handlers] + [self.nivel_eventos])
+    
+    @staticmethod
+    def _renderizar(msg, args) -> str:
+        try:
+            if callable(msg):
+                return str(msg(*args))
+            return msg % args if args else str(msg)
+        except Exception as e:
+            return f"{msg!r} {args!r} (falha ao formatar: {e})"
+    
+    def _escrever(self, lote):
+        if not lote:
+            return
+        
+        minimo = self._nivel_minimo()
+        registros = []
+        for level, msg, args, extra, instante in lote:
+            nivel = NIVEIS[level]
+            if nivel < minimo:
+                continue
+            texto = self._renderizar(msg, args)
+            registro = self.logger.makeRecord(self.logger.name, nivel, '', 0, texto, None, None,
+                                              func='_processar_fila')
+            registro.created = instante
+            registro.msecs = (instante - int(instante)) * 1000
+            registro.extra_evento = extra
+            registros.append(registro)
+            if nivel >= self.nivel_eventos:
                 self.eventos.append({
-                    'timestamp': datetime.datetime.now().isoformat(),
+                    'timestamp': datetime.datetime.fromtimestamp(instante).isoformat(),
                     'level': level,
-                    'mensagem': msg,
+                    'mensagem': texto,
                     'extra': extra
                 })
-            except queue.Empty:
+        
+        for handler in self.logger.handlers:
+            aceitos = [r for r in registros if r.levelno >= handler.level and handler.filter(r)]
+            if not aceitos:
+                continue
+            stream = getattr(handler, 'stream', None)
+            if stream is None:
+                for registro in aceitos:
+                    handler.handle(registro)
                 continue
+            handler.acquire()
+            try:
+                stream.write(''.join(handler.format(r) + handler.terminator for r in aceitos))
+                handler.flush()
+            except Exception:
+                handler.handleError(aceitos[-1])
+            finally:
+                handler.release()
     
-    def info(self, msg: str, extra: dict = None):
-        self.queue.put(('info', msg, extra))
+    def _registrar(self, level: str, msg, args: tuple, extra: dict):
+        """Enfileira a mensagem sem formatar; `msg % args` (ou `msg(*args)`) só
+        é montado na thread do log, e só se alguma saída aceita o nível."""
+        if NIVEIS[level] < self._nivel_minimo():
+            return
+        item = (level, msg, args, extra, time.time())
+        if self._fechado:
+            self._escrever([item])
+        else:
+            self.queue.put(item)
     
-    def error(self, msg: str, extra: dict = None):
-        self.queue.put(('error', msg, extra))
+    def descarregar(self, prazo: float = None) -> bool:
+        """Espera o que já está na fila ser escrito; False se o prazo acabar antes."""
+        if self._fechado or not self.worker_thread.is_alive():
+            return True
+        pronto = threading.Event()
+        self.queue.put(('_marca', pronto, None, None, None))
+        return pronto.wait(Config.LOG_PRAZO_DESCARGA if prazo is None else prazo)
     
-    def warning(self, msg: str, extra: dict = None):
-        self.queue.put(('warning', msg, extra))
+    def fechar(self, prazo: float = None):
+        """Escreve o que resta na fila e encerra a thread (chamado também no atexit)."""
+        if self._fechado:
+            return
+        limite = time.monotonic() + (Config.LOG_PRAZO_DESCARGA if prazo is None else prazo)
+        self.queue.put(('_parar', None, None, None, None))
+        self.worker_thread.join(max(0.0, limite - time.monotonic()))
+        self._fechado = True
+        
+        if not self.worker_thread.is_alive():
+            restantes = []
+            while True:
+                try:
+                    restantes.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._escrever([item for item in restantes if not item[0].startswith('_')])
+        for handler in self.logger.handlers:
+            handler.flush()
     
-    def debug(self, msg: str, extra: dict = None):
-        self.queue.put(('debug', msg, extra))
+    flush = descarregar
+    close = fechar
     
-    def exportar_csv_vendas(self, vendas: List[VendaPDV], filename: str = None) -> str:
-        if not filename:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"relatorio_vendas_pdv_{timestamp}.csv"
-        
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f, delimiter=';', quoting=csv.QUOTE_MINIMAL)
-            
-            writer.writerow(['RELATORIO DE VENDAS - PDV'])
-            writer.writerow(['Gerado em:', datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')])
-            writer.writerow([])
-            
-            writer.writerow(['RESUMO EXECUTIVO'])
-            writer.writerow(['Total de Vendas:', len(vendas)])
-            writer.writerow(['Vendas com Sucesso:', sum(1 for v in vendas if v.status == 'OK')])
-            writer.writerow(['Vendas com Falha:', sum(1 for v in vendas if v.status == 'ERRO')])
-            writer.writerow(['Total de Itens:', sum(len(v.itens) for v in vendas)])
-            writer.writerow(['Valor Total Geral:', f"R$ {formatar_moeda_br(sum(v.valor_total for v in vendas))}"])
-            writer.writerow([])
-            
-            writer.writerow(['DETALHAMENTO POR VENDA'])
-            writer.writerow([
-                'N Venda', 'Status', 'Itens Totais', 'Itens OK', 'Itens Falha',
-                'Qtd Total', 'Valor Total', 'Tempo (s)', 'Inicio', 'Fim'
-            ])
-            
-            for venda in vendas:
-                writer.writerow([
-                    venda.numero,
-                    venda.status,
-                    len(venda.itens),
-                    venda.itens_sucesso,
-                    venda.itens_falha,
-                    formatar_numero_br(venda.quantidade_total, casas=3, usar_milhar=False),
-                    formatar_moeda_br(venda.valor_total),
-                    formatar_numero_br(venda.tempo_total, casas=2, usar_milhar=False),
-                    venda.timestamp_inicio.strftime('%H:%M:%S'),
-                    venda.timestamp_fim.strftime('%H:%M:%S') if venda.timestamp_fim else 'N/A'
-                ])
-            
-            writer.writerow([])
-            
-            writer.writerow(['DETALHAMENTO POR ITEM'])
-            writer.writerow([
-                'N Venda', 'Seq', 'Codigo Produto', 'Unidade', 'Quantidade',
-                'Valor Unitario', 'Valor Total', 'Status', 'Tempo Proc (s)',
-                'Inicio Item', 'Fim Item'
-            ])
-            
-            for venda in vendas:
-                for seq, item in enumerate(venda.itens, 1):
-                    writer.writerow([
-                        venda.numero,
-                        seq,
-                        item.produto.codigo,
-                        item.produto.unidade,
-                        formatar_numero_br(item.quantidade, casas=3, usar_milhar=False) if item.produto.unidade == 'KG' else int(item.quantidade),
-                        formatar_moeda_br(item.valor_unitario),
-                        formatar_moeda_br(item.valor_total),
-                        item.status,
-                        formatar_numero_br(item.tempo_processamento, casas=2, usar_milhar=False),
-                        item.timestamp_inicio.strftime('%H:%M:%S.%f')[:-3],
-                        item.timestamp_fim.strftime('%H:%M:%S.%f')[:-3] if item.timestamp_fim else 'N/A'
-                    ])
-        
-        self.info(f"Relatorio CSV de vendas exportado: {filename}")
-        return filename
+    def info(self, msg, *args, extra: dict = None):
+        self._registrar('info', msg, args, extra)
     
-    def exportar_csv(self, resumos: List[ResumoNota], filename: str = None) -> str:
-        if not filename:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"relatorio_detalhado_{timestamp}.csv"
-        
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f, delimiter=';', quoting=csv.QUOTE_MINIMAL)
-            
-            writer.writerow(['RELATORIO DE AUTOMACAO - NOTAS FISCAIS DE ENTRADA'])
-            writer.writerow(['Gerado em:', datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')])
-            writer.writerow([])
-            
-            writer.writerow(['RESUMO EXECUTIVO'])
-            writer.writerow(['Total de Notas:', len(resumos)])
-            writer.writerow(['Notas com Sucesso:', sum(1 for r in resumos if r.status == 'OK')])
-            writer.writerow(['Notas com Falha:', sum(1 for r in resumos if r.status == 'ERRO')])
-            writer.writerow(['Total de Itens:', sum(len(r.itens) for r in resumos)])
-            writer.writerow(['Valor Total Geral:', f"R$ {formatar_moeda_br(sum(r.valor_total for r in resumos))}"])
-            writer.writerow([])
-            
-            writer.writerow(['DETALHAMENTO POR NOTA'])
-            writer.writerow([
-                'N Nota', 'Status', 'Itens Totais', 'Itens OK', 'Itens Falha',
-                'Qtd UN', 'Qtd KG', 'Qtd Total', 'Valor Total', 'Tempo (s)', 
-                'Inicio', 'Fim'
-            ])
-            
-            for resumo in resumos:
-                writer.writerow([
-                    resumo.numero,
-                    resumo.status,
-                    len(resumo.itens),
-                    resumo.itens_sucesso,
-                    resumo.itens_falha,
-                    resumo.total_un,
-                    resumo.total_kg,
-                    formatar_numero_br(resumo.quantidade_total, casas=3, usar_milhar=False),
-                    formatar_moeda_br(resumo.valor_total),
-                    formatar_numero_br(resumo.tempo_total, casas=2, usar_milhar=False),
-                    resumo.timestamp_inicio.strftime('%H:%M:%S'),
-                    resumo.timestamp_fim.strftime('%H:%M:%S') if resumo.timestamp_fim else 'N/A'
-                ])
-            
-            writer.writerow([])
-            
-            writer.writerow(['DETALHAMENTO POR ITEM'])
-            writer.writerow([
-                'N Nota', 'Seq', 'Codigo Produto', 'Unidade', 'Quantidade',
-                'Valor Unitario', 'Valor Total', 'Status', 'Tempo Proc (s)',
-                'Inicio Item', 'Fim Item'
-            ])
-            
-            for resumo in resumos:
-                for seq, item in enumerate(resumo.itens, 1):
-                    writer.writerow([
-                        resumo.numero,
-                        seq,
-                        item.produto.codigo,
-                        item.produto.unidade,
-                        formatar_numero_br(item.quantidade, casas=3, usar_milhar=False) if item.produto.unidade == 'KG' else int(item.quantidade),
-                        formatar_moeda_br(item.valor_unitario),
-                        formatar_moeda_br(item.valor_total),
-                        item.status,
-                        formatar_numero_br(item.tempo_processamento, casas=2, usar_milhar=False),
-                        item.timestamp_inicio.strftime('%H:%M:%S.%f')[:-3],
-                        item.timestamp_fim.strftime('%H:%M:%S.%f')[:-3] if item.timestamp_fim else 'N/A'
-                    ])
-            
-            writer.writerow([])
-            
-            writer.writerow(['FREQUENCIA DE PRODUTOS'])
-            produto_freq = defaultdict(lambda: {'count': 0, 'unidade': '', 'valor_total': 0})
-            for resumo in resumos:
-                for item in resumo.itens:
-                    cod = item.produto.codigo
-                    produto_freq[cod]['count'] += 1
-                    produto_freq[cod]['unidade'] = item.produto.unidade
-                    produto_freq[cod]['valor_total'] += item.valor_total
-            
-            writer.writerow(['Codigo', 'Unidade', 'Vezes Usado', 'Valor Total Acumulado'])
-            for cod, dados in sorted(produto_freq.items(), key=lambda x: x[1]['count'], reverse=True):
-                writer.writerow([cod, dados['unidade'], dados['count'], formatar_moeda_br(dados['valor_total'])])
-        
-        self.info(f"Relatorio CSV exportado: {filename}")
-        return filename
+    def error(self, msg, *args, extra: dict = None):
+        self._registrar('error', msg, args, extra)
+    
+    def warning(self, msg, *args, extra: dict = None):
+        self._registrar('warning', msg, args, extra)
+    
+    def debug(self, msg, *args, extra: dict = None):
+        self._registrar('debug', msg, args, extra)
 
 
 # Instância global do logger
@@ -3,19 +3,25 @@
 import os
 import sys
 import time
+import argparse
 import datetime
+from typing import Dict
 from tkinter import messagebox
-import pyautogui
 
 # Importações dos módulos locais
 from config import Config
-from logger import log
+from logger import log, SEPARADOR
 from ui_menu import MenuPrincipal
 from ui_orientacoes import TelaOrientacoes
 from ui_dashboard import DashboardExecucao
 from automacao_sga import AutomacaoSGA
 from automacao_pdv import AutomacaoPDV
-from utils import tocar_som_sucesso, tocar_som_erro, formatar_moeda_br, formatar_numero_br
+from drivers import obter_driver
+from diario_execucao import DiarioExecucao
+from settings_manager import SettingsManager
+from artefatos import artefatos
+from utils import tocar_som_sucesso, tocar_som_erro
+from modelo_relatorio import txt_consolidado
 
 
 class SistemaAutomacaoMultiSistema:
@@ -25,7 +31,7 @@ class SistemaAutomacaoMultiSistema:
         self.log = log
         self.resultados = {}
     
-    def executar(self):
+    def executar(self, extras: Dict = None):
         print("=" * 60)
         print("SISTEMA DE AUTOMAÇÃO MULTI-SISTEMA - SGA e PDV")
         print("=" * 60)
@@ -42,6 +48,7 @@ class SistemaAutomacaoMultiSistema:
             sistema = selecoes['sistema']
             fluxos = selecoes['fluxos']
             config = selecoes['config']
+            config.update({k: v for k, v in (extras or {}).items() if v is not None})
             
             print(f"\nSistema selecionado: {sistema}")
             print(f"Fluxos selecionados: {', '.join(fluxos.keys())}")
@@ -52,54 +59,85 @@ class SistemaAutomacaoMultiSistema:
                 print("Cancelado pelo usuário na fase de orientações.")
                 return
             
-            self.log.criar_arquivo_log(config['formato_log'])
-            self.log.info("=" * 60)
-            self.log.info(f"AUTOMAÇÃO {sistema} - INICIANDO")
-            self.log.info("=" * 60)
-            self.log.info(f"Data: {datetime.datetime.now():%d/%m/%Y %H:%M:%S}")
-            self.log.info(f"Sistema: {sistema}")
-            self.log.info(f"Fluxos: {list(fluxos.keys())}")
-            self.log.info(f"Configurações: {config}")
-            
-            dashboard = DashboardExecucao(sistema)
-            dashboard.iniciar()
-            time.sleep(1)
-            
-            try:
-                if sistema == "SGA":
-                    resultados = self._executar_sga(fluxos, config, dashboard)
-                elif sistema == "PDV":
-                    resultados = self._executar_pdv(fluxos, config, dashboard)
-                else:
-                    raise ValueError(f"Sistema não suportado: {sistema}")
-                
-                self._processar_resultados(resultados, sistema, fluxos, dashboard)
-                
-            except Exception as e:
-                self.log.error(f"ERRO NA EXECUÇÃO: {e}")
-                tocar_som_erro()
-                
-                try:
-                    screenshot = pyautogui.screenshot()
-                    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                    screenshot.save(f"erro_automacao_{sistema}_{timestamp}.png")
-                    self.log.info(f"Screenshot do erro salvo: erro_automacao_{sistema}_{timestamp}.png")
-                except:
-                    pass
-                
-                messagebox.showerror("Erro", f"Falha na automação:\n\n{str(e)}")
-                raise
-                
-            finally:
-                try:
-                    dashboard.fechar()
-                except:
-                    pass
+            self._executar_selecao(sistema, fluxos, config)
                     
         except Exception as e:
             self.log.error(f"Erro geral: {e}")
             raise
     
+    def retomar(self, caminho_diario: str):
+        """Continua uma execução interrompida a partir do diário (--resume)."""
+        estado = DiarioExecucao.ler(caminho_diario)
+        if estado.concluido:
+            print(f"A execução registrada em {caminho_diario} já foi concluída.")
+            return
+        
+        print(f"Retomando {estado.sistema} / {estado.fluxo}: "
+              f"{len(estado.documentos)}/{estado.total_documentos} documentos concluídos")
+        
+        config = dict(estado.config)
+        config['retomada'] = estado
+        if estado.sistema == "PDV" and 'senha_pdv' not in config:
+            config['senha_pdv'] = SettingsManager().get_pdv_senha()
+        
+        try:
+            self._executar_selecao(estado.sistema, {estado.fluxo: {}}, config)
+        except Exception as e:
+            self.log.error(f"Erro geral: {e}")
+            raise
+    
+    def _executar_selecao(self, sistema, fluxos, config):
+        retomada = config.get('retomada')
+        artefatos.iniciar_execucao(sistema, preservar=retomada.caminho if retomada else None)
+        self.log.criar_arquivo_log(config.get('formato_log', 'TXT'))
+        self.log.info(f"Pasta da execução: {artefatos.pasta}")
+        self.log.info(SEPARADOR)
+        self.log.info("AUTOMAÇÃO %s - INICIANDO", sistema)
+        self.log.info(SEPARADOR)
+        self.log.info(f"Data: {datetime.datetime.now():%d/%m/%Y %H:%M:%S}")
+        self.log.info(f"Sistema: {sistema}")
+        self.log.info(f"Fluxos: {list(fluxos.keys())}")
+        self.log.info(f"Configurações: {config}")
+        
+        dashboard = DashboardExecucao(sistema)
+        dashboard.iniciar()
+        time.sleep(1)
+        
+        status = 'ERRO'
+        try:
+            if sistema == "SGA":
+                resultados = self._executar_sga(fluxos, config, dashboard)
+            elif sistema == "PDV":
+                resultados = self._executar_pdv(fluxos, config, dashboard)
+            else:
+                raise ValueError(f"Sistema não suportado: {sistema}")
+            
+            self._processar_resultados(resultados, sistema, fluxos, dashboard)
+            status = 'CONCLUIDO'
+            
+        except Exception as e:
+            self.log.error(f"ERRO NA EXECUÇÃO: {e}")
+            tocar_som_erro()
+            
+            try:
+                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                captura = artefatos.arquivo(f"erro_automacao_{sistema}_{timestamp}.png", 'captura')
+                obter_driver().screenshot(captura)
+                self.log.info(f"Screenshot do erro salvo: {captura}")
+            except:
+                pass
+            
+            messagebox.showerror("Erro", f"Falha na automação:\n\n{str(e)}")
+            raise
+            
+        finally:
+            try:
+                dashboard.fechar()
+            except:
+                pass
+            self.log.fechar_arquivo_log()
+            artefatos.finalizar_execucao(status)
+    
     def _executar_sga(self, fluxos, config, dashboard):
         automacao = AutomacaoSGA(dashboard)
         resultados = {}
@@ -107,9 +145,9 @@ class SistemaAutomacaoMultiSistema:
         for fluxo in fluxos.keys():
             try:
                 dashboard.atualizar('status', texto=f"Executando: {fluxo}")
-                self.log.info(f"\n{'='*60}")
-                self.log.info(f"INICIANDO FLUXO: {fluxo}")
-                self.log.info(f"{'='*60}")
+                self.log.info("\n%s", SEPARADOR)
+                self.log.info("INICIANDO FLUXO: %s", fluxo)
+                self.log.info(SEPARADOR)
                 
                 if fluxo == "Entrada de Produtos":
                     resultado = automacao.executar_fluxo_entrada_produtos(config)
@@ -133,9 +171,9 @@ class SistemaAutomacaoMultiSistema:
         for fluxo in fluxos.keys():
             try:
                 dashboard.atualizar('status', texto=f"Executando: {fluxo}")
-                self.log.info(f"\n{'='*60}")
-                self.log.info(f"INICIANDO FLUXO: {fluxo}")
-                self.log.info(f"{'='*60}")
+                self.log.info("\n%s", SEPARADOR)
+                self.log.info("INICIANDO FLUXO: %s", fluxo)
+                self.log.info(SEPARADOR)
                 
                 if fluxo == "Vendas Simples":
                     resultado = automacao.executar_fluxo_vendas_simples(config)
@@ -195,7 +233,7 @@ Relatórios gerados:
     
     def _gerar_relatorio_consolidado(self, resultados, sistema, fluxos):
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"relatorio_consolidado_{sistema}_{timestamp}.txt"
+        filename = artefatos.arquivo(f"relatorio_consolidado_{sistema}_{timestamp}.txt", 'relatorio')
         
         with open(filename, 'w', encoding='utf-8') as f:
             f.write("=" * 80 + "\n")
@@ -227,34 +265,35 @@ Relatórios gerados:
                 else:
                     f.write(f"  Erro: {resultado.get('erro', 'Erro desconhecido')}\n")
             
-            if sistema == "SGA" and "Entrada de Produtos" in resultados and resultados["Entrada de Produtos"].get('sucesso'):
-                entrada_result = resultados["Entrada de Produtos"]
-                if 'estatisticas' in entrada_result:
-                    stats = entrada_result['estatisticas']
-                    f.write("\n" + "-" * 80 + "\n")
-                    f.write("ESTATÍSTICAS DETALHADAS - ENTRADA DE PRODUTOS\n")
-                    f.write("-" * 80 + "\n")
-                    f.write(f"  Notas processadas: {stats.processos_sucesso}/{stats.total_processos}\n")
-                    f.write(f"  Itens processados: {stats.itens_sucesso}\n")
-                    f.write(f"  Valor total: R$ {formatar_moeda_br(stats.valor_total)}\n")
-                    f.write(f"  Tempo total: {formatar_numero_br(stats.tempo_total/60, casas=1, usar_milhar=False)} minutos\n")
-            
-            if sistema == "PDV" and "Vendas Simples" in resultados and resultados["Vendas Simples"].get('sucesso'):
-                vendas_result = resultados["Vendas Simples"]
-                if 'estatisticas' in vendas_result:
-                    stats = vendas_result['estatisticas']
-                    f.write("\n" + "-" * 80 + "\n")
-                    f.write("ESTATÍSTICAS DETALHADAS - VENDAS SIMPLES\n")
-                    f.write("-" * 80 + "\n")
-                    f.write(f"  Vendas processadas: {stats.processos_sucesso}/{stats.total_processos}\n")
-                    f.write(f"  Itens processados: {stats.itens_sucesso}\n")
-                    f.write(f"  Valor total: R$ {formatar_moeda_br(stats.valor_total)}\n")
-                    f.write(f"  Tempo total: {formatar_numero_br(stats.tempo_total/60, casas=1, usar_milhar=False)} minutos\n")
+            for fluxo, resultado in resultados.items():
+                if resultado.get('sucesso') and 'modelo' in resultado:
+                    f.write(txt_consolidado(resultado['modelo'], resultado['estatisticas'], fluxo))
         
         self.log.info(f"Relatório consolidado: {filename}")
         return filename
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Automação multi-sistema (SGA e PDV)")
+    parser.add_argument('--resume', metavar='DIARIO',
+                        help="retoma a execução interrompida registrada no diário (.jsonl)")
+    parser.add_argument('--semente', type=int, metavar='N',
+                        help="semente do sorteio de produtos (seleção reproduzível)")
+    parser.add_argument('--plano', metavar='ARQUIVO',
+                        help="executa os documentos de um arquivo de plano (.plan) em vez de sortear")
+    parser.add_argument('--salvar-plano', metavar='ARQUIVO',
+                        help="salva o plano sorteado para reexecutar depois com --plano")
+    args = parser.parse_args()
+    
     sistema = SistemaAutomacaoMultiSistema()
-    sistema.executar()
+    try:
+        if args.resume:
+            sistema.retomar(args.resume)
+        else:
+            sistema.executar({
+                'semente_amostragem': args.semente,
+                'arquivo_plano': args.plano,
+                'salvar_plano': args.salvar_plano,
+            })
+    finally:
+        log.fechar()
@@ -0,0 +1,282 @@
+"""Modelo único dos relatórios, montado numa só passada pelos documentos.
+
+`ModeloRelatorio.adicionar` percorre um ResumoNota/VendaPDV e seus itens uma
+única vez e produz a linha do documento, as linhas dos itens, os totais e a
+frequência de produtos. Os relatórios TXT/CSV/JSON incrementais e o
+consolidado do main.py são renderizados a partir do modelo, com as funções
+de formatação deste módulo.
+"""
+
+import datetime
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from models import EstatisticasExecucao
+from utils import formatar_numero_br
+from dinheiro import formatar_centavos, formatar_milesimos
+
+
+ROTULOS = {
+    'SGA': {
+        'titulo': "RELATORIO DE AUTOMACAO - NOTAS FISCAIS DE ENTRADA",
+        'titulo_txt': "RELATORIO DE AUTOMACAO - NOTAS FISCAIS DE ENTRADA",
+        'estatisticas': "ESTATISTICAS GERAIS",
+        'abertura': None,
+        'documento': "NOTA",
+        'plural': "notas",
+        'chave_json': 'notas',
+        'arquivo': "relatorio",
+    },
+    'PDV': {
+        'titulo': "RELATORIO DE VENDAS - PDV",
+        'titulo_txt': "RELATÓRIO DE VENDAS - PDV",
+        'estatisticas': "ESTATÍSTICAS GERAIS",
+        'abertura': "ABERTURA DO PDV",
+        'documento': "VENDA",
+        'plural': "vendas",
+        'chave_json': 'vendas',
+        'arquivo': "relatorio_vendas_pdv",
+    },
+}
+
+
+@dataclass
+class LinhaDocumento:
+    numero: int
+    status: str
+    itens: int
+    itens_sucesso: int
+    itens_falha: int
+    total_un: int
+    total_kg: int
+    quantidade_milesimos: int
+    valor_centavos: int
+    tempo: float
+    inicio: datetime.datetime
+    fim: Optional[datetime.datetime]
+
+
+@dataclass
+class LinhaItem:
+    documento: int
+    seq: int
+    codigo: str
+    unidade: str
+    quantidade: float
+    quantidade_milesimos: int
+    valor_unitario_centavos: int
+    valor_total_centavos: int
+    status: str
+    tempo: float
+    inicio: datetime.datetime
+    fim: Optional[datetime.datetime]
+
+
+@dataclass
+class FrequenciaProduto:
+    codigo: str
+    unidade: str
+    vezes: int = 0
+    valor_centavos: int = 0
+
+
+class ModeloRelatorio:
+    """Totais e frequência de produtos; as linhas de cada documento são
+    devolvidas por `adicionar` e não ficam guardadas."""
+    
+    def __init__(self, sistema: str = 'SGA'):
+        self.sistema = sistema
+        self.rotulos = ROTULOS[sistema]
+        self.frequencia: Dict[str, FrequenciaProduto] = {}
+        
+        self.total_documentos = 0
+        self.documentos_sucesso = 0
+        self.documentos_falha = 0
+        self.total_itens = 0
+        self.itens_sucesso = 0
+        self.itens_falha = 0
+        self.total_un = 0
+        self.total_kg = 0
+        self.quantidade_milesimos = 0
+        self.valor_centavos = 0
+    
+    def adicionar(self, documento) -> Tuple[LinhaDocumento, List[LinhaItem]]:
+        itens = []
+        sucesso = falha = un = kg = quantidade_doc = valor_doc = 0
+        for seq, item in enumerate(documento.itens, 1):
+            produto = item.produto
+            quantidade = item.quantidade_milesimos
+            valor = item.valor_total_centavos
+            unidade = produto.unidade.upper()
+            sucesso += item.status == "OK"
+            falha += item.status == "FALHA"
+            un += unidade == 'UN'
+            kg += unidade == 'KG'
+            quantidade_doc += quantidade
+            valor_doc += valor
+            
+            frequencia = self.frequencia.get(produto.codigo)
+            if frequencia is None:
+                frequencia = self.frequencia[produto.codigo] = FrequenciaProduto(produto.codigo, produto.unidade)
+            frequencia.unidade = produto.unidade
+            frequencia.vezes += 1
+            frequencia.valor_centavos += valor
+            
+            itens.append(LinhaItem(
+                documento.numero, seq, produto.codigo, produto.unidade,
+                item.quantidade, quantidade, item.valor_unitario_centavos, valor,
+                item.status, item.tempo_processamento, item.timestamp_inicio, item.timestamp_fim))
+        
+        linha = LinhaDocumento(
+            documento.numero, documento.status, len(itens), sucesso, falha, un, kg,
+            quantidade_doc, valor_doc, documento.tempo_total,
+            documento.timestamp_inicio, documento.timestamp_fim)
+        
+        self.total_documentos += 1
+        self.documentos_sucesso += documento.status == 'OK'
+        self.documentos_falha += documento.status == 'ERRO'
+        self.total_itens += len(itens)
+        self.itens_sucesso += sucesso
+        self.itens_falha += falha
+        self.total_un += un
+        self.total_kg += kg
+        self.quantidade_milesimos += quantidade_doc
+        self.valor_centavos += valor_doc
+        return linha, itens
+    
+    def produtos_por_frequencia(self) -> List[FrequenciaProduto]:
+        return sorted(self.frequencia.values(), key=lambda f: f.vezes, reverse=True)
+
+
+# Formatação (compartilhada pelos relatórios incrementais e o consolidado)
+
+def _hora(data: Optional[datetime.datetime], milissegundos: bool = False) -> str:
+    if not data:
+        return 'N/A'
+    return data.strftime('%H:%M:%S.%f')[:-3] if milissegundos else data.strftime('%H:%M:%S')
+
+
+def cabecalho_csv_documento(sistema: str) -> List[str]:
+    colunas = [f"N {ROTULOS[sistema]['documento'].capitalize()}", 'Status', 'Itens Totais', 'Itens OK', 'Itens Falha']
+    if sistema == 'SGA':
+        colunas += ['Qtd UN', 'Qtd KG']
+    return colunas + ['Qtd Total', 'Valor Total', 'Tempo (s)', 'Inicio', 'Fim']
+
+
+def cabecalho_csv_item(sistema: str) -> List[str]:
+    return [
+        f"N {ROTULOS[sistema]['documento'].capitalize()}", 'Seq', 'Codigo Produto', 'Unidade', 'Quantidade',
+        'Valor Unitario', 'Valor Total', 'Status', 'Tempo Proc (s)',
+        'Inicio Item', 'Fim Item'
+    ]
+
+
+def csv_documento(linha: LinhaDocumento, sistema: str) -> list:
+    valores = [linha.numero, linha.status, linha.itens, linha.itens_sucesso, linha.itens_falha]
+    if sistema == 'SGA':
+        valores += [linha.total_un, linha.total_kg]
+    return valores + [
+        formatar_milesimos(linha.quantidade_milesimos),
+        formatar_centavos(linha.valor_centavos),
+        formatar_numero_br(linha.tempo, casas=2, usar_milhar=False),
+        _hora(linha.inicio),
+        _hora(linha.fim),
+    ]
+
+
+def csv_item(linha: LinhaItem) -> list:
+    return [
+        linha.documento,
+        linha.seq,
+        linha.codigo,
+        linha.unidade,
+        formatar_milesimos(linha.quantidade_milesimos) if linha.unidade == 'KG' else int(linha.quantidade),
+        formatar_centavos(linha.valor_unitario_centavos),
+        formatar_centavos(linha.valor_total_centavos),
+        linha.status,
+        formatar_numero_br(linha.tempo, casas=2, usar_milhar=False),
+        _hora(linha.inicio, True),
+        _hora(linha.fim, True),
+    ]
+
+
+def csv_frequencia(modelo: ModeloRelatorio) -> List[list]:
+    linhas = [['FREQUENCIA DE PRODUTOS'], ['Codigo', 'Unidade', 'Vezes Usado', 'Valor Total Acumulado']]
+    for f in modelo.produtos_por_frequencia():
+        linhas.append([f.codigo, f.unidade, f.vezes, formatar_centavos(f.valor_centavos)])
+    return linhas
+
+
+def csv_resumo(modelo: ModeloRelatorio) -> List[list]:
+    plural = modelo.rotulos['plural'].capitalize()
+    return [
+        [f'Total de {plural}:', modelo.total_documentos],
+        [f'{plural} com Sucesso:', modelo.documentos_sucesso],
+        [f'{plural} com Falha:', modelo.documentos_falha],
+        ['Total de Itens:', modelo.total_itens],
+        ['Valor Total Geral:', f"R$ {formatar_centavos(modelo.valor_centavos)}"],
+    ]
+
+
+def txt_documento(linha: LinhaDocumento, sistema: str) -> str:
+    status = "OK" if linha.status == "OK" else "FALHA"
+    return (f"\n[{status}] {ROTULOS[sistema]['documento']} {linha.numero}\n"
+            + "-" * 80 + "\n"
+            + f"  Itens: {linha.itens} (OK: {linha.itens_sucesso}, Falha: {linha.itens_falha})\n"
+            + f"  Valor: R$ {formatar_centavos(linha.valor_centavos)}\n"
+            + f"  Tempo: {formatar_numero_br(linha.tempo, casas=1, usar_milhar=False)}s\n")
+
+
+def txt_estatisticas(modelo: ModeloRelatorio, stats: EstatisticasExecucao) -> str:
+    """Bloco de estatísticas gerais (e a abertura do PDV, se houver)."""
+    plural = modelo.rotulos['plural']
+    texto = (modelo.rotulos['estatisticas'] + "\n"
+             + "-" * 80 + "\n"
+             + f"  {'Total de ' + plural + ':':<21}{stats.total_processos}\n"
+             + f"  {plural.capitalize() + ' com sucesso:':<21}{stats.processos_sucesso}\n"
+             + f"  {plural.capitalize() + ' com falha:':<21}{stats.processos_falha}\n"
+             + f"  Total de itens:      {modelo.total_itens}\n"
+             + f"  Valor total:         R$ {formatar_centavos(modelo.valor_centavos)}\n"
+             + f"  Tempo total:         {formatar_numero_br(stats.tempo_total, casas=1, usar_milhar=False)}s\n")
+    if stats.tempos_fases and modelo.rotulos['abertura']:
+        texto += "\n" + modelo.rotulos['abertura'] + "\n" + "-" * 80 + "\n"
+        for fase, segundos in stats.tempos_fases.items():
+            texto += f"  {fase:<20} {formatar_numero_br(segundos, casas=1, usar_milhar=False)}s\n"
+    return texto
+
+
+def txt_consolidado(modelo: ModeloRelatorio, stats: EstatisticasExecucao, fluxo: str) -> str:
+    plural = modelo.rotulos['plural'].capitalize()
+    return ("\n" + "-" * 80 + "\n"
+            + f"ESTATÍSTICAS DETALHADAS - {fluxo.upper()}\n"
+            + "-" * 80 + "\n"
+            + f"  {plural} processadas: {modelo.documentos_sucesso}/{stats.total_processos}\n"
+            + f"  Itens processados: {modelo.itens_sucesso}\n"
+            + f"  Valor total: R$ {formatar_centavos(modelo.valor_centavos)}\n"
+            + f"  Tempo total: {formatar_numero_br(stats.tempo_total/60, casas=1, usar_milhar=False)} minutos\n")
+
+
+def json_documento(linha: LinhaDocumento, itens: List[LinhaItem]) -> Dict:
+    return {
+        'numero': linha.numero,
+        'status': linha.status,
+        'timestamps': {
+            'inicio': linha.inicio.isoformat(),
+            'fim': linha.fim.isoformat() if linha.fim else None
+        },
+        'totais': {
+            'itens': linha.itens,
+            'un': linha.total_un,
+            'kg': linha.total_kg,
+            'quantidade': linha.quantidade_milesimos / 1000,
+            'valor': linha.valor_centavos / 100
+        },
+        'itens': [{
+            'codigo': item.codigo,
+            'unidade': item.unidade,
+            'quantidade': item.quantidade,
+            'valor_unitario': item.valor_unitario_centavos / 100,
+            'valor_total': item.valor_total_centavos / 100,
+            'status': item.status,
+            'tempo_processamento': item.tempo
+        } for item in itens]
+    }
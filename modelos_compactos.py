@@ -0,0 +1,97 @@
+"""Variantes compactas dos modelos para execuções longas e catálogos sintéticos.
+
+`ProdutoCompacto`, `ItemNotaCompacto` e `ItemVendaCompacto` usam __slots__ e
+guardam os instantes em nanossegundos inteiros (time.time_ns). Aceitam os
+mesmos argumentos de Produto/ItemNota/ItemVenda e expõem `timestamp_inicio`
+e `timestamp_fim` como datetime, então entram nos mesmos ResumoNota/VendaPDV,
+diário e relatórios.
+"""
+
+import datetime
+import time
+from typing import Optional
+from models import Produto, _ProdutoBase, _ItemAgregado
+
+
+def _data_ns(ns: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(ns / 1e9)
+
+
+def _ns_data(data: datetime.datetime) -> int:
+    return int(data.timestamp() * 1e9)
+
+
+class ProdutoCompacto(_ProdutoBase):
+    __slots__ = ('codigo', 'valor_avista', 'unidade')
+    
+    def __init__(self, codigo: str, valor_avista: float, unidade: str):
+        self.codigo = codigo
+        self.valor_avista = valor_avista
+        self.unidade = unidade
+    
+    @classmethod
+    def de(cls, produto: Produto) -> 'ProdutoCompacto':
+        return cls(produto.codigo, produto.valor_avista, produto.unidade)
+    
+    def __eq__(self, outro) -> bool:
+        if not isinstance(outro, (Produto, ProdutoCompacto)):
+            return NotImplemented
+        return (self.codigo, self.valor_avista, self.unidade) == \
+            (outro.codigo, outro.valor_avista, outro.unidade)
+    
+    def __repr__(self) -> str:
+        return f"ProdutoCompacto({self.codigo!r}, {self.valor_avista!r}, {self.unidade!r})"
+
+
+class _ItemCompacto(_ItemAgregado):
+    """ItemNota/ItemVenda com __slots__ e instantes em ns (0 = sem fim)."""
+    __slots__ = ('produto', 'quantidade', 'valor_unitario', 'inicio_ns', 'fim_ns', 'status', '_documento')
+    
+    def __init__(self, produto, quantidade: float, valor_unitario: float,
+                 timestamp_inicio: datetime.datetime = None,
+                 timestamp_fim: Optional[datetime.datetime] = None, status: str = "PENDENTE"):
+        object.__setattr__(self, '_documento', None)
+        self.produto = produto
+        self.quantidade = quantidade
+        self.valor_unitario = valor_unitario
+        self.inicio_ns = _ns_data(timestamp_inicio) if timestamp_inicio else time.time_ns()
+        self.fim_ns = _ns_data(timestamp_fim) if timestamp_fim else 0
+        self.status = status
+    
+    @property
+    def timestamp_inicio(self) -> datetime.datetime:
+        return _data_ns(self.inicio_ns)
+    
+    @timestamp_inicio.setter
+    def timestamp_inicio(self, data: datetime.datetime):
+        self.inicio_ns = _ns_data(data)
+    
+    @property
+    def timestamp_fim(self) -> Optional[datetime.datetime]:
+        return _data_ns(self.fim_ns) if self.fim_ns else None
+    
+    @timestamp_fim.setter
+    def timestamp_fim(self, data: Optional[datetime.datetime]):
+        self.fim_ns = _ns_data(data) if data else 0
+    
+    @property
+    def tempo_processamento(self) -> float:
+        if self.fim_ns:
+            return (self.fim_ns - self.inicio_ns) / 1e9
+        return 0.0
+    
+    def finalizar(self, status: str = "OK"):
+        self.fim_ns = time.time_ns()
+        self.status = status
+    
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}({self.produto!r}, {self.quantidade!r}, "
+                f"{self.valor_unitario!r}, status={self.status!r})")
+
+
+class ItemNotaCompacto(_ItemCompacto):
+    __slots__ = ()
+
+
+class ItemVendaCompacto(_ItemCompacto):
+    __slots__ = ()
@@ -4,13 +4,12 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 import datetime
 import random
+from dinheiro import centavos, milesimos, total_item, reais
 
 
-@dataclass
-class Produto:
-    codigo: str
-    valor_avista: float
-    unidade: str
+class _ProdutoBase:
+    """Regras do produto, comuns a Produto e ProdutoCompacto."""
+    __slots__ = ()
     
     def calcular_valor_unitario(self) -> float:
         return max(0.01, self.valor_avista - 0.01)
@@ -27,7 +26,180 @@ class Produto:
 
 
 @dataclass
-class ItemVenda:
+class Produto(_ProdutoBase):
+    codigo: str
+    valor_avista: float
+    unidade: str
+
+
+_CAMPOS_AGREGADOS = {'status', 'quantidade', 'valor_unitario', 'produto'}
+
+
+class _ItemAgregado:
+    """Valores do item em centavos/milésimos; avisa o documento dono quando
+    status, quantidade, valor ou produto mudam."""
+    __slots__ = ()
+    _documento = None
+    
+    @property
+    def valor_unitario_centavos(self) -> int:
+        return centavos(self.valor_unitario)
+    
+    @property
+    def quantidade_milesimos(self) -> int:
+        return milesimos(self.quantidade)
+    
+    @property
+    def valor_total_centavos(self) -> int:
+        return total_item(self.valor_unitario_centavos, self.quantidade_milesimos)
+    
+    @property
+    def valor_total(self) -> float:
+        return reais(self.valor_total_centavos)
+    
+    def __setattr__(self, nome, valor):
+        documento = self._documento
+        if documento is None or nome not in _CAMPOS_AGREGADOS:
+            object.__setattr__(self, nome, valor)
+            return
+        antigo = getattr(self, nome, None)
+        object.__setattr__(self, nome, valor)
+        if nome == 'status':
+            documento._status_mudou(antigo, valor)
+        else:
+            documento._recalcular()
+
+
+class ListaItens(list):
+    """Lista de itens de um documento; mantém os agregados do dono em dia.
+
+    Sem dono (ex.: cópia feita por dataclasses.asdict) é uma lista comum.
+    """
+    
+    def __init__(self, itens=(), dono=None):
+        super().__init__()
+        self._dono = dono
+        self.extend(itens)
+    
+    def append(self, item):
+        super().append(item)
+        if self._dono is not None:
+            self._dono._somar(item)
+    
+    def extend(self, itens):
+        for item in itens:
+            self.append(item)
+    
+    def __iadd__(self, itens):
+        self.extend(itens)
+        return self
+    
+    def _mudou(self):
+        if self._dono is not None:
+            self._dono._recalcular()
+    
+    def insert(self, indice, item):
+        super().insert(indice, item)
+        self._mudou()
+    
+    def pop(self, indice=-1):
+        item = super().pop(indice)
+        self._mudou()
+        return item
+    
+    def remove(self, item):
+        super().remove(item)
+        self._mudou()
+    
+    def clear(self):
+        super().clear()
+        self._mudou()
+    
+    def __setitem__(self, indice, valor):
+        super().__setitem__(indice, valor)
+        self._mudou()
+    
+    def __delitem__(self, indice):
+        super().__delitem__(indice)
+        self._mudou()
+
+
+class _DocumentoAgregado:
+    """Totais de ResumoNota/VendaPDV mantidos a cada item; leituras O(1).
+
+    Valores somados em centavos e quantidades em milésimos (ver dinheiro.py).
+    """
+    
+    def __setattr__(self, nome, valor):
+        if nome == 'itens':
+            self._zerar()
+            object.__setattr__(self, 'itens', ListaItens(valor or (), dono=self))
+            return
+        object.__setattr__(self, nome, valor)
+    
+    def _zerar(self):
+        object.__setattr__(self, '_quantidade_milesimos', 0)
+        object.__setattr__(self, '_valor_total_centavos', 0)
+        object.__setattr__(self, '_itens_sucesso', 0)
+        object.__setattr__(self, '_itens_falha', 0)
+        object.__setattr__(self, '_por_unidade', {})
+    
+    def _somar(self, item):
+        object.__setattr__(item, '_documento', self)
+        d = self.__dict__
+        quantidade = item.quantidade_milesimos
+        d['_quantidade_milesimos'] += quantidade
+        d['_valor_total_centavos'] += total_item(item.valor_unitario_centavos, quantidade)
+        self._status_mudou(None, item.status)
+        unidade = item.produto.unidade.upper()
+        d['_por_unidade'][unidade] = d['_por_unidade'].get(unidade, 0) + 1
+    
+    def _status_mudou(self, antigo, novo):
+        d = self.__dict__
+        if antigo == "OK":
+            d['_itens_sucesso'] -= 1
+        elif antigo == "FALHA":
+            d['_itens_falha'] -= 1
+        if novo == "OK":
+            d['_itens_sucesso'] += 1
+        elif novo == "FALHA":
+            d['_itens_falha'] += 1
+    
+    def _recalcular(self):
+        self._zerar()
+        for item in self.itens:
+            self._somar(item)
+    
+    @property
+    def quantidade_milesimos(self) -> int:
+        return self._quantidade_milesimos
+    
+    @property
+    def quantidade_total(self) -> float:
+        return self._quantidade_milesimos / 1000
+    
+    @property
+    def valor_total_centavos(self) -> int:
+        return self._valor_total_centavos
+    
+    @property
+    def valor_total(self) -> float:
+        return reais(self._valor_total_centavos)
+    
+    @property
+    def itens_sucesso(self) -> int:
+        return self._itens_sucesso
+    
+    @property
+    def itens_falha(self) -> int:
+        return self._itens_falha
+    
+    def contar_unidade(self, unidade: str) -> int:
+        return self._por_unidade.get(unidade.upper(), 0)
+
+
+@dataclass
+class ItemVenda(_ItemAgregado):
     produto: Produto
     quantidade: float
     valor_unitario: float
@@ -35,10 +207,6 @@ class ItemVenda:
     timestamp_fim: Optional[datetime.datetime] = None
     status: str = "PENDENTE"
     
-    @property
-    def valor_total(self) -> float:
-        return self.valor_unitario * self.quantidade
-    
     @property
     def tempo_processamento(self) -> float:
         if self.timestamp_fim:
@@ -51,7 +219,7 @@ class ItemVenda:
 
 
 @dataclass
-class VendaPDV:
+class VendaPDV(_DocumentoAgregado):
     numero: int
     itens: List[ItemVenda] = field(default_factory=list)
     timestamp_inicio: datetime.datetime = field(default_factory=datetime.datetime.now)
@@ -59,28 +227,12 @@ class VendaPDV:
     status: str = "PENDENTE"
     erro: Optional[str] = None
     
-    @property
-    def quantidade_total(self) -> float:
-        return sum(item.quantidade for item in self.itens)
-    
-    @property
-    def valor_total(self) -> float:
-        return sum(item.valor_total for item in self.itens)
-    
     @property
     def tempo_total(self) -> float:
         if self.timestamp_fim:
             return (self.timestamp_fim - self.timestamp_inicio).total_seconds()
         return (datetime.datetime.now() - self.timestamp_inicio).total_seconds()
     
-    @property
-    def itens_sucesso(self) -> int:
-        return sum(1 for item in self.itens if item.status == "OK")
-    
-    @property
-    def itens_falha(self) -> int:
-        return sum(1 for item in self.itens if item.status == "FALHA")
-    
     def finalizar(self, status: str = "OK", erro: str = None):
         self.timestamp_fim = datetime.datetime.now()
         self.status = status
@@ -88,7 +240,7 @@ class VendaPDV:
 
 
 @dataclass
-class ItemNota:
+class ItemNota(_ItemAgregado):
     produto: Produto
     quantidade: float
     valor_unitario: float
@@ -96,10 +248,6 @@ class ItemNota:
     timestamp_fim: Optional[datetime.datetime] = None
     status: str = "PENDENTE"
     
-    @property
-    def valor_total(self) -> float:
-        return self.valor_unitario * self.quantidade
-    
     @property
     def tempo_processamento(self) -> float:
         if self.timestamp_fim:
@@ -112,27 +260,21 @@ class ItemNota:
 
 
 @dataclass
-class ResumoNota:
+class ResumoNota(_DocumentoAgregado):
     numero: int
     itens: List[ItemNota] = field(default_factory=list)
     timestamp_inicio: datetime.datetime = field(default_factory=datetime.datetime.now)
     timestamp_fim: Optional[datetime.datetime] = None
     status: str = "PENDENTE"
     erro: Optional[str] = None
-    total_un: int = field(init=False)
-    total_kg: int = field(init=False)
-    
-    def __post_init__(self):
-        self.total_un = sum(1 for item in self.itens if item.produto.unidade.upper() == 'UN')
-        self.total_kg = sum(1 for item in self.itens if item.produto.unidade.upper() == 'KG')
     
     @property
-    def quantidade_total(self) -> float:
-        return sum(item.quantidade for item in self.itens)
+    def total_un(self) -> int:
+        return self.contar_unidade('UN')
     
     @property
-    def valor_total(self) -> float:
-        return sum(item.valor_total for item in self.itens)
+    def total_kg(self) -> int:
+        return self.contar_unidade('KG')
     
     @property
     def tempo_total(self) -> float:
@@ -140,14 +282,6 @@ class ResumoNota:
             return (self.timestamp_fim - self.timestamp_inicio).total_seconds()
         return (datetime.datetime.now() - self.timestamp_inicio).total_seconds()
     
-    @property
-    def itens_sucesso(self) -> int:
-        return sum(1 for item in self.itens if item.status == "OK")
-    
-    @property
-    def itens_falha(self) -> int:
-        return sum(1 for item in self.itens if item.status == "FALHA")
-    
     def finalizar(self, status: str = "OK", erro: str = None):
         self.timestamp_fim = datetime.datetime.now()
         self.status = status
@@ -165,11 +299,19 @@ class EstatisticasExecucao:
     tempo_total: float = 0.0
     tempo_medio_processo: float = 0.0
     tempo_medio_item: float = 0.0
-    valor_total: float = 0.0
+    valor_total_centavos: int = 0
     produtos_un: int = 0
     produtos_kg: int = 0
     inicio_execucao: datetime.datetime = field(default_factory=datetime.datetime.now)
     fim_execucao: Optional[datetime.datetime] = None
+    tempos_fases: Dict[str, float] = field(default_factory=dict)
+    
+    def somar_valor(self, valor_centavos: int):
+        self.valor_total_centavos += valor_centavos
+    
+    @property
+    def valor_total(self) -> float:
+        return reais(self.valor_total_centavos)
     
     def calcular_medias(self):
         if self.processos_sucesso > 0:
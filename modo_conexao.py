@@ -0,0 +1,112 @@
+"""Escolha automática entre Firebird embarcado e servidor (localhost:3050).
+
+Na primeira execução para um banco, cada modo de `Config.ORDEM_MODOS_CONEXAO`
+é medido (conexão + primeira linha da consulta, melhor de RODADAS rodadas
+alternadas, para o cache de arquivo frio não pesar só no primeiro modo) e o
+mais rápido que funcionou é salvo no config.ini, seção [MODO_BANCO]. As
+execuções seguintes usam o modo salvo direto; se ele falhar, é esquecido e a
+medição se repete. A negociação só acontece quando o repositório precisa mesmo
+conectar: com o catálogo em cache ou um plano carregado, nada é medido. Se
+nenhum modo responder (ex.: .fdb travado por outro programa), usa o servidor.
+"""
+
+import os
+import time
+from typing import Dict, Optional
+from config import Config
+from database import RepositorioFirebird
+from settings_manager import SettingsManager
+from logger import log
+
+
+MODOS = {
+    'embarcado': {'host': None, 'porta': 3050},
+    'servidor': {'host': Config.FIREBIRD_HOST, 'porta': Config.FIREBIRD_PORTA},
+}
+RODADAS = 2
+
+
+class NegociadorConexao:
+    """Mede os modos de conexão e lembra o vencedor por caminho do banco."""
+    
+    SECAO = 'MODO_BANCO'
+    
+    def __init__(self, settings: SettingsManager = None, ordem: list = None):
+        self._settings = settings
+        self.ordem = [m for m in (ordem or Config.ORDEM_MODOS_CONEXAO) if m in MODOS]
+        self.latencias: Dict[str, float] = {}
+    
+    @property
+    def settings(self) -> SettingsManager:
+        if self._settings is None:
+            self._settings = SettingsManager()
+        return self._settings
+    
+    @staticmethod
+    def _chave(caminho: str) -> str:
+        return os.path.normcase(os.path.abspath(caminho)).replace('=', '_').replace(':', '_')
+    
+    def modo_salvo(self, caminho: str) -> Optional[str]:
+        modo = self.settings.get(self.SECAO, self._chave(caminho), '')
+        return modo if modo in MODOS else None
+    
+    def esquecer(self, caminho: str):
+        chave = self._chave(caminho)
+        if self.SECAO in self.settings.config and chave in self.settings.config[self.SECAO]:
+            self.settings.config.remove_option(self.SECAO, chave)
+            self.settings.save()
+    
+    def _medir(self, modo: str, caminho: str, usuario: str, senha: str, consulta_sql: str) -> Optional[float]:
+        repo = RepositorioFirebird(caminho, usuario, senha, consulta_sql, **MODOS[modo])
+        inicio = time.perf_counter()
+        try:
+            if not repo.conectar():
+                return None
+            repo.executar(consulta_sql).fetchmany(1)
+            return time.perf_counter() - inicio
+        except Exception as e:
+            log.debug(f"Modo '{modo}' falhou na medicao: {e}")
+            return None
+        finally:
+            repo.fechar()
+    
+    def negociar(self, caminho: str, usuario: str, senha: str, consulta_sql: str) -> str:
+        """Modo a usar para o banco; mede os candidatos se ainda não há modo salvo."""
+        salvo = self.modo_salvo(caminho)
+        if salvo:
+            return salvo
+        
+        self.latencias = {}
+        candidatos = list(self.ordem)
+        for _ in range(RODADAS):
+            for modo in list(candidatos):
+                latencia = self._medir(modo, caminho, usuario, senha, consulta_sql)
+                if latencia is None:
+                    candidatos.remove(modo)
+                    self.latencias.pop(modo, None)
+                else:
+                    self.latencias[modo] = min(latencia, self.latencias.get(modo, latencia))
+        
+        if not self.latencias:
+            log.warning("Nenhum modo de conexao respondeu; usando o servidor")
+            return 'servidor'
+        for modo, latencia in self.latencias.items():
+            log.info(f"Modo de conexao '{modo}': {latencia * 1000:.0f} ms")
+        
+        vencedor = min(self.latencias, key=self.latencias.get)
+        for modo in self.latencias:
+            if modo != vencedor:
+                RepositorioFirebird(caminho, usuario, senha, consulta_sql, **MODOS[modo]).descartar_conexoes()
+        
+        self.settings.set(self.SECAO, self._chave(caminho), vencedor)
+        self.settings.save()
+        log.info(f"Modo de conexao escolhido para {os.path.basename(caminho)}: {vencedor}")
+        return vencedor
+    
+    def criar_repositorio(self, caminho: str, usuario: str, senha: str, consulta_sql: str,
+                          **kwargs) -> RepositorioFirebird:
+        """Repositório que negocia o modo na primeira conexão de fato."""
+        repo = RepositorioFirebird(caminho, usuario, senha, consulta_sql, **kwargs)
+        repo.escolher_modo = lambda: MODOS[self.negociar(caminho, usuario, senha, consulta_sql)]
+        repo.ao_falhar = lambda: self.esquecer(caminho)
+        return repo
@@ -0,0 +1,159 @@
+"""Plano da execução inteira sorteado de uma vez com NumPy.
+
+Documentos x itens x produto x quantidade x valor unitário são gerados em
+lote a partir de uma `SeedSequence`; o laço de digitação só consome o plano.
+Com a mesma semente o plano é idêntico, e `para_trabalhadores` deriva fluxos
+independentes (e reproduzíveis) para execuções paralelas.
+
+O plano pode ser salvo num arquivo (.plan) e reexecutado exatamente, para
+comparar perfis de espera ou versões sobre os mesmos documentos. Formato:
+MAGICO, tamanho do cabeçalho (uint32 LE), cabeçalho JSON e os arrays crus,
+alinhados em 8 bytes; a leitura usa memória mapeada (np.memmap).
+"""
+
+import json
+import struct
+from typing import List, Sequence, Tuple
+import numpy as np
+from dinheiro import centavos_array, milesimos_array, total_itens_array
+from models import Produto
+
+
+MAGICO = b"SGAPLAN1"
+ARRAYS_PLANO = (
+    ('inicio', '<i8'),
+    ('produto', '<i4'),
+    ('quantidade', '<f8'),
+    ('valor_unitario', '<f8'),
+)
+
+
+def _alinhar(n: int) -> int:
+    return (n + 7) // 8 * 8
+
+
+class PlanoExecucao:
+    """Itens de todos os documentos em arrays; `inicio` tem os deslocamentos."""
+    
+    def __init__(self, produtos: Sequence[Produto], inicio: np.ndarray, produto: np.ndarray,
+                 quantidade: np.ndarray, valor_unitario: np.ndarray, entropia: int = None):
+        self.produtos = list(produtos)
+        self.inicio = inicio
+        self.produto = produto
+        self.quantidade = quantidade
+        self.valor_unitario = valor_unitario
+        self.entropia = entropia
+    
+    def __len__(self) -> int:
+        return len(self.inicio) - 1
+    
+    @property
+    def total_itens(self) -> int:
+        return int(self.inicio[-1])
+    
+    def salvar(self, caminho: str) -> str:
+        arrays = {nome: np.ascontiguousarray(getattr(self, nome), dtype=tipo) for nome, tipo in ARRAYS_PLANO}
+        cabecalho = {
+            'versao': 1,
+            'documentos': len(self),
+            'total_itens': self.total_itens,
+            'entropia': str(self.entropia) if self.entropia is not None else None,
+            'produtos': [[p.codigo, p.valor_avista, p.unidade] for p in self.produtos],
+            'arrays': {},
+        }
+        
+        # Os deslocamentos entram no cabeçalho, cujo tamanho vem antes deles:
+        # reserva 20 dígitos por deslocamento e completa com espaços.
+        for nome, tipo in ARRAYS_PLANO:
+            cabecalho['arrays'][nome] = {'tipo': tipo, 'inicio': 0, 'tamanho': len(arrays[nome])}
+        reservado = len(json.dumps(cabecalho, ensure_ascii=False).encode('utf-8')) + 20 * len(ARRAYS_PLANO)
+        deslocamento = _alinhar(len(MAGICO) + 4 + reservado)
+        for nome, _ in ARRAYS_PLANO:
+            cabecalho['arrays'][nome]['inicio'] = deslocamento
+            deslocamento = _alinhar(deslocamento + arrays[nome].nbytes)
+        texto = json.dumps(cabecalho, ensure_ascii=False).encode('utf-8')
+        texto = texto.ljust(cabecalho['arrays'][ARRAYS_PLANO[0][0]]['inicio'] - len(MAGICO) - 4)
+        
+        with open(caminho, 'wb') as f:
+            f.write(MAGICO)
+            f.write(struct.pack('<I', len(texto)))
+            f.write(texto)
+            for nome, _ in ARRAYS_PLANO:
+                f.seek(cabecalho['arrays'][nome]['inicio'])
+                f.write(arrays[nome].tobytes())
+        return caminho
+    
+    @classmethod
+    def carregar(cls, caminho: str) -> 'PlanoExecucao':
+        """Abre um arquivo de plano; os arrays ficam mapeados, sem cópia."""
+        with open(caminho, 'rb') as f:
+            if f.read(len(MAGICO)) != MAGICO:
+                raise ValueError(f"Arquivo de plano invalido: {caminho}")
+            tamanho, = struct.unpack('<I', f.read(4))
+            cabecalho = json.loads(f.read(tamanho))
+        
+        arrays = {}
+        for nome, _ in ARRAYS_PLANO:
+            info = cabecalho['arrays'][nome]
+            arrays[nome] = np.memmap(caminho, dtype=info['tipo'], mode='r',
+                                     offset=info['inicio'], shape=(info['tamanho'],)) \
+                if info['tamanho'] else np.empty(0, dtype=info['tipo'])
+        
+        entropia = cabecalho.get('entropia')
+        return cls([Produto(c, v, u) for c, v, u in cabecalho['produtos']],
+                   entropia=int(entropia) if entropia else None, **arrays)
+    
+    def totais_centavos(self) -> np.ndarray:
+        """Valor de cada documento em centavos (int64), sem laço em Python."""
+        itens = total_itens_array(centavos_array(self.valor_unitario), milesimos_array(self.quantidade))
+        acumulado = np.zeros(len(itens) + 1, dtype=np.int64)
+        np.cumsum(itens, out=acumulado[1:])
+        return acumulado[self.inicio[1:]] - acumulado[self.inicio[:-1]]
+    
+    @property
+    def valor_total_centavos(self) -> int:
+        return int(self.totais_centavos().sum())
+    
+    def itens_documento(self, indice: int) -> List[Tuple[Produto, float, float]]:
+        """(produto, quantidade, valor unitário) dos itens do documento `indice` (base 0)."""
+        a, b = int(self.inicio[indice]), int(self.inicio[indice + 1])
+        return [(self.produtos[p], q, v) for p, q, v in zip(
+            self.produto[a:b].tolist(),
+            self.quantidade[a:b].tolist(),
+            self.valor_unitario[a:b].tolist())]
+
+
+class GeradorPlano:
+    """Sorteia planos de execução a partir de uma SeedSequence."""
+    
+    def __init__(self, produtos: Sequence[Produto], semente: int = None,
+                 sequencia: np.random.SeedSequence = None):
+        if not produtos:
+            raise ValueError("Sem produtos para o plano")
+        self.produtos = list(produtos)
+        self.sequencia = sequencia or np.random.SeedSequence(semente)
+        self.rng = np.random.default_rng(self.sequencia)
+        self._kg = np.array([p.unidade.upper() == 'KG' for p in self.produtos])
+        self._precos = np.maximum(0.01, np.array([p.valor_avista for p in self.produtos], dtype=np.float64) - 0.01)
+    
+    @classmethod
+    def para_trabalhadores(cls, produtos: Sequence[Produto], semente: int,
+                           n_trabalhadores: int) -> List['GeradorPlano']:
+        """Um gerador por trabalhador, com fluxos independentes da mesma semente."""
+        return [cls(produtos, sequencia=s) for s in np.random.SeedSequence(semente).spawn(n_trabalhadores)]
+    
+    def gerar(self, n_documentos: int, min_itens: int, max_itens: int) -> PlanoExecucao:
+        contagens = self.rng.integers(min_itens, max_itens + 1, size=n_documentos)
+        inicio = np.zeros(n_documentos + 1, dtype=np.int64)
+        np.cumsum(contagens, out=inicio[1:])
+        total = int(inicio[-1])
+        
+        produto = self.rng.integers(0, len(self.produtos), size=total, dtype=np.int32)
+        kg = self._kg[produto]
+        quantidade = np.where(
+            kg,
+            np.round(self.rng.uniform(0.5, 20.0, size=total), 3),
+            self.rng.integers(1, 21, size=total).astype(np.float64))
+        
+        return PlanoExecucao(self.produtos, inicio, produto, quantidade,
+                             self._precos[produto], self.sequencia.entropy)
@@ -0,0 +1,134 @@
+"""Compilador de planos de teclas: um item vira poucos envios em lote."""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+from config import Config
+from models import ItemNota, ItemVenda
+from esperas import EsperaAdaptativa
+from drivers import DriverEntrada, obter_driver
+
+
+@dataclass
+class Espera:
+    """Ponto de espera ao fim de um segmento.
+
+    tipo: 'transicao' (foco/diálogo mudou) ou 'pausa' (tempo fixo).
+    `timeout` é o tempo máximo.
+    """
+    tipo: str
+    timeout: float
+
+
+@dataclass
+class Segmento:
+    """Teclas enviadas numa única chamada, seguidas de uma espera opcional."""
+    teclas: List[str] = field(default_factory=list)
+    espera: Optional[Espera] = None
+    
+    def texto(self, valor: str) -> 'Segmento':
+        self.teclas.extend(valor)
+        return self
+    
+    def tecla(self, nome: str, vezes: int = 1) -> 'Segmento':
+        self.teclas.extend([nome] * vezes)
+        return self
+    
+    def aguardar(self, tipo: str, timeout: float) -> 'Segmento':
+        self.espera = Espera(tipo, timeout)
+        return self
+
+
+@dataclass
+class PlanoTeclas:
+    descricao: str
+    segmentos: List[Segmento] = field(default_factory=list)
+    
+    def novo_segmento(self) -> Segmento:
+        segmento = Segmento()
+        self.segmentos.append(segmento)
+        return segmento
+    
+    @property
+    def total_teclas(self) -> int:
+        return sum(len(s.teclas) for s in self.segmentos)
+    
+    @property
+    def tempo_maximo(self) -> float:
+        return sum(s.espera.timeout for s in self.segmentos if s.espera)
+    
+    def descrever(self) -> List[str]:
+        linhas = []
+        for i, seg in enumerate(self.segmentos, 1):
+            teclas = ''.join(t if len(t) == 1 else f"<{t}>" for t in seg.teclas)
+            espera = f" -> {seg.espera.tipo} ({seg.espera.timeout:.2f}s)" if seg.espera else ""
+            linhas.append(f"{i:02d}: {teclas}{espera}")
+        return linhas
+
+
+class CompiladorPlano:
+    """Traduz itens de nota/venda na sequência de teclas de cada tela."""
+    
+    @staticmethod
+    def item_nota(item: ItemNota) -> PlanoTeclas:
+        produto = item.produto
+        qtd_str = produto.formatar_quantidade(item.quantidade)
+        valor_str = f"{item.valor_unitario:.2f}".replace('.', ',')
+        
+        plano = PlanoTeclas(descricao=f"SGA item {produto.codigo}")
+        # Texto e o Enter que o confirma vão juntos: a mudança de campo já
+        # indica que o texto foi aceito
+        plano.novo_segmento().texto(produto.codigo).tecla('enter').aguardar(
+            'transicao', Config.DELAY_DIGITACAO + 0.5)
+        plano.novo_segmento().texto(qtd_str).tecla('enter').aguardar(
+            'transicao', Config.DELAY_DIGITACAO + Config.DELAY_ENTRE_CAMPOS)
+        # Cada Enter espera o formulário mudar de campo antes do próximo
+        for _ in range(2):
+            plano.novo_segmento().tecla('enter').aguardar('transicao', Config.DELAY_ENTRE_CAMPOS)
+        plano.novo_segmento().texto(valor_str).tecla('enter').aguardar(
+            'transicao', Config.DELAY_DIGITACAO + 1.5)
+        # Confirmações do item: cada uma pode abrir/fechar um diálogo
+        plano.novo_segmento().tecla('enter').aguardar('transicao', 1.5)
+        plano.novo_segmento().tecla('enter').aguardar('transicao', 1)
+        plano.novo_segmento().tecla('enter').aguardar('transicao', 2)
+        plano.novo_segmento().tecla('enter')
+        return plano
+    
+    @staticmethod
+    def item_venda(item: ItemVenda) -> PlanoTeclas:
+        produto = item.produto
+        qtd_str = produto.formatar_quantidade(item.quantidade)
+        
+        plano = PlanoTeclas(descricao=f"PDV item {produto.codigo}")
+        plano.novo_segmento().texto(qtd_str).texto('*').texto(produto.codigo).tecla('enter').aguardar(
+            'pausa', 1.0)
+        return plano
+
+
+class ExecutorPlano:
+    """Envia cada segmento do plano numa única chamada de entrada."""
+    
+    def __init__(self, espera: EsperaAdaptativa = None, envio: DriverEntrada = None):
+        self.envio = envio or obter_driver()
+        self.espera = espera or EsperaAdaptativa(relogio=self.envio.relogio)
+        self.chamadas = 0
+        self.teclas_enviadas = 0
+    
+    def executar(self, plano: PlanoTeclas):
+        for segmento in plano.segmentos:
+            foco = dialogo = None
+            if segmento.espera and segmento.espera.tipo == 'transicao':
+                foco = self.espera.capturar_foco()
+                dialogo = self.espera.tela.dialogo_aberto()
+            
+            if segmento.teclas:
+                self.envio.write(segmento.teclas, interval=0.0)
+                self.chamadas += 1
+                self.teclas_enviadas += len(segmento.teclas)
+            
+            espera = segmento.espera
+            if not espera:
+                continue
+            if espera.tipo == 'transicao':
+                self.espera.transicao(foco, dialogo, espera.timeout)
+            else:
+                self.espera.pausa(espera.timeout)
@@ -0,0 +1,225 @@
+"""Pool de conexões por (DSN, usuário), compartilhado entre fluxos e repositórios.
+
+Attach no Firebird em modo rede custa caro; o pool mantém até N conexões
+abertas, verifica a conexão antes de emprestar, fecha as ociosas assim que
+vencem o prazo e guarda cursores preparados por conexão. Funciona com qualquer driver
+DB-API (fdb em produção, sqlite3 nos testes).
+"""
+
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+from config import Config
+from logger import log
+
+
+class ConexaoPool:
+    """Conexão emprestada: cursor próprio e comandos preparados em cache."""
+    
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.cursor = conexao.cursor()
+        self.preparados: Dict[str, object] = {}
+        self.devolvida_em = 0.0
+    
+    def preparar(self, sql: str):
+        """Comando preparado (fdb: cursor.prep); drivers sem prep usam o texto."""
+        if sql not in self.preparados:
+            prep = getattr(self.cursor, 'prep', None)
+            self.preparados[sql] = prep(sql) if prep else sql
+        return self.preparados[sql]
+    
+    def executar(self, sql: str, parametros: tuple = ()):
+        self.cursor.execute(self.preparar(sql), parametros)
+        return self.cursor
+    
+    def fechar(self):
+        for comando in (self.cursor, self.conexao):
+            try:
+                comando.close()
+            except Exception:
+                pass
+
+
+class PoolConexoes:
+    """Pool thread-safe com tamanho máximo, verificação e descarte de ociosas.
+
+    As ociosas saem por prazo: ao devolver, um temporizador é agendado para
+    quando a mais antiga vencer `ocioso_max`. A verificação (SELECT) e o
+    fechamento de conexões rodam fora do lock, para um servidor lento não
+    travar os outros pedidos.
+    """
+    
+    def __init__(self, conectar: Callable, max_conexoes: int = None, ocioso_max: float = None,
+                 sql_verificacao: str = None, relogio: Callable[[], float] = time.monotonic):
+        self.conectar = conectar
+        self.max_conexoes = max_conexoes or Config.POOL_MAX_CONEXOES
+        self.ocioso_max = Config.POOL_OCIOSO_MAX if ocioso_max is None else ocioso_max
+        self.sql_verificacao = sql_verificacao or Config.POOL_SQL_VERIFICACAO
+        self.relogio = relogio
+        self._livres: List[ConexaoPool] = []
+        self._abertas = 0
+        self._condicao = threading.Condition()
+        self._limpeza = None
+        self.criadas = 0
+        self.reaproveitadas = 0
+        self.descartadas = 0
+    
+    def _saudavel(self, item: ConexaoPool) -> bool:
+        try:
+            item.executar(self.sql_verificacao).fetchall()
+            return True
+        except Exception as e:
+            log.debug(f"Conexao do pool descartada na verificacao: {e}")
+            return False
+    
+    def _descartar(self, itens: List[ConexaoPool]):
+        """Fecha as conexões (fora do lock) e libera as vagas."""
+        for item in itens:
+            item.fechar()
+        if itens:
+            with self._condicao:
+                self._abertas -= len(itens)
+                self.descartadas += len(itens)
+                self._condicao.notify(len(itens))
+    
+    def _retirar_ociosas(self) -> List[ConexaoPool]:
+        """Tira da lista as livres vencidas; chamar com o lock e fechar depois."""
+        limite = self.relogio() - self.ocioso_max
+        vencidas = [item for item in self._livres if item.devolvida_em < limite]
+        if vencidas:
+            self._livres = [item for item in self._livres if item.devolvida_em >= limite]
+        return vencidas
+    
+    def _agendar_limpeza(self):
+        """Temporizador para o vencimento da livre mais antiga (com o lock)."""
+        if self._limpeza is not None or not self._livres:
+            return
+        vence = min(item.devolvida_em for item in self._livres) + self.ocioso_max
+        self._limpeza = threading.Timer(max(0.0, vence - self.relogio()) + 0.01, self._limpar)
+        self._limpeza.daemon = True
+        self._limpeza.start()
+    
+    def _limpar(self):
+        with self._condicao:
+            self._limpeza = None
+            vencidas = self._retirar_ociosas()
+            self._agendar_limpeza()
+        self._descartar(vencidas)
+    
+    def obter(self, timeout: float = None) -> ConexaoPool:
+        prazo = None if timeout is None else self.relogio() + timeout
+        while True:
+            item = None
+            with self._condicao:
+                while True:
+                    vencidas = self._retirar_ociosas()
+                    if self._livres:
+                        item = self._livres.pop()
+                        break
+                    if self._abertas - len(vencidas) < self.max_conexoes:
+                        self._abertas += 1
+                        break
+                    
+                    restante = None if prazo is None else prazo - self.relogio()
+                    if restante is not None and restante <= 0:
+                        raise TimeoutError("Nenhuma conexao livre no pool")
+                    self._condicao.wait(restante)
+            self._descartar(vencidas)
+            
+            if item is None:
+                break
+            if self._saudavel(item):
+                with self._condicao:
+                    self.reaproveitadas += 1
+                return item
+            self._descartar([item])
+        
+        try:
+            item = ConexaoPool(self.conectar())
+        except BaseException:
+            with self._condicao:
+                self._abertas -= 1
+                self._condicao.notify()
+            raise
+        with self._condicao:
+            self.criadas += 1
+        return item
+    
+    def devolver(self, item: ConexaoPool, descartar: bool = False):
+        if not descartar:
+            try:
+                item.conexao.rollback()
+            except Exception:
+                descartar = True
+        if descartar:
+            self._descartar([item])
+            return
+        with self._condicao:
+            item.devolvida_em = self.relogio()
+            self._livres.append(item)
+            vencidas = self._retirar_ociosas()
+            self._agendar_limpeza()
+            self._condicao.notify()
+        self._descartar(vencidas)
+    
+    @contextmanager
+    def emprestar(self, timeout: float = None):
+        item = self.obter(timeout)
+        try:
+            yield item
+        except Exception:
+            self.devolver(item, descartar=True)
+            raise
+        else:
+            self.devolver(item)
+    
+    def fechar(self):
+        with self._condicao:
+            livres, self._livres = self._livres, []
+            if self._limpeza is not None:
+                self._limpeza.cancel()
+                self._limpeza = None
+        self._descartar(livres)
+    
+    @property
+    def livres(self) -> int:
+        return len(self._livres)
+    
+    @property
+    def abertas(self) -> int:
+        return self._abertas
+
+
+_pools: Dict[Tuple[str, str], PoolConexoes] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_para(dsn: str, usuario: str, conectar: Callable, **opcoes) -> PoolConexoes:
+    """Pool compartilhado para (dsn, usuário); criado no primeiro uso."""
+    chave = (dsn, (usuario or '').upper())
+    with _pools_lock:
+        pool = _pools.get(chave)
+        if pool is None:
+            pool = _pools[chave] = PoolConexoes(conectar, **opcoes)
+        return pool
+
+
+def fechar_pool(dsn: str, usuario: str):
+    """Fecha as conexões livres de um pool (ex.: modo de conexão descartado)."""
+    with _pools_lock:
+        pool = _pools.pop((dsn, (usuario or '').upper()), None)
+    if pool:
+        pool.fechar()
+
+
+def fechar_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.fechar()
+        _pools.clear()
+
+
+atexit.register(fechar_pools)
@@ -0,0 +1,166 @@
+"""Relatórios gravados durante a execução, um documento por vez.
+
+Os arquivos (TXT/CSV/JSON) são abertos no início da execução; cada
+ResumoNota/VendaPDV concluído é escrito e descarregado na hora, e as seções
+de resumo vão no fim, em `fechar`. A memória não cresce com o número de
+documentos e, se a execução cair, o relatório parcial já está no disco.
+"""
+
+import csv
+import datetime
+import json
+import os
+import shutil
+from dataclasses import asdict
+from typing import List
+from config import Config
+from models import EstatisticasExecucao
+from logger import log
+from artefatos import artefatos
+from modelo_relatorio import (ROTULOS, ModeloRelatorio, LinhaDocumento, LinhaItem,
+                              cabecalho_csv_documento, cabecalho_csv_item, csv_documento, csv_item,
+                              csv_frequencia, csv_resumo, json_documento, txt_documento, txt_estatisticas)
+
+
+class ExportadorTexto:
+    def __init__(self, caminho: str, sistema: str):
+        self.caminho = caminho
+        self.sistema = sistema
+        self.rotulos = ROTULOS[sistema]
+        self._arquivo = open(caminho, 'w', encoding='utf-8')
+        self._arquivo.write("=" * 80 + "\n")
+        self._arquivo.write(self.rotulos['titulo_txt'] + "\n")
+        self._arquivo.write("=" * 80 + "\n")
+        self._arquivo.write(f"Iniciado em: {datetime.datetime.now():%d/%m/%Y %H:%M:%S}\n")
+        self._arquivo.flush()
+    
+    def adicionar(self, linha: LinhaDocumento, itens: List[LinhaItem]):
+        self._arquivo.write(txt_documento(linha, self.sistema))
+        self._arquivo.flush()
+    
+    def fechar(self, stats: EstatisticasExecucao, modelo: ModeloRelatorio) -> str:
+        self._arquivo.write(f"\nGerado em: {datetime.datetime.now():%d/%m/%Y %H:%M:%S}\n\n")
+        self._arquivo.write(txt_estatisticas(modelo, stats))
+        self._arquivo.close()
+        return self.caminho
+
+
+class ExportadorCSV:
+    """Documentos no arquivo final; itens num arquivo auxiliar juntado em `fechar`."""
+    
+    def __init__(self, caminho: str, sistema: str):
+        self.caminho = caminho
+        self.sistema = sistema
+        self.rotulos = ROTULOS[sistema]
+        self._caminho_itens = caminho + '.itens'
+        
+        self._arquivo = open(caminho, 'w', newline='', encoding='utf-8-sig')
+        self._itens = open(self._caminho_itens, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._arquivo, delimiter=';', quoting=csv.QUOTE_MINIMAL)
+        self._writer_itens = csv.writer(self._itens, delimiter=';', quoting=csv.QUOTE_MINIMAL)
+        
+        self._writer.writerow([self.rotulos['titulo']])
+        self._writer.writerow(['Iniciado em:', datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')])
+        self._writer.writerow([])
+        self._writer.writerow([f'DETALHAMENTO POR {self.rotulos["documento"]}'])
+        self._writer.writerow(cabecalho_csv_documento(sistema))
+        self._arquivo.flush()
+    
+    def adicionar(self, linha: LinhaDocumento, itens: List[LinhaItem]):
+        self._writer.writerow(csv_documento(linha, self.sistema))
+        self._writer_itens.writerows(csv_item(item) for item in itens)
+        self._arquivo.flush()
+        self._itens.flush()
+    
+    def fechar(self, stats: EstatisticasExecucao, modelo: ModeloRelatorio) -> str:
+        writer = self._writer
+        
+        writer.writerow([])
+        writer.writerow(['DETALHAMENTO POR ITEM'])
+        writer.writerow(cabecalho_csv_item(self.sistema))
+        self._itens.close()
+        self._arquivo.flush()
+        with open(self._caminho_itens, 'r', newline='', encoding='utf-8') as itens:
+            shutil.copyfileobj(itens, self._arquivo)
+        os.remove(self._caminho_itens)
+        
+        if self.sistema == 'SGA':
+            writer.writerow([])
+            writer.writerows(csv_frequencia(modelo))
+        
+        writer.writerow([])
+        writer.writerow(['RESUMO EXECUTIVO'])
+        writer.writerow(['Gerado em:', datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')])
+        writer.writerows(csv_resumo(modelo))
+        self._arquivo.close()
+        return self.caminho
+
+
+class ExportadorJSON:
+    """Objeto JSON com a lista de documentos primeiro e os metadados no fim."""
+    
+    def __init__(self, caminho: str, sistema: str):
+        self.caminho = caminho
+        self.rotulos = ROTULOS[sistema]
+        self._primeiro = True
+        self._arquivo = open(caminho, 'w', encoding='utf-8')
+        self._arquivo.write('{\n  ' + json.dumps(self.rotulos['chave_json']) + ': [')
+        self._arquivo.flush()
+    
+    def adicionar(self, linha: LinhaDocumento, itens: List[LinhaItem]):
+        dados = json_documento(linha, itens)
+        self._arquivo.write(('\n    ' if self._primeiro else ',\n    ') + json.dumps(dados, ensure_ascii=False))
+        self._primeiro = False
+        self._arquivo.flush()
+    
+    def fechar(self, stats: EstatisticasExecucao, modelo: ModeloRelatorio) -> str:
+        metadata = {
+            'data_geracao': datetime.datetime.now().isoformat(),
+            'versao_sistema': '2.0',
+            'total_' + self.rotulos['chave_json']: modelo.total_documentos,
+            'estatisticas': dict(asdict(stats), valor_total=stats.valor_total),
+        }
+        self._arquivo.write('\n  ],\n  "metadata": ' + json.dumps(metadata, ensure_ascii=False, default=str) + '\n}\n')
+        self._arquivo.close()
+        return self.caminho
+
+
+EXPORTADORES = {
+    'TXT': ('txt', ExportadorTexto),
+    'CSV': ('csv', ExportadorCSV),
+    'JSON': ('json', ExportadorJSON),
+}
+
+
+class RelatorioIncremental:
+    """Abre os relatórios da execução e repassa cada documento concluído.
+
+    Cada documento passa uma vez pelo ModeloRelatorio; os exportadores recebem as linhas prontas e, no fim, o modelo com os totais.
+    """
+    
+    def __init__(self, sistema: str, formatos: List[str] = None):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = ROTULOS[sistema]['arquivo']
+        self.modelo = ModeloRelatorio(sistema)
+        self.exportadores = []
+        for formato in formatos or Config.FORMATOS_RELATORIO:
+            extensao, classe = EXPORTADORES[formato.upper()]
+            caminho = artefatos.arquivo(f"{base}_{timestamp}.{extensao}", 'relatorio')
+            self.exportadores.append(classe(caminho, sistema))
+        self._fechado = False
+    
+    def adicionar(self, documento):
+        linha, itens = self.modelo.adicionar(documento)
+        for exportador in self.exportadores:
+            exportador.adicionar(linha, itens)
+    
+    def fechar(self, stats: EstatisticasExecucao) -> List[str]:
+        """Escreve as seções de resumo e fecha os arquivos; devolve os caminhos."""
+        if self._fechado:
+            return [e.caminho for e in self.exportadores]
+        self._fechado = True
+        arquivos = []
+        for exportador in self.exportadores:
+            arquivos.append(exportador.fechar(stats, self.modelo))
+            log.info(f"Relatorio: {exportador.caminho}")
+        return arquivos
@@ -0,0 +1,73 @@
+"""Saídas estruturadas do log: JSON Lines e CSV com colunas fixas.
+
+São handlers de arquivo comuns do `logging` com formatadores próprios; a
+thread do SistemaLogging já entrega os registros em bloco e faz um único
+flush por bloco. O dicionário `extra` de cada chamada vai junto.
+"""
+
+import csv
+import datetime
+import io
+import json
+import logging
+
+
+COLUNAS_CSV = ['timestamp', 'nivel', 'mensagem', 'extra']
+
+
+def _extra(registro: logging.LogRecord):
+    return getattr(registro, 'extra_evento', None)
+
+
+def _timestamp(registro: logging.LogRecord) -> str:
+    return datetime.datetime.fromtimestamp(registro.created).isoformat(timespec='milliseconds')
+
+
+class FormatadorJSONL(logging.Formatter):
+    """Um objeto JSON compacto por linha."""
+    
+    def format(self, registro: logging.LogRecord) -> str:
+        return json.dumps({
+            'timestamp': _timestamp(registro),
+            'nivel': registro.levelname,
+            'mensagem': registro.getMessage(),
+            'extra': _extra(registro),
+        }, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class FormatadorCSV(logging.Formatter):
+    """Linha CSV (';') nas COLUNAS_CSV; `extra` vira JSON numa coluna."""
+    
+    def __init__(self):
+        super().__init__()
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, delimiter=';', lineterminator='')
+    
+    def linha(self, valores) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(valores)
+        return self._buffer.getvalue()
+    
+    def format(self, registro: logging.LogRecord) -> str:
+        extra = _extra(registro)
+        return self.linha([
+            _timestamp(registro),
+            registro.levelname,
+            registro.getMessage(),
+            json.dumps(extra, ensure_ascii=False, separators=(',', ':'), default=str) if extra else '',
+        ])
+
+
+def criar_saida_jsonl(filename: str) -> logging.FileHandler:
+    handler = logging.FileHandler(filename, encoding='utf-8')
+    handler.setFormatter(FormatadorJSONL())
+    return handler
+
+
+def criar_saida_csv(filename: str) -> logging.FileHandler:
+    handler = logging.FileHandler(filename, encoding='utf-8-sig')
+    formatador = FormatadorCSV()
+    handler.setFormatter(formatador)
+    handler.stream.write(formatador.linha(COLUNAS_CSV) + handler.terminator)
+    return handler
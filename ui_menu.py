@@ -341,6 +341,13 @@ class MenuPrincipal:
             text="Usar dados de exemplo (modo teste - sem banco)",
             variable=self.usar_mock_sga
         ).pack(anchor='w', pady=5)
+        
+        self.carga_direta_sga = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            fluxo_frame,
+            text="Gravar notas direto no banco (carga de volume, sem digitação)",
+            variable=self.carga_direta_sga
+        ).pack(anchor='w', pady=5)
     
     def _criar_config_pdv(self):
         fluxo_frame = ttk.LabelFrame(
@@ -573,7 +580,8 @@ class MenuPrincipal:
             self.resultado['config'].update({
                 'quantidade_notas_sga': self.quantidade_notas_sga.get(),
                 'caminho_bd_sga': self.caminho_bd_sga.get(),
-                'usar_mock_sga': self.usar_mock_sga.get()
+                'usar_mock_sga': self.usar_mock_sga.get(),
+                'modo_entrada_sga': 'BANCO' if self.carga_direta_sga.get() else 'GUI'
             })
         
         if "Vendas Simples" in self.fluxos_selecionados:
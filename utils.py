@@ -1,6 +1,9 @@
 """Funções auxiliares (ex.: feedback sonoro)."""
 
-import winsound
+try:
+    import winsound
+except ImportError:  # fora do Windows (CI/benchmarks com driver headless)
+    winsound = None
 
 
 def formatar_numero_br(valor, casas: int = 2, usar_milhar: bool = True) -> str:
@@ -20,6 +23,15 @@ def formatar_moeda_br(valor) -> str:
     return formatar_numero_br(valor, casas=2, usar_milhar=True)
 
 
+def descrever_item(indice: int, total: int, produto, quantidade: float, valor_unitario: float) -> str:
+    """Linha de log de um item digitado (montada só na thread do log)."""
+    if produto.unidade.upper() == 'KG':
+        qtd_txt = formatar_numero_br(quantidade, casas=3, usar_milhar=False)
+    else:
+        qtd_txt = str(int(quantidade))
+    return f"  Item {indice}/{total}: {produto.codigo} | {qtd_txt} {produto.unidade} | R$ {formatar_moeda_br(valor_unitario)}"
+
+
 def tocar_som_sucesso():
     try:
         winsound.Beep(800, 200)